@@ -0,0 +1,14 @@
+"""Timing helper shared by the benchmark scripts."""
+import time
+import numpy as np
+
+
+def timeit(func, repeat: int) -> float:
+    """Best-of-3 mean seconds per call."""
+    best = np.inf
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best
@@ -0,0 +1,58 @@
+"""
+Single-row latency and batch throughput of CompiledModel vs XGBClassifier.predict_proba,
+plus the live path (Preprocessor.transform + predict_proba on an ENTRY_HISTORY_BARS window).
+Run from the repository root: python -m benchmarks.compiled_model
+"""
+import warnings
+import numpy as np
+import pandas as pd
+from xgboost import XGBClassifier
+from src.compiled_model import CompiledModel
+from src.preprocessing import Preprocessor
+from src.config import ENTRY_HISTORY_BARS
+from benchmarks._timing import timeit
+
+
+warnings.filterwarnings("ignore", category=FutureWarning)
+
+
+def main(n_features=10, n_estimators=300, max_depth=6, batch_rows=100_000):
+    rng = np.random.default_rng(69)
+    X = rng.normal(size=(20_000, n_features)).astype(np.float32)
+    y = (X[:, 0] + 0.5 * X[:, 1] + rng.normal(size=len(X)) > 0).astype(int)
+    model = XGBClassifier(n_estimators=n_estimators, max_depth=max_depth, tree_method="hist", random_state=69)
+    model.fit(X, y)
+    compiled = CompiledModel.from_booster(model)
+
+    row_df = pd.DataFrame(X[:1], columns=[f"PC{i+1}" for i in range(n_features)])
+    row = X[:1]
+    batch = rng.normal(size=(batch_rows, n_features)).astype(np.float32)
+
+    assert np.allclose(compiled.predict_proba(batch[:1000]), model.predict_proba(batch[:1000])[:, 1], atol=1e-6)
+
+    xgb_row = timeit(lambda: model.predict_proba(row_df), 200)
+    compiled_row = timeit(lambda: compiled.predict_proba(row), 200)
+    xgb_batch = timeit(lambda: model.predict_proba(batch), 1)
+    compiled_batch = timeit(lambda: compiled.predict_proba(batch), 1)
+
+    # Live path: 45 raw features -> Preprocessor -> model, scoring the last bar of a window
+    raw = pd.DataFrame(rng.normal(size=(5_000, 45)), columns=[f"F{i}" for i in range(45)],
+                       index=pd.date_range("2024-01-01", periods=5_000, freq="h"))
+    raw["F0"] = raw["F0"].cumsum()
+    preprocessor = Preprocessor()
+    X_pca = preprocessor.fit_transform(raw)
+    live_model = XGBClassifier(n_estimators=n_estimators, max_depth=max_depth, tree_method="hist", random_state=69)
+    live_model.fit(X_pca, (raw["F1"].loc[X_pca.index] > 0).astype(int))
+    live_compiled = CompiledModel.from_booster(live_model, preprocessor)
+    window = raw.iloc[-ENTRY_HISTORY_BARS:]
+    xgb_live = timeit(lambda: live_model.predict_proba(preprocessor.transform(window).iloc[[-1]]), 100)
+    compiled_live = timeit(lambda: live_compiled.predict_proba(live_compiled.transform(window)[-1:]), 100)
+
+    print(f"{n_estimators} trees, depth {max_depth}, {n_features} features")
+    print(f"single row   xgboost {xgb_row * 1e6:9.1f} us   compiled {compiled_row * 1e6:9.1f} us   ({xgb_row / compiled_row:.1f}x)")
+    print(f"live window  xgboost {xgb_live * 1e6:9.1f} us   compiled {compiled_live * 1e6:9.1f} us   ({xgb_live / compiled_live:.1f}x)")
+    print(f"batch rows/s xgboost {batch_rows / xgb_batch:11,.0f}   compiled {batch_rows / compiled_batch:11,.0f}   ({xgb_batch / compiled_batch:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
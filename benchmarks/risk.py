@@ -0,0 +1,27 @@
+"""
+PositionSizer cost for the live bar (order()) and for research batches (size() on millions of bars).
+Run from the repository root: python -m benchmarks.risk
+"""
+from types import SimpleNamespace
+import numpy as np
+from src.mt5_sim import DEFAULT_SYMBOL_SPEC
+from src.risk import PositionSizer
+from benchmarks._timing import timeit
+
+
+def main(batch_rows=5_000_000):
+    sizer = PositionSizer(SimpleNamespace(**DEFAULT_SYMBOL_SPEC))
+    rng = np.random.default_rng(69)
+    entry = 1.1 + np.cumsum(rng.normal(0, 1e-4, batch_rows))
+    atr = rng.uniform(1e-4, 3e-3, batch_rows)
+    direction = rng.choice([-1, 1], batch_rows)
+
+    live = timeit(lambda: sizer.order("buy", 1.10012, 0.0015, 10_000.0), 10_000)
+    batch = timeit(lambda: sizer.size(entry, atr, direction, 10_000.0), 1)
+
+    print(f"live order():  {live * 1e6:8.1f} us per bar")
+    print(f"batch size():  {batch:8.3f} s for {batch_rows:,} bars ({batch / batch_rows * 1e9:.0f} ns per bar)")
+
+
+if __name__ == "__main__":
+    main()
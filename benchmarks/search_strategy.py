@@ -0,0 +1,87 @@
+"""
+Evaluations-to-target of TPESearch vs RandomSearch on a synthetic dataset, with the real ModelTrainer CV.
+The target is the median best AUPR random search reaches in `n_iter` evaluations over the seeds.
+Run from the repository root: python -m benchmarks.search_strategy
+"""
+import time
+import warnings
+import numpy as np
+import pandas as pd
+from src.model_trainer import ModelTrainer
+from src.search_strategy import RandomSearch, TPESearch
+
+PARAM_GRID = {
+    "max_depth": [2, 3, 4, 5, 6, 8],
+    "learning_rate": [0.01, 0.03, 0.05, 0.1, 0.2, 0.3],
+    "subsample": [0.5, 0.7, 0.85, 1.0],
+    "colsample_bytree": [0.3, 0.5, 0.7, 1.0],
+    "min_child_weight": [1, 5, 20, 50],
+}
+
+warnings.filterwarnings("ignore", category=FutureWarning)
+
+
+def make_dataset(rows: int = 4_000, n_features: int = 12) -> tuple[pd.DataFrame, pd.Series]:
+    """Noisy non-linear labels on stationary features, so depth and regularisation matter."""
+    rng = np.random.default_rng(69)
+    X = pd.DataFrame(rng.normal(size=(rows, n_features)), columns=[f"F{i}" for i in range(n_features)],
+                     index=pd.date_range("2020-01-01", periods=rows, freq="h"))
+    signal = X["F0"] * X["F1"] + np.sin(2 * X["F2"]) + 0.5 * (X["F3"] > 0.5) * X["F4"]
+    y = (signal + rng.normal(scale=1.0, size=rows) > 0.3).astype(int)
+    return X, y
+
+
+def run(strategy, objective) -> list[float]:
+    """Best-so-far AUPR after each evaluation."""
+    best, curve = -np.inf, []
+    for _ in range(strategy.n_iter):
+        params = strategy.ask()
+        score = objective(params)
+        strategy.tell(params, score)
+        best = max(best, score)
+        curve.append(best)
+    return curve
+
+
+def evaluations_to(curve: list[float], target: float) -> int | None:
+    return next((i + 1 for i, best in enumerate(curve) if best >= target - 1e-12), None)
+
+
+def main(n_iter=60, seeds=tuple(range(9))):
+    X, y = make_dataset()
+    trainer = ModelTrainer(n_splits=3)
+    trainer.n_estimators = 300
+    trainer.early_stopping_rounds = 20
+    trainer.base_params["device"] = "cpu"
+    folds = trainer.prepare_folds(X, y)
+
+    # The grid is discrete, so each combination is trained once and shared by both strategies
+    cache = {}
+    def objective(params):
+        key = tuple(sorted(params.items()))
+        if key not in cache:
+            cache[key] = float(np.mean(trainer.score_folds(params, folds)[0]))
+        return cache[key]
+
+    start = time.perf_counter()
+    curves = {"random": [], "tpe": []}
+    for seed in seeds:
+        curves["random"].append(run(RandomSearch(PARAM_GRID, n_iter=n_iter, random_state=seed), objective))
+        curves["tpe"].append(run(TPESearch(PARAM_GRID, n_iter=n_iter, random_state=seed), objective))
+    target = float(np.median([curve[-1] for curve in curves["random"]]))
+
+    print(f"{len(cache)} distinct candidates trained in {time.perf_counter() - start:.1f}s, "
+          f"{len(seeds)} seeds x {n_iter} evaluations per strategy")
+    print(f"target AUPR (median best of random search after {n_iter}): {target:.4f}\n")
+    print(f"{'strategy':<8} {'evals to target (median)':>26} {'reached':>8} {'best@20':>8} {'best@' + str(n_iter):>8}")
+    for name, runs in curves.items():
+        evals = [evaluations_to(curve, target) for curve in runs]
+        reached = [e for e in evals if e is not None]
+        # Seeds that never reach the target count as n_iter + 1 in the median
+        median = np.median([e if e is not None else n_iter + 1 for e in evals])
+        print(f"{name:<8} {median:>26.1f} {len(reached):>4}/{len(evals):<3} "
+              f"{np.median([c[19] for c in runs]):>8.4f} {np.median([c[-1] for c in runs]):>8.4f}  {evals}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Tick ingestion throughput: TickStream (ring buffer + BarAggregator) on chunked ticks, each part alone,
+and a pandas resample of the same ticks for reference.
+Run from the repository root: python -m benchmarks.ticks
+"""
+import numpy as np
+import pandas as pd
+from src.ticks import TICK_DTYPE, BarAggregator, TickRingBuffer, TickStream
+from benchmarks._timing import timeit
+
+
+def main(n_ticks=5_000_000, n_chunks=50, timeframe="M1"):
+    rng = np.random.default_rng(69)
+    ticks = np.empty(n_ticks, dtype=TICK_DTYPE)
+    ticks["time_msc"] = 1_704_067_200_000 + np.cumsum(rng.integers(1, 250, n_ticks))
+    ticks["bid"] = np.round(1.1 + np.cumsum(rng.normal(0, 1e-5, n_ticks)), 5)
+    ticks["ask"] = np.round(ticks["bid"] + rng.integers(1, 4, n_ticks) * 1e-5, 5)
+    ticks["volume"] = 0
+    chunks = np.array_split(ticks, n_chunks)
+
+    def resample():
+        bid = pd.Series(ticks["bid"], index=pd.to_datetime(ticks["time_msc"], unit="ms"))
+        return bid.resample(f"{timeframe[1:]}min").ohlc().dropna()
+
+    def aggregate():
+        aggregator = BarAggregator(timeframe)
+        for chunk in chunks:
+            aggregator.update(chunk)
+
+    def buffer():
+        ring = TickRingBuffer()
+        for chunk in chunks:
+            ring.push(chunk)
+
+    bars = TickStream(timeframe).run(chunks, include_open_bar=True)
+    assert np.allclose(bars[["Open", "High", "Low", "Close"]].to_numpy(), resample().to_numpy())
+
+    stream = timeit(lambda: TickStream(timeframe).run(chunks), 1)
+    aggregator = timeit(aggregate, 1)
+    ring = timeit(buffer, 1)
+    pandas = timeit(resample, 1)
+
+    print(f"{n_ticks:,} ticks in {n_chunks} chunks, {timeframe} bars ({len(bars):,})")
+    for name, seconds in (("TickStream", stream), ("BarAggregator", aggregator),
+                          ("TickRingBuffer", ring), ("pandas resample", pandas)):
+        print(f"{name:16} {seconds:7.3f} s   {n_ticks / seconds / 1e6:6.1f}M ticks/s")
+
+
+if __name__ == "__main__":
+    main()
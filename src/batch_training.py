@@ -0,0 +1,226 @@
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import joblib
+import mlflow
+from mlflow import MlflowClient
+import pandas as pd
+from threadpoolctl import threadpool_limits
+from .config import (
+    MODEL_DIR, MLFLOW_TRACKING_URI, TIMEFRAMES, TIMEFRAME_MINUTES_MAP,
+    BASE_TRAIN_YEARS, BASE_TIMEFRAME_MINUTES
+)
+from .connection import MT5Connection
+from .data_loader import DataLoader
+from .features import FeatureEngineering
+from .feature_selection import FeatureSelector
+from .model_trainer import ModelTrainer
+from .tracking import resolve_tracking_uri
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+BATCH_DIR = MODEL_DIR / "batch"
+
+
+def train_years(timeframe: str) -> float:
+    """Same history length rule as config.TRAIN_YEARS, for any timeframe."""
+    years = round(BASE_TRAIN_YEARS * TIMEFRAME_MINUTES_MAP[timeframe] / BASE_TIMEFRAME_MINUTES, 2)
+    return max(years, 0.2)
+
+
+def fetch_job_data(symbol: str, timeframe: str, years: float) -> pd.DataFrame:
+    """Default data source of a job: training bars from the terminal, fetched in the worker process."""
+    with MT5Connection():
+        return DataLoader(symbol, TIMEFRAMES[timeframe]).fetch_training_data(years)
+
+
+def job_key(job: dict) -> str:
+    return f"{job['symbol']}_{job['timeframe']}"
+
+
+def experiment_name(job: dict, prefix: str = "") -> str:
+    """Per-job MLflow experiment, named like MLFLOW_EXPERIMENT_NAME."""
+    return f"{prefix}{job['symbol']}_XGB_{job['timeframe']}"
+
+
+def job_paths(job: dict, output_dir: Path = BATCH_DIR) -> dict:
+    """Artifacts of a job live in their own <SYMBOL>_<TF> folder, named like the config paths."""
+    job_dir = Path(output_dir) / job_key(job)
+    tf = job["timeframe"]
+    return {
+        "dir": job_dir,
+        "model": job_dir / f"xgb_direction_{tf}.json",
+        "preprocessor": job_dir / f"preprocessor_{tf}.pkl",
+        "train_info": job_dir / f"train_info_{tf}.json",
+        "search_checkpoint": job_dir / f"search_checkpoint_{tf}.json",
+        "feature_manifest": job_dir / f"feature_manifest_{tf}.json",
+    }
+
+
+def run_job(job: dict, param_grid: dict, settings: dict) -> dict:
+    """
+    Trains one symbol x timeframe job: fetch, features, hyperparameter search, final fit, artifacts.
+    Runs in a worker process, with XGBoost and BLAS limited to settings["threads"] threads.
+    The job's feature manifest, if there is one, restricts the features. With settings["select_features"]
+    a job without a manifest runs FeatureSelector on the full set and saves one first.
+    """
+    start = time.perf_counter()
+    threads = settings["threads"]
+    paths = job_paths(job, settings["output_dir"])
+
+    with threadpool_limits(limits=threads):
+        years = job.get("years", train_years(job["timeframe"]))
+        df = settings["data_fn"](job["symbol"], job["timeframe"], years)
+        features = FeatureSelector.load_manifest(paths["feature_manifest"]) if paths["feature_manifest"].exists() else None
+        df = FeatureEngineering.add_all_features(df, features=features)
+        df = FeatureEngineering.drop_unlabeled(FeatureEngineering.make_label(df))
+        X, y = FeatureEngineering.split_labels_from_features(df, features=features)
+        if features is None and settings["select_features"]:
+            selector = FeatureSelector(n_splits=settings["n_splits"])
+            X = X[selector.fit(X, y)]
+            selector.save_manifest(paths["feature_manifest"])
+
+        trainer = ModelTrainer(n_splits=settings["n_splits"], n_iter=settings["n_iter"])
+        trainer.base_params["nthread"] = threads
+        if settings["device"]:
+            trainer.base_params["device"] = settings["device"]
+
+        mlflow.set_tracking_uri(settings["tracking_uri"])
+        mlflow.set_experiment(experiment_name(job, settings["experiment_prefix"]))
+        with mlflow.start_run(run_name=f"{job_key(job)}_search"):
+            # A job that crashed mid-search resumes from its search checkpoint
+            best_params = trainer.run_experiment(X, y, param_grid, checkpoint_path=paths["search_checkpoint"])
+            preprocessor, model, holdout_aucpr = trainer.fit_final_model(X, y, best_params)
+            mlflow.log_params(best_params)
+            mlflow.log_metric("holdout_aucpr", holdout_aucpr)
+
+    paths["dir"].mkdir(parents=True, exist_ok=True)
+    model.save_model(paths["model"])
+    joblib.dump(preprocessor, paths["preprocessor"])
+    info = {
+        **job,
+        "best_params": best_params,
+        "holdout_aucpr": holdout_aucpr,
+        "features": list(X.columns),
+        "rows": len(X),
+        "start": str(X.index[0]),
+        "end": str(X.index[-1]),
+        "threads": threads,
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+    paths["train_info"].write_text(json.dumps(info, indent=2, default=_to_json))
+    # The search is done, a later run of this job must start a fresh one
+    paths["search_checkpoint"].unlink(missing_ok=True)
+    logging.info(f"Job {job_key(job)} done: holdout AUPR {holdout_aucpr:.4f}")
+    return {**info, "status": "done", "model_path": str(paths["model"])}
+
+
+def _to_json(value):
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+class BatchTrainer:
+    """
+    Trains a list of {"symbol", "timeframe"} jobs (optional "years") in a bounded process pool.
+
+    Every job gets `threads_per_job` threads, and max_workers x threads_per_job never exceeds `cores`,
+    so parallel jobs don't oversubscribe the CPU. Each job logs to its own MLflow experiment and
+    writes its artifacts to its own folder under `output_dir`. Job results are checkpointed to
+    batch_state.json as they complete, so run() after a crash only trains what is missing.
+    """
+
+    def __init__(self, jobs: list[dict], param_grid: dict, max_workers: int | None = None,
+                 threads_per_job: int | None = None, cores: int | None = None, n_iter: int = 50, n_splits: int = 5,
+                 output_dir: Path = BATCH_DIR, tracking_uri: str | None = None, experiment_prefix: str = "",
+                 device: str | None = None, data_fn=fetch_job_data, select_features: bool = False):
+        self.jobs = jobs
+        self.param_grid = param_grid
+        self.cores = cores or os.cpu_count() or 1
+        self.max_workers = max_workers or max(1, min(len(jobs), self.cores))
+        self.threads_per_job = threads_per_job or max(1, self.cores // self.max_workers)
+        if self.max_workers * self.threads_per_job > self.cores:
+            raise ValueError(
+                f"{self.max_workers} workers x {self.threads_per_job} threads exceeds the {self.cores} cores budget."
+            )
+
+        self.n_iter = n_iter
+        self.n_splits = n_splits
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.tracking_uri = tracking_uri
+        self.experiment_prefix = experiment_prefix
+        self.device = device
+        self.data_fn = data_fn
+        self.select_features = select_features
+        self.state_path = self.output_dir / "batch_state.json"
+        self.state = json.loads(self.state_path.read_text()) if self.state_path.exists() else {}
+
+    def pending_jobs(self) -> list[dict]:
+        """Jobs without a completed checkpoint. Failed jobs are retried."""
+        return [job for job in self.jobs if self.state.get(job_key(job), {}).get("status") != "done"]
+
+    def run(self, resume: bool = True) -> dict:
+        """
+        Trains the pending jobs and returns the state of every job.
+        resume=False retrains every job from scratch, without reusing search checkpoints.
+        """
+        if not resume:
+            self.state = {}
+            for job in self.jobs:
+                job_paths(job, self.output_dir)["search_checkpoint"].unlink(missing_ok=True)
+        pending = self.pending_jobs()
+        logging.info(f"Batch: {len(pending)}/{len(self.jobs)} jobs to train, "
+                     f"{self.max_workers} workers x {self.threads_per_job} threads")
+        if not pending:
+            return self.state
+
+        tracking_uri = resolve_tracking_uri(self.tracking_uri or MLFLOW_TRACKING_URI)
+        self._create_experiments(tracking_uri, pending)
+        settings = {
+            "threads": self.threads_per_job,
+            "n_iter": self.n_iter,
+            "n_splits": self.n_splits,
+            "device": self.device,
+            "output_dir": self.output_dir,
+            "tracking_uri": tracking_uri,
+            "experiment_prefix": self.experiment_prefix,
+            "data_fn": self.data_fn,
+            "select_features": self.select_features,
+        }
+
+        # spawn: workers must not inherit the parent's thread pools (XGBoost, BLAS, MLflow logger)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(self.max_workers, len(pending)), mp_context=context) as pool:
+            futures = {pool.submit(run_job, job, self.param_grid, settings): job for job in pending}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logging.error(f"Job {job_key(job)} failed: {e}")
+                    result = {**job, "status": "failed", "error": repr(e)}
+                self.state[job_key(job)] = result
+                self._save_state()
+
+        return self.state
+
+    def _create_experiments(self, tracking_uri: str, jobs: list[dict]):
+        """Creates the job experiments up front, so workers never race to create them (or the store)."""
+        client = MlflowClient(tracking_uri=tracking_uri)
+        for job in jobs:
+            name = experiment_name(job, self.experiment_prefix)
+            if client.get_experiment_by_name(name) is None:
+                client.create_experiment(name)
+
+    def _save_state(self):
+        """Writes the checkpoint atomically, so a crash mid-write never corrupts it."""
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.state, indent=2, default=_to_json))
+        tmp.replace(self.state_path)
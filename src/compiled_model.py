@@ -0,0 +1,229 @@
+import json
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from .config import COMPILED_MODEL_PATH
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+class CompiledModel:
+    """
+    Standalone NumPy predictor for a fitted Preprocessor + binary:logistic XGBoost booster.
+
+    All trees are flattened into shared node arrays and walked for every row and tree at once,
+    one tree level per step, in row chunks that stay in cache. The preprocessor's scaler and PCA are folded into one affine map
+    applied after the first-differencing of non-stationary columns. The exported .npz file only
+    needs NumPy to load and score, not xgboost, sklearn or statsmodels.
+
+    The walk beats xgboost on a few rows (the live bar) but not on batches, so batches of more than
+    MAX_WALK_ROWS rows are scored by the booster embedded in the export whenever xgboost is installed.
+    """
+
+    # Measured crossover (benchmarks/compiled_model.py): the walk is faster up to about 16 rows
+    MAX_WALK_ROWS = 16
+
+    def __init__(self, arrays: dict):
+        self.left = arrays["left"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.default_left = arrays["default_left"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.depth = int(arrays["depth"])
+        self.base_margin = float(arrays["base_margin"])
+        # Optional fused preprocessor
+        self.diff_mask = arrays.get("diff_mask")
+        self.weights = arrays.get("weights")
+        self.bias = arrays.get("bias")
+        self.feature_cols = list(arrays["feature_cols"]) if "feature_cols" in arrays else None
+        # Serialized booster for batch scoring, None in exports without it
+        self.booster_raw = arrays.get("booster_raw")
+        self.iteration_end = int(arrays.get("iteration_end", 0))
+        self._booster = None
+
+    @classmethod
+    def from_booster(cls, booster, preprocessor=None) -> "CompiledModel":
+        """
+        Compiles an xgboost Booster (or XGBClassifier) up to its best iteration, like predict_proba.
+        Pass the fitted Preprocessor to fuse its transform into the predictor.
+        """
+        if hasattr(booster, "get_booster"):
+            booster = booster.get_booster()
+        model = json.loads(booster.save_raw(raw_format="json"))["learner"]
+        if model["objective"]["name"] != "binary:logistic":
+            raise ValueError(f"Only binary:logistic boosters can be compiled, got {model['objective']['name']}.")
+
+        base_score = float(model["learner_model_param"]["base_score"].strip("[]"))
+        trees = model["gradient_booster"]["model"]["trees"]
+        best_iteration = booster.attributes().get("best_iteration")
+        if best_iteration is not None:
+            trees = trees[:int(best_iteration) + 1]
+
+        left, feature, threshold, default_left, value, roots = [], [], [], [], [], []
+        depth, offset = 0, 0
+        for tree in trees:
+            tree_left = np.asarray(tree["left_children"])
+            tree_right = np.asarray(tree["right_children"])
+            is_leaf = tree_left == -1
+            # XGBoost allocates siblings in pairs, which lets a step be left + go_right
+            if np.any(tree_right[~is_leaf] != tree_left[~is_leaf] + 1):
+                raise ValueError("Unsupported tree layout: right child is not next to the left child.")
+            roots.append(offset)
+            # Leaves point to themselves with an infinite threshold, so extra steps keep rows parked
+            own = np.arange(len(tree_left)) + offset
+            left.append(np.where(is_leaf, own, tree_left + offset))
+            feature.append(np.where(is_leaf, 0, tree["split_indices"]))
+            threshold.append(np.where(is_leaf, np.inf, tree["split_conditions"]))
+            default_left.append(np.where(is_leaf, True, tree["default_left"]))
+            value.append(np.where(is_leaf, tree["split_conditions"], 0.0))
+            depth = max(depth, cls._tree_depth(tree_left, tree_right))
+            offset += len(tree_left)
+
+        arrays = {
+            "left": np.concatenate(left).astype(np.int32),
+            "feature": np.concatenate(feature).astype(np.int32),
+            "threshold": np.concatenate(threshold).astype(np.float32),
+            "default_left": np.concatenate(default_left).astype(bool),
+            "value": np.concatenate(value).astype(np.float32),
+            "roots": np.asarray(roots, dtype=np.int32),
+            "depth": np.int32(depth),
+            "base_margin": np.float64(np.log(base_score / (1 - base_score))),
+            "booster_raw": np.frombuffer(booster.save_raw(raw_format="ubj"), dtype=np.uint8),
+            "iteration_end": np.int32(int(best_iteration) + 1 if best_iteration is not None else 0),
+        }
+        if preprocessor is not None:
+            arrays.update(cls._fuse_preprocessor(preprocessor))
+        return cls(arrays)
+
+    @staticmethod
+    def _tree_depth(left: np.ndarray, right: np.ndarray) -> int:
+        depth, frontier = 0, [0]
+        while True:
+            frontier = [c for n in frontier for c in (left[n], right[n]) if c != -1]
+            if not frontier:
+                return depth
+            depth += 1
+
+    @staticmethod
+    def _fuse_preprocessor(preprocessor) -> dict:
+        """Folds StandardScaler + PCA into X @ weights + bias."""
+        if not preprocessor.is_fitted:
+            raise RuntimeError("Preprocessor must be fitted before transform.")
+        scale = preprocessor.scaler.scale_
+        components = preprocessor.pca.components_
+        weights = components.T / scale[:, None]
+        bias = -(preprocessor.scaler.mean_ / scale) @ components.T - preprocessor.pca.mean_ @ components.T
+        cols = preprocessor.feature_cols
+        return {
+            "diff_mask": np.isin(cols, preprocessor.non_stat_cols),
+            "weights": weights,
+            "bias": bias,
+            "feature_cols": np.asarray(cols),
+        }
+
+    def transform(self, X):
+        """
+        Same as Preprocessor.transform: non-stationary columns are differenced, then the first row
+        and any row with NaN (in any column of X, like its dropna) are dropped.
+        A DataFrame keeps the index of the surviving rows, with PC1..PCn columns.
+        """
+        if self.weights is None:
+            raise RuntimeError("This model was compiled without a preprocessor.")
+        index, keep = None, None
+        if isinstance(X, pd.DataFrame):
+            index = X.index
+            extra = X.columns.difference(self.feature_cols)
+            if len(extra):
+                keep = X[extra].notna().all(axis=1).to_numpy()
+            X = X[self.feature_cols].to_numpy(dtype=np.float64)
+        X = np.array(X, dtype=np.float64)
+        X[1:, self.diff_mask] = np.diff(X[:, self.diff_mask], axis=0)
+        valid = ~np.isnan(X).any(axis=1)
+        if keep is not None:
+            valid &= keep
+        if self.diff_mask.any() and len(valid):
+            valid[0] = False
+        X_pca = X[valid] @ self.weights + self.bias
+        if index is None:
+            return X_pca
+        return pd.DataFrame(X_pca, columns=[f"PC{i+1}" for i in range(X_pca.shape[1])], index=index[valid])
+
+    def predict_margin(self, X, chunk_size: int = 2048) -> np.ndarray:
+        """Raw margins for rows already in model space (e.g. PCA components)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        booster = self._batch_booster() if len(X) > self.MAX_WALK_ROWS else None
+        if booster is not None:
+            return booster.inplace_predict(X, iteration_range=(0, self.iteration_end), predict_type="margin")
+        margins = np.empty(len(X))
+        for start in range(0, len(X), chunk_size):
+            margins[start:start + chunk_size] = self._walk(X[start:start + chunk_size])
+        return margins + self.base_margin
+
+    def _batch_booster(self):
+        """The embedded booster, loaded on first use. None without xgboost or without an embedded booster."""
+        if self._booster is None and self.booster_raw is not None:
+            try:
+                import xgboost as xgb
+            except ImportError:
+                self.booster_raw = None
+                return None
+            self._booster = xgb.Booster()
+            self._booster.load_model(bytearray(self.booster_raw.tobytes()))
+        return self._booster
+
+    def _walk(self, X: np.ndarray) -> np.ndarray:
+        """Moves every (row, tree) pair down one level per step, on flat indices."""
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        row_offset = (np.arange(n_rows, dtype=np.int32) * n_features)[:, None]
+        has_nan = np.isnan(flat).any()
+        node = np.broadcast_to(self.roots, (n_rows, len(self.roots)))
+
+        for _ in range(self.depth):
+            x = flat[row_offset + self.feature[node]]
+            go_right = x >= self.threshold[node]
+            if has_nan:
+                go_right |= np.isnan(x) & ~self.default_left[node]
+            node = self.left[node] + go_right
+
+        return self.value[node].sum(axis=1, dtype=np.float64)
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Probability of class 1 for rows already in model space."""
+        return 1.0 / (1.0 + np.exp(-self.predict_margin(X)))
+
+    def predict_proba_raw(self, X):
+        """
+        Probability of class 1 for raw feature rows, through the fused preprocessor.
+        A DataFrame gives a Series on the rows the preprocessor keeps.
+        """
+        X_pca = self.transform(X)
+        proba = self.predict_proba(X_pca)
+        return pd.Series(proba, index=X_pca.index) if isinstance(X_pca, pd.DataFrame) else proba
+
+    def save(self, path: Path = COMPILED_MODEL_PATH) -> Path:
+        arrays = {
+            "left": self.left, "feature": self.feature,
+            "threshold": self.threshold, "default_left": self.default_left, "value": self.value,
+            "roots": self.roots, "depth": np.int32(self.depth), "base_margin": np.float64(self.base_margin),
+        }
+        if self.booster_raw is not None:
+            arrays.update(booster_raw=self.booster_raw, iteration_end=np.int32(self.iteration_end))
+        if self.weights is not None:
+            arrays.update(diff_mask=self.diff_mask, weights=self.weights, bias=self.bias,
+                          feature_cols=np.asarray(self.feature_cols))
+        np.savez(path, **arrays)
+        logging.info(f"Compiled model saved to: {path}")
+        return Path(path)
+
+    @classmethod
+    def load(cls, path: Path = COMPILED_MODEL_PATH) -> "CompiledModel":
+        with np.load(path) as data:
+            return cls({key: data[key] for key in data.files})
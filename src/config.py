@@ -3,7 +3,6 @@
 import os
 from pathlib import Path
 from dotenv import load_dotenv
-import MetaTrader5 as mt5
 
 # ==========
 # PATHS
@@ -31,6 +30,13 @@ MT5_PASSWORD = os.getenv("MT5_PASSWORD", "")
 MT5_SERVER = os.getenv("MT5_SERVER", "")
 MT5_TERMINAL_PATH = os.getenv("MT5_TERMINAL_PATH", "")
 
+# "terminal" uses the MetaTrader5 package, "simulator" the offline src.mt5_sim (no terminal needed)
+MT5_BACKEND = os.getenv("MT5_BACKEND", "terminal")
+if MT5_BACKEND == "simulator":
+    from . import mt5_sim as mt5
+else:
+    import MetaTrader5 as mt5
+
 # Map string timeframes to MT5 constants 
 TIMEFRAMES = {
     "M1": mt5.TIMEFRAME_M1,
@@ -78,6 +84,8 @@ ENTRY_HISTORY_BARS = 50
 
 # The Pre-processing/Transformation objects
 FEATURES_PATH = MODEL_DIR / f"xgb_direction_{SELECTED_TIMEFRAME}_features.pkl"
+# Reduced feature set chosen by FeatureSelector (features computed in training and live)
+FEATURE_MANIFEST_PATH = MODEL_DIR / f"xgb_direction_{SELECTED_TIMEFRAME}_feature_manifest.json"
 NON_STATIONARY_PATH = MODEL_DIR / f"non_stationary_cols_{SELECTED_TIMEFRAME}.pkl"
 PCA_PATH = MODEL_DIR / f"pca_{SELECTED_TIMEFRAME}.pkl"
 
@@ -87,6 +95,9 @@ TRAIN_INFO_PATH = MODEL_DIR / f"train_info_{SELECTED_TIMEFRAME}.json"
 # The actual XGBoost Model
 MODEL_PATH = MODEL_DIR / f"xgb_direction_{SELECTED_TIMEFRAME}.json"
 
+# NumPy-only export of the model + preprocessor for fast live scoring
+COMPILED_MODEL_PATH = MODEL_DIR / f"xgb_direction_{SELECTED_TIMEFRAME}_compiled.npz"
+
 # ==========
 # TRADING SETUP
 # ==========
@@ -108,6 +119,32 @@ MAX_SPREAD_POINTS = 3
 MAX_OPEN_TRADES = 1
 
 
+# ==========
+# MT5 SIMULATOR (used when MT5_BACKEND=simulator)
+# ==========
+
+# Recorded bars at SELECTED_TIMEFRAME (DataLoader.save_to_csv format). Empty means a synthetic walk
+MT5_SIM_DATA_PATH = os.getenv("MT5_SIM_DATA_PATH", "")
+# Simulator clock start, e.g. "2024-01-02 00:00". Empty means the last recorded bar, or mt5_sim.DEFAULT_START_TIME for synthetic data
+MT5_SIM_START_TIME = os.getenv("MT5_SIM_START_TIME") or None
+MT5_SIM_SEED = int(os.getenv("MT5_SIM_SEED", 69))
+MT5_SIM_LATENCY_MS = float(os.getenv("MT5_SIM_LATENCY_MS", 0))
+MT5_SIM_FAILURE_RATE = float(os.getenv("MT5_SIM_FAILURE_RATE", 0))
+MT5_SIM_DISCONNECT_RATE = float(os.getenv("MT5_SIM_DISCONNECT_RATE", 0))
+
+if MT5_BACKEND == "simulator":
+    mt5.configure(
+        data_path=MT5_SIM_DATA_PATH or None,
+        timeframe=DIRECTION_TIMEFRAME,
+        symbols=(SYMBOL,),
+        start_time=MT5_SIM_START_TIME,
+        seed=MT5_SIM_SEED,
+        latency_ms=MT5_SIM_LATENCY_MS,
+        failure_rate=MT5_SIM_FAILURE_RATE,
+        disconnect_rate=MT5_SIM_DISCONNECT_RATE,
+    )
+
+
 # ==========
 # LOG TRADES
 # ==========
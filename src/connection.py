@@ -1,5 +1,5 @@
 from .config import MT5_LOGIN, MT5_PASSWORD, MT5_SERVER, MT5_TERMINAL_PATH
-import MetaTrader5 as mt5
+from .config import mt5
 import time
 from functools import wraps
 import logging
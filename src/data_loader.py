@@ -1,11 +1,13 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+import numpy as np
 import pandas as pd
-import MetaTrader5 as mt5
+from .config import mt5
 from .config import (
     SYMBOL, DATA_DIR, DIRECTION_TIMEFRAME,
     TRAIN_YEARS, ENTRY_HISTORY_BARS
 )
+from .ticks import to_tick_array, save_tick_file
 import logging
 
 logging.basicConfig(
@@ -16,9 +18,10 @@ logging.basicConfig(
 class DataProcessor:
     
     @staticmethod
-    def clean_data(rates) -> pd.DataFrame:
+    def clean_data(rates, keep_spread: bool = False) -> pd.DataFrame:
         """
         Convert raw MT5 data to a clean DataFrame with proper column names and types.
+        With keep_spread=True the bar spread (in points) is kept as "Spread".
         """
         if rates is None or len(rates) == 0:
             raise ValueError("Empty data received for cleaning.")
@@ -38,28 +41,33 @@ class DataProcessor:
         })
 
         #Drop unnecessary columns and handle missing values
-        df.drop(columns=["spread","real_volume"], inplace=True)
+        if keep_spread:
+            df = df.rename(columns={"spread": "Spread"}).drop(columns=["real_volume"])
+        else:
+            df.drop(columns=["spread","real_volume"], inplace=True)
         df.dropna(inplace=True)
         
         return df
 
 class DataLoader:
     
-    def __init__(self):
-        self.symbol = SYMBOL
+    def __init__(self, symbol: str = SYMBOL, timeframe: int = DIRECTION_TIMEFRAME):
+        self.symbol = symbol
         self.data_dir = DATA_DIR
-        self.timeframe = DIRECTION_TIMEFRAME
+        self.timeframe = timeframe
         self.processor = DataProcessor()
         
     
     def fetch_training_data(self, years: float = TRAIN_YEARS) -> pd.DataFrame:
         """
-        Fetch raw DIRECTION_TIMEFRAME candles for SYMBOL over the last TRAIN_YEARS.
+        Fetch raw DIRECTION_TIMEFRAME candles for SYMBOL over the last TRAIN_YEARS, up to the terminal's time.
         Returns a pandas DataFrame with:
         ['time', 'open', 'high', 'low', 'close', 'volume']
         """
     
-        end = datetime.now()
+        # The last tick's time is the terminal's clock (also the simulator's), falling back to the local clock
+        tick = mt5.symbol_info_tick(self.symbol)
+        end = datetime.fromtimestamp(tick.time, tz=timezone.utc).replace(tzinfo=None) if tick is not None else datetime.now()
         start = end - timedelta(days=365 * years)
         logging.info(f"Fetching {self.symbol} data from {start.date()} to {end.date()} ...")
 
@@ -95,6 +103,22 @@ class DataLoader:
         return df
     
     
+    def fetch_ticks(self, start: datetime, end: datetime) -> np.ndarray:
+        """
+        Fetch all ticks for SYMBOL between start and end.
+        Returns a TICK_DTYPE array (time_msc, bid, ask, volume) ready for TickStream.
+        """
+        ticks = mt5.copy_ticks_range(self.symbol, start, end, mt5.COPY_TICKS_ALL)
+        if ticks is None or len(ticks) == 0:
+            raise ValueError(f"No ticks received for {self.symbol}: {mt5.last_error()}")
+        
+        logging.info(f"Received {len(ticks)} ticks of {self.symbol} data.")
+        return to_tick_array(ticks)
+    
+    def save_ticks(self, ticks: np.ndarray, suffix="ticks", dir=DATA_DIR) -> Path:
+        """Save ticks as .npy so they can be replayed offline with replay_tick_file."""
+        return save_tick_file(ticks, dir / f"{self.symbol}_{suffix}.npy")
+    
     def save_to_csv(self, df: pd.DataFrame, suffix="raw", dir=DATA_DIR) -> Path:
         """
         Centralized method to save DataFrames to CSV with consistent naming and logging.
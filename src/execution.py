@@ -0,0 +1,270 @@
+import atexit
+import csv
+import queue
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from pathlib import Path
+from .config import mt5
+from .config import (
+    SYMBOL, SELECTED_TIMEFRAME, LOG_DIR, COLS,
+    MAGIC_NUMBER, MAX_OPEN_TRADES, MAX_SPREAD_POINTS
+)
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+TRADE_JOURNAL_PATH = LOG_DIR / f"trades_{SYMBOL}_{SELECTED_TIMEFRAME}.csv"
+
+
+class TradeJournal:
+    """
+    Append-only CSV trade log with the COLS schema.
+    Rows are buffered in memory and appended in one write once `buffer_size` rows are pending,
+    on flush(), or at close/interpreter exit. The file is never rewritten.
+    """
+
+    def __init__(self, path: Path = TRADE_JOURNAL_PATH, buffer_size: int = 20):
+        self.path = Path(path)
+        self.buffer_size = buffer_size
+        self._rows = []
+        self._lock = threading.Lock()
+
+        write_header = not self.path.exists() or self.path.stat().st_size == 0
+        self._file = open(self.path, "a", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=COLS, extrasaction="ignore")
+        if write_header:
+            self._writer.writeheader()
+            self._file.flush()
+        atexit.register(self.close)
+
+    def append(self, record: dict):
+        with self._lock:
+            self._rows.append(record)
+            if len(self._rows) >= self.buffer_size:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._flush_locked()
+            self._file.close()
+        atexit.unregister(self.close)
+
+    def _flush_locked(self):
+        if not self._rows:
+            return
+        self._writer.writerows(self._rows)
+        self._file.flush()
+        self._rows.clear()
+
+
+class OrderExecutor:
+    """
+    Places and monitors orders on a worker thread so the decision loop never blocks on the broker.
+
+    Orders are dicts with at least "direction" ("buy"/"sell"), "volume", "sl_price" and "tp_price",
+    plus optional "prob", "risk_amount" and "balance_before" for the journal. submit() returns a Future
+    resolved with {"status": "filled" | "rejected", "reason": ..., "ticket": ...}.
+
+    Positions are reconciled by MAGIC_NUMBER, so positions opened before a restart are adopted,
+    and closed positions are written to the TradeJournal with their exit deal.
+    """
+
+    def __init__(self, broker=mt5, journal: TradeJournal | None = None, symbol: str = SYMBOL,
+                 timeframe: str = SELECTED_TIMEFRAME, magic: int = MAGIC_NUMBER,
+                 max_open_trades: int = MAX_OPEN_TRADES, max_spread_points: float = MAX_SPREAD_POINTS,
+                 deviation: int = 10, monitor_interval: float = 1.0):
+        self.broker = broker
+        self.journal = journal or TradeJournal()
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.magic = magic
+        self.max_open_trades = max_open_trades
+        self.max_spread_points = max_spread_points
+        self.deviation = deviation
+        self.monitor_interval = monitor_interval
+        self.open_trades = {}
+        self._queue = queue.Queue()
+        self._broker_lock = threading.Lock()
+        self._worker = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        """Adopts existing bot positions and starts the worker thread."""
+        self.reconcile()
+        self._worker = threading.Thread(target=self._run, name="order-executor", daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        """Processes every queued order, reconciles once more and flushes the journal."""
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+        self.reconcile()
+        self.journal.flush()
+
+    def submit(self, order: dict) -> Future:
+        """Queues an order and returns immediately."""
+        if self._worker is None:
+            raise RuntimeError("OrderExecutor must be started before submitting orders.")
+        future = Future()
+        self._queue.put((order, future))
+        return future
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.monitor_interval)
+            except queue.Empty:
+                self._safe_reconcile()
+                continue
+
+            if item is None:
+                return
+            order, future = item
+            try:
+                future.set_result(self.execute(order))
+            except Exception as e:
+                logging.error(f"Order execution failed: {e}")
+                future.set_exception(e)
+
+    def _safe_reconcile(self):
+        try:
+            self.reconcile()
+        except Exception as e:
+            logging.warning(f"Position reconciliation failed: {e}")
+
+    def bot_positions(self) -> list:
+        """Open positions on the symbol carrying our magic number."""
+        positions = self.broker.positions_get(symbol=self.symbol) or ()
+        return [p for p in positions if p.magic == self.magic]
+
+    def execute(self, order: dict) -> dict:
+        """Checks the risk limits and sends one market order. Runs on the worker thread."""
+        if order.get("direction") not in ("buy", "sell"):
+            return self._reject(order, f"unknown direction {order.get('direction')!r}")
+
+        with self._broker_lock:
+            self._reconcile_locked()
+
+            if len(self.open_trades) >= self.max_open_trades:
+                return self._reject(order, f"max open trades reached ({self.max_open_trades})")
+
+            info = self.broker.symbol_info(self.symbol)
+            tick = self.broker.symbol_info_tick(self.symbol)
+            if info is None or tick is None:
+                return self._reject(order, f"no market data for {self.symbol}")
+
+            spread_points = round((tick.ask - tick.bid) / info.point, 1)
+            if spread_points > self.max_spread_points:
+                return self._reject(order, f"spread {spread_points} > {self.max_spread_points} points")
+
+            is_buy = order["direction"] == "buy"
+            request = {
+                "action": self.broker.TRADE_ACTION_DEAL,
+                "symbol": self.symbol,
+                "volume": float(order["volume"]),
+                "type": self.broker.ORDER_TYPE_BUY if is_buy else self.broker.ORDER_TYPE_SELL,
+                "price": tick.ask if is_buy else tick.bid,
+                "sl": float(order["sl_price"]),
+                "tp": float(order["tp_price"]),
+                "deviation": self.deviation,
+                "magic": self.magic,
+                "comment": f"bot_{self.timeframe}",
+                "type_time": self.broker.ORDER_TIME_GTC,
+                "type_filling": self.broker.ORDER_FILLING_IOC,
+            }
+            result = self.broker.order_send(request)
+
+            if result is None or result.retcode != self.broker.TRADE_RETCODE_DONE:
+                comment = getattr(result, "comment", None) or self.broker.last_error()
+                return self._reject(order, f"order_send failed: {comment}")
+
+            self.open_trades[result.order] = {
+                "ticket": result.order,
+                "symbol": self.symbol,
+                "magic": self.magic,
+                "timeframe": self.timeframe,
+                "open_time_utc": datetime.now(timezone.utc).isoformat(),
+                "direction": order["direction"],
+                "prob": order.get("prob"),
+                "risk_amount": order.get("risk_amount"),
+                "volume": result.volume,
+                "entry_price": result.price,
+                "sl_price": request["sl"],
+                "tp_price": request["tp"],
+                "spread_points_entry": spread_points,
+                "balance_before": order.get("balance_before"),
+            }
+            logging.info(f"Opened {order['direction']} {result.volume} {self.symbol} @ {result.price} (ticket {result.order})")
+            return {"status": "filled", "reason": None, "ticket": result.order, "price": result.price}
+
+    def reconcile(self):
+        """Syncs open_trades with the broker and journals positions that have closed."""
+        with self._broker_lock:
+            self._reconcile_locked()
+
+    def _reconcile_locked(self):
+        live = {p.ticket: p for p in self.bot_positions()}
+
+        # Adopt positions we do not know about yet (e.g. after a restart)
+        for ticket, position in live.items():
+            if ticket not in self.open_trades:
+                self.open_trades[ticket] = {
+                    "ticket": ticket,
+                    "symbol": position.symbol,
+                    "magic": position.magic,
+                    "timeframe": self.timeframe,
+                    "open_time_utc": datetime.fromtimestamp(position.time, timezone.utc).isoformat(),
+                    "direction": "buy" if position.type == self.broker.ORDER_TYPE_BUY else "sell",
+                    "volume": position.volume,
+                    "entry_price": position.price_open,
+                    "sl_price": position.sl,
+                    "tp_price": position.tp,
+                }
+
+        for ticket in [t for t in self.open_trades if t not in live]:
+            self._close_trade(self.open_trades.pop(ticket))
+
+    def _close_trade(self, record: dict):
+        deals = self.broker.history_deals_get(position=record["ticket"]) or ()
+        exits = [d for d in deals if d.entry == self.broker.DEAL_ENTRY_OUT]
+
+        if exits:
+            last = exits[-1]
+            record["close_time_utc"] = datetime.fromtimestamp(last.time, timezone.utc).isoformat()
+            record["exit_price"] = last.price
+            record["reason_close"] = self._close_reason(last.reason)
+        record["profit"] = sum(d.profit + d.swap + d.commission for d in deals)
+
+        self.journal.append(record)
+        logging.info(f"Closed ticket {record['ticket']} ({record.get('reason_close')}), profit {record['profit']:.2f}")
+
+    def _close_reason(self, reason: int) -> str:
+        reasons = {
+            self.broker.DEAL_REASON_SL: "sl",
+            self.broker.DEAL_REASON_TP: "tp",
+            self.broker.DEAL_REASON_EXPERT: "expert",
+            self.broker.DEAL_REASON_SO: "stop_out",
+        }
+        return reasons.get(reason, "manual")
+
+    def _reject(self, order: dict, reason: str) -> dict:
+        logging.warning(f"Rejected {order.get('direction')} order: {reason}")
+        return {"status": "rejected", "reason": reason, "ticket": None}
@@ -0,0 +1,211 @@
+import hashlib
+import inspect
+import json
+import os
+import time
+from functools import lru_cache
+from importlib.metadata import version
+from pathlib import Path
+import pandas as pd
+from .features import FeatureEngineering
+from .config import DATA_DIR
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+FEATURE_CACHE_DIR = DATA_DIR / "feature_cache"
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+
+# Indicators that accumulate from the first bar, so a tail computed from a warm-up window
+# is offset from the full-history value by a constant
+CUMULATIVE_FEATURES = ["OBV"]
+
+
+@lru_cache(maxsize=1)
+def feature_code_version() -> str:
+    """
+    Hash of the code that produces features, including the ta and pandas versions the indicators run on.
+    Label or trainer changes don't invalidate the cache.
+    """
+    sources = [inspect.getsource(FeatureEngineering.add_all_features)]
+    sources += [inspect.getsource(builder) for _, _, builder in FeatureEngineering.INDICATORS]
+    sources.append(repr([(outputs, requires) for outputs, requires, _ in FeatureEngineering.INDICATORS]))
+    sources.append(f"ta=={version('ta')} pandas=={pd.__version__}")
+    return hashlib.sha256("".join(sources).encode()).hexdigest()[:16]
+
+
+class FeatureCache:
+    """
+    Content-addressed on-disk cache of add_all_features results, stored as Parquet.
+
+    Entries are keyed by a hash of the OHLCV rows (with timestamps), the feature code version
+    and the requested feature set. When the input extends a cached input (new bars appended),
+    only the tail is computed from `warmup_bars` bars before the cached end and then appended.
+    Entries beyond `max_bytes` are evicted least recently used first.
+
+    Several processes may share the directory (e.g. BatchTrainer workers), so there is no shared index:
+    every entry has its own <key>.meta.json next to its Parquet file, and both are written to a
+    temporary file and moved into place with os.replace.
+    """
+
+    def __init__(self, cache_dir: Path = FEATURE_CACHE_DIR, max_bytes: int = 2 * 1024**3, warmup_bars: int = 500):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.warmup_bars = warmup_bars
+        self.stats = {"hits": 0, "partial_hits": 0, "misses": 0}
+
+        # Caches written before the per-entry metadata kept a single index.json
+        legacy_index = self.cache_dir / "index.json"
+        try:
+            for key, entry in json.loads(legacy_index.read_text()).items():
+                self._save_meta(key, entry)
+            legacy_index.unlink()
+        except FileNotFoundError:
+            pass
+
+    @property
+    def index(self) -> dict:
+        """Metadata of every entry by key, read from disk since other processes may change it."""
+        index = {}
+        for path in self.cache_dir.glob("*.meta.json"):
+            key = path.name[:-len(".meta.json")]
+            entry = self._load_meta(key)
+            if entry is not None:
+                index[key] = entry
+        return index
+
+    def get_or_compute(self, df: pd.DataFrame, features: list[str] | None = None) -> pd.DataFrame:
+        """Same result as FeatureEngineering.add_all_features(df, features), served from cache when possible."""
+        df = FeatureEngineering.ensure_datetime_index(df)
+        row_hashes = pd.util.hash_pandas_object(df[OHLCV], index=True).to_numpy()
+        params_key = self._params_key(features)
+        data_hash = self._digest(row_hashes)
+        key = hashlib.sha256(f"{params_key}:{data_hash}".encode()).hexdigest()[:32]
+
+        cached = self._read(key) if self._load_meta(key) is not None else None
+        if cached is not None:
+            self.stats["hits"] += 1
+            self._touch(key)
+            return cached
+
+        prefix = self._find_prefix(params_key, row_hashes)
+        prefix_cached = self._read(prefix[0]) if prefix is not None else None
+        if prefix_cached is not None:
+            self.stats["partial_hits"] += 1
+            result = self._extend(prefix_cached, df, prefix[1]["n_input"], features)
+            self._remove(prefix[0])
+        else:
+            self.stats["misses"] += 1
+            result = FeatureEngineering.add_all_features(df, features=features)
+
+        self._write(key, result, params_key, data_hash, len(df))
+        self._evict()
+        return result
+
+    def report(self) -> dict:
+        """Hit/miss counters plus current cache size."""
+        total = sum(self.stats.values())
+        index = self.index
+        report = {
+            **self.stats,
+            "hit_rate": (self.stats["hits"] + self.stats["partial_hits"]) / total if total else 0.0,
+            "entries": len(index),
+            "bytes": sum(entry["bytes"] for entry in index.values()),
+        }
+        logging.info(f"Feature cache: {report}")
+        return report
+
+    def _extend(self, cached: pd.DataFrame, df: pd.DataFrame, n_cached_input: int, features) -> pd.DataFrame:
+        """Computes features for the new bars only, starting warmup_bars before the cached end."""
+        start = max(0, n_cached_input - self.warmup_bars)
+        tail = FeatureEngineering.add_all_features(df.iloc[start:], features=features)
+
+        # Re-anchor cumulative indicators on a row both results share
+        overlap = cached.index.intersection(tail.index)
+        for col in CUMULATIVE_FEATURES:
+            if col in tail.columns and len(overlap):
+                anchor = overlap[-1]
+                tail[col] += cached.at[anchor, col] - tail.at[anchor, col]
+
+        new_rows = tail[tail.index > df.index[n_cached_input - 1]]
+        return pd.concat([cached, new_rows])
+
+    def _find_prefix(self, params_key: str, row_hashes) -> tuple[str, dict] | None:
+        """Returns the largest cached entry (key, metadata) whose input is a strict prefix of the current input."""
+        candidates = [
+            (entry["n_input"], key, entry) for key, entry in self.index.items()
+            if entry["params_key"] == params_key and entry["n_input"] < len(row_hashes)
+        ]
+        for n_input, key, entry in sorted(candidates, key=lambda c: c[:2], reverse=True):
+            if entry["data_hash"] == self._digest(row_hashes[:n_input]):
+                return key, entry
+        return None
+
+    def _params_key(self, features) -> str:
+        return hashlib.sha256(f"{feature_code_version()}:{features}".encode()).hexdigest()[:16]
+
+    def _digest(self, row_hashes) -> str:
+        return hashlib.sha256(row_hashes.tobytes()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.parquet"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.meta.json"
+
+    def _read(self, key: str) -> pd.DataFrame | None:
+        """The cached features, or None if another process evicted the entry meanwhile."""
+        try:
+            return pd.read_parquet(self._path(key))
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key: str, result: pd.DataFrame, params_key: str, data_hash: str, n_input: int):
+        path = self._path(key)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        result.to_parquet(tmp)
+        os.replace(tmp, path)
+        # Metadata last, so an entry is only visible once its data is in place
+        self._save_meta(key, {
+            "params_key": params_key,
+            "data_hash": data_hash,
+            "n_input": n_input,
+            "bytes": path.stat().st_size,
+            "last_access": time.time(),
+        })
+
+    def _touch(self, key: str):
+        entry = self._load_meta(key)
+        if entry is not None:
+            entry["last_access"] = time.time()
+            self._save_meta(key, entry)
+
+    def _remove(self, key: str):
+        self._meta_path(key).unlink(missing_ok=True)
+        self._path(key).unlink(missing_ok=True)
+
+    def _evict(self):
+        index = self.index
+        total = sum(entry["bytes"] for entry in index.values())
+        for key in sorted(index, key=lambda k: index[k]["last_access"]):
+            if total <= self.max_bytes or len(index) == 1:
+                break
+            total -= index.pop(key)["bytes"]
+            logging.info(f"Evicting feature cache entry {key}")
+            self._remove(key)
+
+    def _load_meta(self, key: str) -> dict | None:
+        try:
+            return json.loads(self._meta_path(key).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _save_meta(self, key: str, entry: dict):
+        path = self._meta_path(key)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(entry, indent=2))
+        os.replace(tmp, path)
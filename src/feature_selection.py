@@ -0,0 +1,103 @@
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from xgboost import XGBClassifier
+from sklearn.model_selection import TimeSeriesSplit
+from .features import FeatureEngineering
+from .config import FEATURE_MANIFEST_PATH
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+class FeatureSelector:
+    """
+    Chooses a reduced feature set from training folds only:
+    1. Averages XGBoost gain importance over TimeSeriesSplit training folds.
+    2. Walks features by importance and drops any too correlated with one already kept.
+    3. Keeps features until `importance_threshold` of the total importance is covered.
+    """
+    
+    def __init__(self, n_splits=5, corr_threshold=0.95, importance_threshold=0.95, max_features=None):
+        self.n_splits = n_splits
+        self.corr_threshold = corr_threshold
+        self.importance_threshold = importance_threshold
+        self.max_features = max_features
+        self.tscv = TimeSeriesSplit(n_splits=self.n_splits)
+        self.importance = {}
+        self.dropped_correlated = {}
+        self.selected_features = []
+        
+    def fit(self, X: pd.DataFrame, y: pd.Series) -> list[str]:
+        """Returns the selected features in get_feature_columns order."""
+        fold_importance = []
+        train_idx = None
+        
+        for train_idx, _ in self.tscv.split(X):
+            X_train, y_train = X.iloc[train_idx], y.iloc[train_idx]
+            model = XGBClassifier(
+                n_estimators=200, max_depth=4, learning_rate=0.1,
+                tree_method="hist", importance_type="gain", random_state=69
+            )
+            model.fit(X_train, y_train, verbose=False)
+            fold_importance.append(model.feature_importances_)
+            
+        importance = pd.Series(np.mean(fold_importance, axis=0), index=X.columns).fillna(0.0)
+        if importance.sum() > 0:
+            importance = importance / importance.sum()
+        self.importance = importance.to_dict()
+        
+        # Correlation on the largest training fold only, so the test tail never leaks in
+        corr = X.iloc[train_idx].corr().abs().fillna(0.0)
+        
+        kept, covered = [], 0.0
+        self.dropped_correlated = {}
+        for feature in importance.sort_values(ascending=False, kind="stable").index:
+            if covered >= self.importance_threshold or (self.max_features and len(kept) >= self.max_features):
+                break
+            twin = next((k for k in kept if corr.loc[feature, k] > self.corr_threshold), None)
+            if twin is not None:
+                self.dropped_correlated[feature] = twin
+                continue
+            kept.append(feature)
+            covered += importance[feature]
+            
+        order = FeatureEngineering.get_feature_columns()
+        self.selected_features = sorted(kept, key=lambda f: order.index(f) if f in order else len(order))
+        logging.info(f"Selected {len(self.selected_features)}/{X.shape[1]} features covering {covered:.1%} of importance.")
+        return self.selected_features
+    
+    def save_manifest(self, path: Path = FEATURE_MANIFEST_PATH) -> Path:
+        """Writes the selected features and the evidence behind them as JSON."""
+        if not self.selected_features:
+            raise RuntimeError("FeatureSelector must be fitted before saving a manifest.")
+        
+        manifest = {
+            "features": self.selected_features,
+            "importance": self.importance,
+            "dropped_correlated": self.dropped_correlated,
+            "corr_threshold": self.corr_threshold,
+            "importance_threshold": self.importance_threshold,
+            "created_utc": datetime.now(timezone.utc).isoformat(),
+        }
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(manifest, indent=2))
+        logging.info(f"Feature manifest saved to: {path}")
+        return path
+    
+    @staticmethod
+    def load_manifest(path: Path = FEATURE_MANIFEST_PATH) -> list[str]:
+        """Returns the manifest's features, to pass to add_all_features and split_labels_from_features."""
+        return json.loads(Path(path).read_text())["features"]
+    
+    @staticmethod
+    def active_features(path: Path = FEATURE_MANIFEST_PATH) -> list[str]:
+        """The manifest's features if one was saved, otherwise the full get_feature_columns set."""
+        path = Path(path)
+        return FeatureSelector.load_manifest(path) if path.exists() else FeatureEngineering.get_feature_columns()
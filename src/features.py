@@ -1,143 +1,280 @@
 import pandas as pd
 import numpy as np
 import ta
+from functools import lru_cache
+from numpy.lib.stride_tricks import sliding_window_view
+from .config import ATR_MULTIPLER, RISK_REWARD_RATIO
 import logging 
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class FeatureEngineering:
     
+    BASE_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+    
     @staticmethod
-    def add_all_features(df: pd.DataFrame) -> pd.DataFrame:
+    def add_all_features(df: pd.DataFrame, features: list[str] | None = None, mtf=None) -> pd.DataFrame:
         """
         Standardized class for adding technical indicators and signals.
         Ensures identical processing for training and live inference.
+        Pass `features` (e.g. a loaded feature manifest) to compute only those columns and their dependencies.
+        The subset still loses the warm-up rows of the full feature set, so both paths keep the same rows.
+        Pass a MultiTimeframeFeatures as `mtf` to attach higher-timeframe context (see mtf.feature_columns()).
         """
-        df = df.copy()
-        
-        # --- Ensure DatetimeIndex ---
-        if "Datetime" in df.columns:
-            df["Datetime"] = pd.to_datetime(df["Datetime"])
-            df = df.set_index("Datetime")
+        df = FeatureEngineering.ensure_datetime_index(df.copy())
         
         if len(df) < 30:
             raise ValueError(f"DataFrame has only {len(df)} rows. Not enough data to create features reliably.")
         
         # --- Add features ---
-        df = FeatureEngineering._add_basic_features(df)
-        df = FeatureEngineering._add_momentum_indicators(df)
-        df = FeatureEngineering._add_volume_indicators(df)
-        df = FeatureEngineering._add_volatility_indicators(df)
-        df = FeatureEngineering._add_trend_indicators(df)
-        df = FeatureEngineering._add_signals(df)
+        steps = FeatureEngineering.INDICATORS if features is None else FeatureEngineering.resolve_indicators(features)
+        for _, _, builder in steps:
+            builder(df)
+        if features is not None:
+            df = df.iloc[FeatureEngineering.full_warmup_bars():]
+        
+        if mtf is not None:
+            df = df.join(mtf.align(df))
         
         logging.info(f"Added features to DataFrame. Final shape: {df.shape}")
         
         # --- Final cleanup ---
         df.dropna(inplace=True)
         return df
+    
+    @staticmethod
+    def ensure_datetime_index(df: pd.DataFrame) -> pd.DataFrame:
+        """Moves a "Datetime" column (MT5 bars as loaded by DataLoader) to a DatetimeIndex, without modifying df."""
+        if "Datetime" in df.columns:
+            df = df.assign(Datetime=pd.to_datetime(df["Datetime"])).set_index("Datetime")
+        return df
+    
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def full_warmup_bars() -> int:
+        """Leading rows the full feature set leaves NaN (its longest indicator warm-up), measured on synthetic bars."""
+        rng = np.random.default_rng(69)
+        close = 1.0 + np.cumsum(rng.normal(0, 1e-3, 300))
+        df = pd.DataFrame(
+            {"Open": close, "High": close + 1e-3, "Low": close - 1e-3, "Close": close, "Volume": rng.uniform(100, 1000, 300)},
+            index=pd.date_range("2024-01-01", periods=300, freq="h"),
+        )
+        for _, _, builder in FeatureEngineering.INDICATORS:
+            builder(df)
+        return int(np.argmin(df[FeatureEngineering.get_feature_columns()].isna().any(axis=1).to_numpy()))
+    
+    @staticmethod
+    def resolve_indicators(features: list[str]) -> list[tuple]:
+        """
+        Returns the INDICATORS steps needed for `features`, including the indicators
+        they depend on (e.g. Signal_RSI needs RSI), in computation order.
+        """
+        known = set(FeatureEngineering.BASE_COLUMNS).union(*(outputs for outputs, _, _ in FeatureEngineering.INDICATORS))
+        unknown = [f for f in features if f not in known]
+        if unknown:
+            raise ValueError(f"Unknown feature columns: {unknown}")
+        
+        # Dependencies always come earlier in INDICATORS, so one reversed pass is enough
+        needed = set(features)
+        selected = []
+        for step in reversed(FeatureEngineering.INDICATORS):
+            outputs, requires, _ = step
+            if needed.intersection(outputs):
+                selected.append(step)
+                needed.update(requires)
+        return selected[::-1]
         
+    # --- Basic features ---
     @staticmethod
-    def _add_basic_features(df: pd.DataFrame) -> pd.DataFrame:
+    def _add_returns(df: pd.DataFrame):
         df["Returns"] = df["Close"].pct_change()
+
+    @staticmethod
+    def _add_range(df: pd.DataFrame):
         df["Range"] = (df["High"] / df["Low"]) - 1
+
+    @staticmethod
+    def _add_dow(df: pd.DataFrame):
         df["DOW"] = df.index.dayofweek
-        return df
     
+    # --- Momentum indicators ---
     @staticmethod
-    def _add_momentum_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    def _add_roc(df: pd.DataFrame):
         df["ROC"] = ta.momentum.ROCIndicator(df["Close"], window=12).roc()
+
+    @staticmethod
+    def _add_rsi(df: pd.DataFrame):
         df["RSI"] = ta.momentum.RSIIndicator(df["Close"], window=14).rsi()
+
+    @staticmethod
+    def _add_stoch(df: pd.DataFrame):
         df["STOCH"] = ta.momentum.StochasticOscillator(df["High"], df["Low"], df["Close"], window=14).stoch()
+
+    @staticmethod
+    def _add_vroc(df: pd.DataFrame):
         df["VROC"] = df["Volume"].pct_change(periods=14) * 100
-        return df
     
+    # --- Volume indicators ---
     @staticmethod
-    def _add_volume_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    def _add_cmf(df: pd.DataFrame):
         df["CMF"] = ta.volume.ChaikinMoneyFlowIndicator(df["High"], df["Low"], df["Close"], df["Volume"], window=20).chaikin_money_flow()
+
+    @staticmethod
+    def _add_mfi(df: pd.DataFrame):
         df["MFI"] = ta.volume.MFIIndicator(df["High"], df["Low"], df["Close"], df["Volume"], window=14).money_flow_index()
+
+    @staticmethod
+    def _add_obv(df: pd.DataFrame):
         df["OBV"] = ta.volume.OnBalanceVolumeIndicator(df["Close"], df["Volume"]).on_balance_volume()
+
+    @staticmethod
+    def _add_vwap(df: pd.DataFrame):
         df["VWAP"] = ta.volume.VolumeWeightedAveragePrice(df["High"], df["Low"], df["Close"], df["Volume"], window=14).volume_weighted_average_price()
-        return df
     
+    # --- Volatility indicators ---
     @staticmethod
-    def _add_volatility_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    def _add_atr(df: pd.DataFrame):
         df["ATR"] = ta.volatility.AverageTrueRange(df["High"], df["Low"], df["Close"], window=14).average_true_range()
+
+    @staticmethod
+    def _add_bollinger(df: pd.DataFrame):
         indicator_bb = ta.volatility.BollingerBands(df["Close"], window=20, window_dev=2)
         df["BB_upper"] = indicator_bb.bollinger_hband()
         df["BB_middle"] = indicator_bb.bollinger_mavg()
         df["BB_lower"] = indicator_bb.bollinger_lband()
+
+    @staticmethod
+    def _add_donchian(df: pd.DataFrame):
         indicator_donchian = ta.volatility.DonchianChannel(df["High"], df["Low"], df["Close"], window=20)
         df["Donchian_Upper"] = indicator_donchian.donchian_channel_hband()
         df["Donchian_Lower"] = indicator_donchian.donchian_channel_lband()
         df["Donchian_Middle"] = indicator_donchian.donchian_channel_mband()
-        return df
     
+    # --- Trend indicators ---
     @staticmethod
-    def _add_trend_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    def _add_adx(df: pd.DataFrame):
         adx = ta.trend.ADXIndicator(df["High"], df["Low"], df["Close"], window=14)
         df["ADX"] = adx.adx()
         df['DMP'] = adx.adx_pos()   # +DI
         df['DMN'] = adx.adx_neg()   # -DI
+
+    @staticmethod
+    def _add_cci(df: pd.DataFrame):
         df["CCI"] = ta.trend.CCIIndicator(df["High"], df["Low"], df["Close"], window=20).cci()
+
+    @staticmethod
+    def _add_ma_8(df: pd.DataFrame):
         df["MA_8"] = ta.trend.ema_indicator(df["Close"], window=8)
+
+    @staticmethod
+    def _add_ma_20(df: pd.DataFrame):
         df["MA_20"] = ta.trend.ema_indicator(df["Close"], window=20)
+
+    @staticmethod
+    def _add_ichimoku(df: pd.DataFrame):
         ichimoku = ta.trend.IchimokuIndicator(df["High"], df["Low"])
         df["Ichi_A"] = ichimoku.ichimoku_a()
         df["Ichi_B"] = ichimoku.ichimoku_b()
         df["Ichi_base"] = ichimoku.ichimoku_base_line()
-        df["MACD_Line"] = ta.trend.MACD(df["Close"]).macd()
-        df['Signal_Line'] = ta.trend.MACD(df['Close']).macd_signal()
-        return df
 
     @staticmethod
-    def _add_signals(df: pd.DataFrame) -> pd.DataFrame:
-        #MA Signal
+    def _add_macd(df: pd.DataFrame):
+        macd = ta.trend.MACD(df["Close"])
+        df["MACD_Line"] = macd.macd()
+        df['Signal_Line'] = macd.macd_signal()
+
+    # --- Signals ---
+    @staticmethod
+    def _add_signal_ma(df: pd.DataFrame):
         df.loc[df["MA_8"] > df["MA_20"], "Signal_MA"] = 1
         df.loc[df["MA_8"] <= df["MA_20"], "Signal_MA"] = 0
 
-        #Price Above / Below MA
+    @staticmethod
+    def _add_signal_price_above_ma(df: pd.DataFrame):
         df['Signal_Price_Above_MA'] = (df['Close'] > df['MA_20']).astype(int)
 
-        #MACD Signal
+    @staticmethod
+    def _add_signal_macd(df: pd.DataFrame):
         df.loc[df["MACD_Line"] > df["Signal_Line"], "Signal_MACD"] = 1
         df.loc[df["MACD_Line"] <= df["Signal_Line"], "Signal_MACD"] = 0
 
-        #RSI Signal
+    @staticmethod
+    def _add_signal_rsi(df: pd.DataFrame):
         df["Signal_RSI"] = 0 #nothing
         df.loc[df["RSI"] <= 30, "Signal_RSI"] = 1 #buy
         df.loc[df["RSI"] >= 70, "Signal_RSI"] = 2 #sell
 
-        #Bollinger Band Signal
+    @staticmethod
+    def _add_signal_bb(df: pd.DataFrame):
         df['Signal_BB'] = 0
         df.loc[df['Close'] <= df['BB_lower'], "Signal_BB"] = 1
         df.loc[df['Close'] >= df['BB_upper'], "Signal_BB"] = 2
 
-        #ATR Signal
+    @staticmethod
+    def _add_signal_atr(df: pd.DataFrame):
         df['Signal_ATR'] = (df['ATR'] >= df['ATR'].rolling(14).mean()).astype(int)
 
-        #On-Balance Volume Signal
+    @staticmethod
+    def _add_signal_obv(df: pd.DataFrame):
         df['Signal_OBV'] = (df['OBV'] >= df['OBV'].rolling(14).mean()).astype(int)
 
-        #MFI Signal
+    @staticmethod
+    def _add_signal_mfi(df: pd.DataFrame):
         df['Signal_MFI'] = 0
         df.loc[df["MFI"] <= 20 , "Signal_MFI"] = 1
         df.loc[df['MFI'] >= 80, "Signal_MFI"] = 2
 
-        ### VROC Signal
+    @staticmethod
+    def _add_signal_vroc(df: pd.DataFrame):
         df['Signal_VROC'] = (df['VROC'] >= df['VROC'].rolling(14).mean()).astype(int)
 
-        ###ADX Signal
+    @staticmethod
+    def _add_signal_adx(df: pd.DataFrame):
         df['Signal_ADX'] = 0
         trend_strong = df['ADX'] > 20
         df.loc[(df['DMP'] > df['DMN']) & trend_strong, 'Signal_ADX'] = 1 #BUY
         df.loc[(df['DMN'] >= df['DMP']) & trend_strong, 'Signal_ADX'] = 2 #SELL
 
-        #CCI Signal
+    @staticmethod
+    def _add_signal_cci(df: pd.DataFrame):
         df.loc[(df["CCI"] <= -100) | ((df["CCI"] > 0) & (df["CCI"] < 100)), "Signal_CCI"] = 1
         df.loc[(df["CCI"] >= 100) | ((df["CCI"] <= 0) & (df["CCI"] > -100)), "Signal_CCI"] = 0
-        
-        return df
+
+    # (outputs, required feature columns, builder), in computation order.
+    # Dependencies must be listed before the indicators that use them.
+    INDICATORS = [
+        (("Returns",), (), _add_returns),
+        (("Range",), (), _add_range),
+        (("DOW",), (), _add_dow),
+        (("ROC",), (), _add_roc),
+        (("RSI",), (), _add_rsi),
+        (("STOCH",), (), _add_stoch),
+        (("VROC",), (), _add_vroc),
+        (("CMF",), (), _add_cmf),
+        (("MFI",), (), _add_mfi),
+        (("OBV",), (), _add_obv),
+        (("VWAP",), (), _add_vwap),
+        (("ATR",), (), _add_atr),
+        (("BB_upper", "BB_middle", "BB_lower"), (), _add_bollinger),
+        (("Donchian_Upper", "Donchian_Lower", "Donchian_Middle"), (), _add_donchian),
+        (("ADX", "DMP", "DMN"), (), _add_adx),
+        (("CCI",), (), _add_cci),
+        (("MA_8",), (), _add_ma_8),
+        (("MA_20",), (), _add_ma_20),
+        (("Ichi_A", "Ichi_B", "Ichi_base"), (), _add_ichimoku),
+        (("MACD_Line", "Signal_Line"), (), _add_macd),
+        (("Signal_MA",), ("MA_8", "MA_20"), _add_signal_ma),
+        (("Signal_Price_Above_MA",), ("MA_20",), _add_signal_price_above_ma),
+        (("Signal_MACD",), ("MACD_Line", "Signal_Line"), _add_signal_macd),
+        (("Signal_RSI",), ("RSI",), _add_signal_rsi),
+        (("Signal_BB",), ("BB_upper", "BB_lower"), _add_signal_bb),
+        (("Signal_ATR",), ("ATR",), _add_signal_atr),
+        (("Signal_OBV",), ("OBV",), _add_signal_obv),
+        (("Signal_MFI",), ("MFI",), _add_signal_mfi),
+        (("Signal_VROC",), ("VROC",), _add_signal_vroc),
+        (("Signal_ADX",), ("ADX", "DMP", "DMN"), _add_signal_adx),
+        (("Signal_CCI",), ("CCI",), _add_signal_cci),
+    ]
 
     @staticmethod
     def get_feature_columns() -> list[str]:
@@ -163,19 +300,87 @@ class FeatureEngineering:
     def make_label(df: pd.DataFrame, horizon: int = 1) -> pd.DataFrame:
         """
         Create target column.
-        If next day close is higher Target=1, if lowwer Target=0.
+        If the close `horizon` bars ahead is higher Target=1, if lower Target=0.
+        The last `horizon` rows have no future close and get NaN; remove them with drop_unlabeled before training.
+        """
+        df = df.copy()
+        future = df["Close"].shift(-horizon)
+        df["Target"] = (future > df["Close"]).astype(float).where(future.notna())
+        return df
+
+    @staticmethod
+    def drop_unlabeled(df: pd.DataFrame, target="Target") -> pd.DataFrame:
+        """
+        Drops the rows whose target (or any of a list of targets) has no future data yet,
+        and casts the remaining labels back to int.
+        """
+        targets = [target] if isinstance(target, str) else list(target)
+        return df.dropna(subset=targets).astype({t: int for t in targets})
+
+    @staticmethod
+    def make_multi_horizon_labels(df: pd.DataFrame, horizons=(1, 3, 6, 12), barrier_horizon: int | None = 12) -> pd.DataFrame:
+        """
+        Create one direction target per horizon in a single pass ("Target_h{n}"),
+        plus an ATR triple-barrier target ("Target_TB") when barrier_horizon is set.
+        Target_h{n} matches make_label(df, horizon=n)["Target"], NaN included:
+        rows without a full future window are NaN, so drop_unlabeled(df, targets) removes them for every target.
         """
         df = df.copy()
-        df["Target"] = (df["Close"].shift(-1) > df["Close"]).astype(int)
+        close = df["Close"].to_numpy()
+        
+        # One shifted view per horizon, compared against the current close at once
+        horizons = list(horizons)
+        future = np.full((len(df), len(horizons)), np.nan)
+        for j, h in enumerate(horizons):
+            future[:-h or None, j] = close[h:]
+        labels = (future > close[:, None]).astype(float)
+        labels[np.isnan(future)] = np.nan
+        for j, h in enumerate(horizons):
+            df[f"Target_h{h}"] = labels[:, j]
+        
+        if barrier_horizon:
+            df["Target_TB"] = FeatureEngineering._triple_barrier_label(df, barrier_horizon)
         return df
 
     @staticmethod
-    def split_labels_from_features(df: pd.DataFrame):
+    def _triple_barrier_label(df: pd.DataFrame, horizon: int) -> np.ndarray:
+        """
+        Target_TB=1 if a long trade's TP is touched before its SL within `horizon` bars, else 0.
+        SL distance is ATR * ATR_MULTIPLER and TP distance is SL * RISK_REWARD_RATIO.
+        A bar touching both barriers counts as SL, and rows without a full window are NaN.
+        """
+        n = len(df)
+        labels = np.full(n, np.nan)
+        if n <= horizon:
+            return labels
+        
+        close = df["Close"].to_numpy()
+        sl_dist = df["ATR"].to_numpy() * ATR_MULTIPLER
+        upper = close + sl_dist * RISK_REWARD_RATIO
+        lower = close - sl_dist
+        
+        # Rows i..n-horizon-1 look at bars i+1..i+horizon
+        m = n - horizon
+        highs = sliding_window_view(df["High"].to_numpy()[1:], horizon)[:m]
+        lows = sliding_window_view(df["Low"].to_numpy()[1:], horizon)[:m]
+        hit_tp = highs >= upper[:m, None]
+        hit_sl = lows <= lower[:m, None]
+        
+        # First touch index per row, `horizon` when the barrier is never touched
+        first_tp = np.where(hit_tp.any(axis=1), hit_tp.argmax(axis=1), horizon)
+        first_sl = np.where(hit_sl.any(axis=1), hit_sl.argmax(axis=1), horizon)
+        labels[:m] = (first_tp < first_sl).astype(int)
+        return labels
+
+    @staticmethod
+    def split_labels_from_features(df: pd.DataFrame, target="Target", features: list[str] | None = None):
         """
         Separate features and target.
+        Pass a list of target columns to get a DataFrame of labels (multi-horizon training).
+        Pass `features` (a loaded feature manifest) to keep only the selected columns.
         """
-        X = df[FeatureEngineering.get_feature_columns()]
-        y = df["Target"]
+        X = df[features or FeatureEngineering.get_feature_columns()]
+        y = df[target]
         return X, y
 
 
@@ -1,10 +1,15 @@
-import mlflow
 import numpy as np
+import xgboost as xgb
 from xgboost import XGBClassifier
 from sklearn.model_selection import TimeSeriesSplit, ParameterSampler
 from sklearn.metrics import average_precision_score
 from .preprocessing import Preprocessor
+from .tracking import BatchedMLflowLogger
+from .search_checkpoint import SearchCheckpoint, search_fingerprint
+from .search_strategy import SearchStrategy, RandomSearch
 from collections import Counter
+from pathlib import Path
+import time
 import logging
 
 logging.basicConfig(
@@ -18,6 +23,9 @@ class ModelTrainer:
         self.n_splits = n_splits
         self.n_iter = n_iter
         self.tscv = TimeSeriesSplit(n_splits=self.n_splits)
+        self.n_estimators = 5000
+        self.early_stopping_rounds = 50
+        self.default_max_bin = 256
         self.base_params = {
             'objective': 'binary:logistic',
             'booster': 'gbtree',
@@ -32,10 +40,34 @@ class ModelTrainer:
         neg, pos = cnt.get(0, 0), cnt.get(1, 0)
         return (neg / max(1, pos)) if pos > 0 else 1.0
 
-    def cross_validate(self, X, y, params):
-        """Runs CV by fitting Preprocessor and Model independently per fold."""
-        fold_scores = []
+    def prepare_folds(self, X, y) -> list[dict]:
+        """
+        Fits the Preprocessor independently per fold and keeps the transformed arrays.
+        The folds only depend on the data, so they are shared by every candidate of a search.
+        """
+        return self._attach_labels(self._preprocess_folds(X), y)
 
+    def prepare_multi_horizon_folds(self, X, Y) -> dict[str, list[dict]]:
+        """
+        Preprocesses the folds once and labels them for every target column of Y.
+        All targets share the fold arrays and the quantile cuts of the first target.
+        """
+        base_folds = self._preprocess_folds(X)
+        folds_by_target = {}
+        
+        for target in Y.columns:
+            folds = self._attach_labels(base_folds, Y[target])
+            if folds_by_target:
+                first = next(iter(folds_by_target.values()))
+                for fold, ref_fold in zip(folds, first):
+                    fold["ref"] = ref_fold
+            folds_by_target[target] = folds
+            
+        return folds_by_target
+
+    def _preprocess_folds(self, X) -> list[dict]:
+        base_folds = []
+        
         for train_idx, test_idx in self.tscv.split(X):
             X_train_raw, X_test_raw = X.iloc[train_idx], X.iloc[test_idx]
             
@@ -43,41 +75,210 @@ class ModelTrainer:
             X_train_pca = preprocessor.fit_transform(X_train_raw)
             X_test_pca = preprocessor.transform(X_test_raw)
             
-            y_train = y.loc[X_train_pca.index].values.ravel()
-            y_test = y.loc[X_test_pca.index].values.ravel()
+            base_folds.append({
+                "X_train": X_train_pca.to_numpy(dtype=np.float32),
+                "X_test": X_test_pca.to_numpy(dtype=np.float32),
+                "train_index": X_train_pca.index,
+                "test_index": X_test_pca.index,
+            })
             
-            spw = self.compute_scale_pos_weight(y_train)
+        return base_folds
+
+    def _attach_labels(self, base_folds: list[dict], y) -> list[dict]:
+        folds = []
+        
+        for base in base_folds:
+            y_train = y.loc[base["train_index"]].values.ravel()
+            y_test = y.loc[base["test_index"]].values.ravel()
             
-            # Train model on PCA-transformed data
-            model = XGBClassifier(**self.base_params, **params, n_estimators=5000, early_stopping_rounds=50, scale_pos_weight=spw)
-            model.fit(
-                X_train_pca, y_train,
-                eval_set=[(X_test_pca, y_test)],
-                verbose=False
-            )
+            folds.append({
+                **base,
+                "y_train": y_train,
+                "y_test": y_test,
+                "spw": self.compute_scale_pos_weight(y_train),
+                "dmatrices": {},
+            })
             
-            score = average_precision_score(y_test, model.predict_proba(X_test_pca)[:, 1])
-            fold_scores.append(score)
+        return folds
+
+    def _get_dmatrices(self, fold: dict, max_bin: int):
+        """
+        Builds the QuantileDMatrix pair of a fold once per max_bin and caches it on the fold.
+        The validation matrix references the training one so both share the same quantile cuts.
+        Folds of secondary targets reuse the cuts of their reference fold instead of sketching again.
+        """
+        if max_bin not in fold["dmatrices"]:
+            ref = self._get_dmatrices(fold["ref"], max_bin)[0] if "ref" in fold else None
+            dtrain = xgb.QuantileDMatrix(fold["X_train"], label=fold["y_train"], max_bin=max_bin, ref=ref)
+            dvalid = xgb.QuantileDMatrix(fold["X_test"], label=fold["y_test"], max_bin=max_bin, ref=dtrain)
+            fold["dmatrices"][max_bin] = (dtrain, dvalid)
+        return fold["dmatrices"][max_bin]
+
+    def _score_fold(self, fold: dict, params: dict) -> float:
+        """Trains one fold through the native API with the same early stopping as XGBClassifier."""
+        max_bin = params.get("max_bin", self.default_max_bin)
+        dtrain, dvalid = self._get_dmatrices(fold, max_bin)
+        
+        train_params = {**self.base_params, **params, "max_bin": max_bin, "scale_pos_weight": fold["spw"]}
+        booster = xgb.train(
+            train_params, dtrain,
+            num_boost_round=self.n_estimators,
+            evals=[(dvalid, "validation_0")],
+            early_stopping_rounds=self.early_stopping_rounds,
+            verbose_eval=False
+        )
+        
+        # Predict on the raw matrix like XGBClassifier.predict_proba, up to the best iteration
+        proba = booster.inplace_predict(fold["X_test"], iteration_range=(0, booster.best_iteration + 1))
+        return average_precision_score(fold["y_test"], proba)
+
+    def score_folds(self, params, folds) -> tuple[list[float], list[float]]:
+        """Returns the AUPR and training time in seconds of every fold."""
+        fold_scores, fold_seconds = [], []
+        
+        for fold in folds:
+            start = time.perf_counter()
+            fold_scores.append(self._score_fold(fold, params))
+            fold_seconds.append(time.perf_counter() - start)
             
+        return fold_scores, fold_seconds
+
+    def cross_validate(self, X, y, params, folds=None):
+        """
+        Runs CV by fitting Preprocessor and Model independently per fold.
+        Pass the output of prepare_folds to reuse fold preprocessing and quantile sketches.
+        """
+        if folds is None:
+            folds = self.prepare_folds(X, y)
+
+        fold_scores, _ = self.score_folds(params, folds)
         return float(np.mean(fold_scores))
 
-    def run_experiment(self, X, y, param_grid):
-        """Logs every hyperparameter combination as a child run in MLflow."""
-        sampler = ParameterSampler(param_grid, n_iter=self.n_iter, random_state=69)
+    def fit_final_model(self, X, y, params) -> tuple[Preprocessor, XGBClassifier, float]:
+        """
+        Fits the Preprocessor and an XGBClassifier on all but the most recent 1/(n_splits+1) of the data,
+        which is held out for early stopping like a CV test fold.
+        Returns the preprocessor, the model and the AUPR on the held-out slice.
+        """
+        split = len(X) - len(X) // (self.n_splits + 1)
+        preprocessor = Preprocessor()
+        X_train = preprocessor.fit_transform(X.iloc[:split])
+        X_valid = preprocessor.transform(X.iloc[split:])
+        y_train = y.loc[X_train.index].values.ravel()
+        y_valid = y.loc[X_valid.index].values.ravel()
+
+        model = XGBClassifier(
+            **self.base_params, **params,
+            n_estimators=self.n_estimators,
+            early_stopping_rounds=self.early_stopping_rounds,
+            scale_pos_weight=self.compute_scale_pos_weight(y_train),
+        )
+        model.fit(X_train, y_train, eval_set=[(X_valid, y_valid)], verbose=False)
+        score = average_precision_score(y_valid, model.predict_proba(X_valid)[:, 1])
+        return preprocessor, model, float(score)
+
+    def run_experiment(self, X, y, param_grid, tracker: BatchedMLflowLogger | None = None,
+                       checkpoint_path: Path | None = None, strategy: SearchStrategy | None = None):
+        """
+        Logs every hyperparameter combination as a child run in MLflow.
+        Runs are buffered by a BatchedMLflowLogger and flushed before returning.
+        Candidates come from `strategy` (default: RandomSearch, the ParameterSampler draws with random_state=69),
+        e.g. TPESearch(param_grid, n_iter) for an adaptive search.
+        With `checkpoint_path`, the search state is saved after every candidate and a rerun with the same
+        path resumes it: completed candidates are replayed to the strategy instead of retrained,
+        and reconciled with their MLflow child runs. A checkpoint of other data, grid or settings is discarded.
+        """
+        strategy = strategy or RandomSearch(param_grid, n_iter=self.n_iter)
+        checkpoint = None
+        if checkpoint_path:
+            fingerprint = search_fingerprint(X, y, param_grid, self._search_settings(strategy))
+            checkpoint = SearchCheckpoint(checkpoint_path, fingerprint=fingerprint)
+        folds = None
+        owns_tracker = tracker is None
+        tracker = tracker or BatchedMLflowLogger()
         best_score = -np.inf
         best_params = None
         
-        for i, params in enumerate(sampler):
-            # Log each hyperparameter combination as a child run
-            with mlflow.start_run(run_name=f"XGB_CV_{i}", nested=True):
-                mean_aucpr = self.cross_validate(X, y, params)
+        try:
+            if checkpoint:
+                checkpoint.reconcile(tracker)
                 
-                mlflow.log_params(params)
-                mlflow.log_metric("mean_aucpr", mean_aucpr)
+            for i in range(strategy.n_iter):
+                params = strategy.ask()
+                record = checkpoint.lookup(i, params) if checkpoint else None
+                if record:
+                    mean_aucpr = record["mean_aucpr"]
+                else:
+                    # Folds are only built when something is left to train
+                    folds = folds or self.prepare_folds(X, y)
+                    fold_scores, fold_seconds = self.score_folds(params, folds)
+                    mean_aucpr = float(np.mean(fold_scores))
+                    
+                    # Log each hyperparameter combination as a child run
+                    tracker.log_child_run(
+                        f"XGB_CV_{i}", params,
+                        metrics={"mean_aucpr": mean_aucpr, "cv_seconds": sum(fold_seconds)},
+                        step_metrics={"fold_aucpr": fold_scores, "fold_seconds": fold_seconds},
+                    )
+                    if checkpoint:
+                        checkpoint.record(i, params, fold_scores, fold_seconds)
+                    logging.info(f"Completed run {i+1}/{strategy.n_iter} with AUPR: {mean_aucpr:.4f}")
                 
+                strategy.tell(params, mean_aucpr)
                 if mean_aucpr > best_score:
                     best_score = mean_aucpr
                     best_params = params
+        finally:
+            if owns_tracker:
+                tracker.close()
+            else:
+                tracker.flush()
+        return best_params
+
+    def _search_settings(self, strategy: SearchStrategy) -> dict:
+        """Settings that change the fold scores of a search (thread count and device don't)."""
+        return {
+            "strategy": type(strategy).__name__,
+            "n_iter": strategy.n_iter,
+            "n_splits": self.n_splits,
+            "n_estimators": self.n_estimators,
+            "early_stopping_rounds": self.early_stopping_rounds,
+            "base_params": {k: v for k, v in self.base_params.items() if k not in ("nthread", "device")},
+        }
+
+    def run_multi_horizon_experiment(self, X, Y, param_grid, tracker: BatchedMLflowLogger | None = None) -> dict:
+        """
+        Searches all target columns of Y (e.g. Target_h1, Target_h3, Target_TB) together.
+        Each candidate is one child run logging a mean_aucpr_<target> metric per target.
+        Returns the best params per target.
+        """
+        sampler = ParameterSampler(param_grid, n_iter=self.n_iter, random_state=69)
+        folds_by_target = self.prepare_multi_horizon_folds(X, Y)
+        owns_tracker = tracker is None
+        tracker = tracker or BatchedMLflowLogger()
+        best_scores = {target: -np.inf for target in folds_by_target}
+        best_params = {target: None for target in folds_by_target}
+        
+        try:
+            for i, params in enumerate(sampler):
+                metrics, step_metrics = {}, {}
+                
+                for target, folds in folds_by_target.items():
+                    fold_scores, fold_seconds = self.score_folds(params, folds)
+                    mean_aucpr = float(np.mean(fold_scores))
+                    metrics[f"mean_aucpr_{target}"] = mean_aucpr
+                    step_metrics[f"fold_aucpr_{target}"] = fold_scores
+                    step_metrics[f"fold_seconds_{target}"] = fold_seconds
                     
-            logging.info(f"Completed run {i+1}/{self.n_iter} with AUPR: {mean_aucpr:.4f}")
-        return best_params
\ No newline at end of file
+                    if mean_aucpr > best_scores[target]:
+                        best_scores[target] = mean_aucpr
+                        best_params[target] = params
+                        
+                tracker.log_child_run(f"XGB_CV_{i}", params, metrics=metrics, step_metrics=step_metrics)
+                logging.info(f"Completed run {i+1}/{self.n_iter} for {len(folds_by_target)} targets")
+        finally:
+            if owns_tracker:
+                tracker.close()
+            else:
+                tracker.flush()
+        return best_params
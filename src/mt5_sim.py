@@ -0,0 +1,689 @@
+import itertools
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from functools import wraps
+from pathlib import Path
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# ==========
+# MetaTrader5 constants (same values as the real package)
+# ==========
+TIMEFRAME_M1 = 1
+TIMEFRAME_M5 = 5
+TIMEFRAME_M15 = 15
+TIMEFRAME_M30 = 30
+TIMEFRAME_H1 = 16385
+TIMEFRAME_H4 = 16388
+TIMEFRAME_D1 = 16408
+
+COPY_TICKS_ALL = -1
+TICK_FLAG_BID = 2
+TICK_FLAG_ASK = 4
+
+TRADE_ACTION_DEAL = 1
+ORDER_TYPE_BUY = 0
+ORDER_TYPE_SELL = 1
+ORDER_TIME_GTC = 0
+ORDER_FILLING_IOC = 1
+
+TRADE_RETCODE_REJECT = 10006
+TRADE_RETCODE_DONE = 10009
+TRADE_RETCODE_INVALID_VOLUME = 10014
+TRADE_RETCODE_CONNECTION = 10031
+
+DEAL_ENTRY_IN = 0
+DEAL_ENTRY_OUT = 1
+DEAL_REASON_CLIENT = 0
+DEAL_REASON_EXPERT = 3
+DEAL_REASON_SL = 4
+DEAL_REASON_TP = 5
+DEAL_REASON_SO = 6
+
+RES_S_OK = 1
+RES_E_INVALID_PARAMS = -2
+RES_E_NOT_FOUND = -4
+RES_E_INTERNAL_FAIL_INIT = -10003
+RES_E_INTERNAL_FAIL_CONNECT = -10004
+RES_E_INTERNAL_FAIL_TIMEOUT = -10005
+
+TIMEFRAME_MINUTES = {
+    TIMEFRAME_M1: 1, TIMEFRAME_M5: 5, TIMEFRAME_M15: 15, TIMEFRAME_M30: 30,
+    TIMEFRAME_H1: 60, TIMEFRAME_H4: 240, TIMEFRAME_D1: 1440,
+}
+
+RATES_DTYPE = np.dtype([
+    ("time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8"),
+    ("tick_volume", "<i8"), ("spread", "<i4"), ("real_volume", "<i8"),
+])
+TICKS_DTYPE = np.dtype([
+    ("time", "<i8"), ("bid", "<f8"), ("ask", "<f8"), ("last", "<f8"), ("volume", "<u8"),
+    ("time_msc", "<i8"), ("flags", "<u4"), ("volume_real", "<f8"),
+])
+
+DEFAULT_SYMBOL_SPEC = {
+    "point": 0.00001, "digits": 5, "trade_contract_size": 100_000.0,
+    "trade_tick_size": 0.00001, "trade_tick_value": 1.0,
+    "volume_min": 0.01, "volume_max": 100.0, "volume_step": 0.01,
+    "currency_profit": "USD",
+}
+
+# Synthetic history starts here, so a given seed always yields the same bar at the same time
+SYNTHETIC_ANCHOR = int(datetime(2015, 1, 1, tzinfo=timezone.utc).timestamp())
+# Clock of a synthetic run without start_time, fixed so runs are reproducible
+DEFAULT_START_TIME = int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp())
+
+
+def _to_epoch(value) -> int:
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("UTC")
+    return int(ts.timestamp())
+
+
+class SyntheticSeries:
+    """
+    Seeded log-price random walk, generated lazily in fixed chunks of bars.
+
+    Chunk boundary levels come from one coarse walk, and each chunk is a Brownian bridge between
+    its two boundary levels with its own seed. Any bar range can be generated without
+    producing the bars before it, and the same seed always gives the same bars.
+    """
+
+    def __init__(self, symbol: str, minutes: int, seed: int, start_price: float = 1.10,
+                 volatility: float = 0.0008, digits: int = 5, chunk_bars: int = 1024):
+        self.period = minutes * 60
+        self.anchor = SYNTHETIC_ANCHOR
+        self.digits = digits
+        self.chunk_bars = chunk_bars
+        self.start_price = start_price
+        self.volatility = volatility * np.sqrt(minutes / 60)
+        self._seed = [seed, zlib.crc32(symbol.encode()), minutes]
+        self._coarse_rng = np.random.default_rng(self._seed)
+        self._levels = np.zeros(1)
+        self._chunks = {}
+
+    def index_at(self, t: int) -> int:
+        """Index of the bar open at time t (-1 before the first bar)."""
+        return (t - self.anchor) // self.period if t >= self.anchor else -1
+
+    def rows(self, i0: int, i1: int) -> np.ndarray:
+        i0 = max(i0, 0)
+        if i1 <= i0:
+            return np.empty(0, dtype=RATES_DTYPE)
+        chunks = range(i0 // self.chunk_bars, (i1 - 1) // self.chunk_bars + 1)
+        rates = np.concatenate([self._chunk(k) for k in chunks])
+        start = chunks[0] * self.chunk_bars
+        return rates[i0 - start:i1 - start]
+
+    def _chunk(self, k: int) -> np.ndarray:
+        if k in self._chunks:
+            return self._chunks[k]
+
+        if len(self._levels) < k + 2:
+            steps = self._coarse_rng.normal(0, self.volatility * np.sqrt(self.chunk_bars), k + 2 - len(self._levels))
+            self._levels = np.concatenate([self._levels, self._levels[-1] + np.cumsum(steps)])
+
+        n = self.chunk_bars
+        rng = np.random.default_rng(self._seed + [k])
+        walk = np.cumsum(rng.normal(0, self.volatility, n))
+        frac = np.arange(1, n + 1) / n
+        close = self._levels[k] + walk - frac * walk[-1] + frac * (self._levels[k + 1] - self._levels[k])
+        open_ = np.concatenate([[self._levels[k]], close[:-1]])
+        wicks = np.abs(rng.normal(0, self.volatility / 2, (2, n)))
+
+        rates = np.empty(n, dtype=RATES_DTYPE)
+        rates["time"] = self.anchor + (k * n + np.arange(n)) * self.period
+        price = lambda log_level: np.round(self.start_price * np.exp(log_level), self.digits)
+        rates["open"] = price(open_)
+        rates["close"] = price(close)
+        rates["high"] = price(np.maximum(open_, close) + wicks[0])
+        rates["low"] = price(np.minimum(open_, close) - wicks[1])
+        rates["tick_volume"] = rng.integers(50, 1500, n)
+        rates["spread"] = rng.integers(1, 4, n)
+        rates["real_volume"] = 0
+        self._chunks[k] = rates
+        return rates
+
+
+class ResampledSeries:
+    """Higher timeframe built from every `factor` bars of a gap-free base series."""
+
+    def __init__(self, base: SyntheticSeries, factor: int):
+        self.base = base
+        self.factor = factor
+        self.period = base.period * factor
+
+    def index_at(self, t: int) -> int:
+        i = self.base.index_at(t)
+        return i // self.factor if i >= 0 else -1
+
+    def rows(self, i0: int, i1: int) -> np.ndarray:
+        i0 = max(i0, 0)
+        if i1 <= i0:
+            return np.empty(0, dtype=RATES_DTYPE)
+        base = self.base.rows(i0 * self.factor, i1 * self.factor).reshape(-1, self.factor)
+        rates = np.empty(len(base), dtype=RATES_DTYPE)
+        rates["time"] = base["time"][:, 0]
+        rates["open"] = base["open"][:, 0]
+        rates["high"] = base["high"].max(axis=1)
+        rates["low"] = base["low"].min(axis=1)
+        rates["close"] = base["close"][:, -1]
+        rates["tick_volume"] = base["tick_volume"].sum(axis=1)
+        rates["spread"] = base["spread"][:, 0]
+        rates["real_volume"] = base["real_volume"].sum(axis=1)
+        return rates
+
+
+class RecordedSeries:
+    """Bars loaded from a CSV in the DataLoader.save_to_csv format (Datetime, OHLC, Volume, optional Spread)."""
+
+    def __init__(self, df: pd.DataFrame, minutes: int, default_spread: int = 1):
+        if "Datetime" in df.columns:
+            df = df.set_index("Datetime")
+        df.index = pd.to_datetime(df.index)
+        self.period = minutes * 60
+        self.rates = np.empty(len(df), dtype=RATES_DTYPE)
+        self.rates["time"] = (df.index - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+        for column, field in (("Open", "open"), ("High", "high"), ("Low", "low"), ("Close", "close"), ("Volume", "tick_volume")):
+            self.rates[field] = df[column].to_numpy()
+        self.rates["spread"] = df["Spread"].to_numpy() if "Spread" in df.columns else default_spread
+        self.rates["real_volume"] = 0
+
+    @classmethod
+    def from_csv(cls, path: Path, minutes: int) -> "RecordedSeries":
+        return cls(pd.read_csv(path), minutes)
+
+    def resample(self, minutes: int) -> "RecordedSeries":
+        df = pd.DataFrame(self.rates).set_index(pd.to_datetime(self.rates["time"], unit="s"))
+        bars = df.resample(f"{minutes}min", label="left", closed="left").agg({
+            "open": "first", "high": "max", "low": "min", "close": "last", "tick_volume": "sum", "spread": "first",
+        }).dropna()
+        bars = bars.rename(columns={"open": "Open", "high": "High", "low": "Low", "close": "Close",
+                                    "tick_volume": "Volume", "spread": "Spread"})
+        return RecordedSeries(bars, minutes)
+
+    def index_at(self, t: int) -> int:
+        return int(np.searchsorted(self.rates["time"], t, side="right")) - 1
+
+    def rows(self, i0: int, i1: int) -> np.ndarray:
+        return self.rates[max(i0, 0):max(i1, 0)].copy()
+
+
+def _api(on_failure=None, needs_connection=True):
+    """
+    Wraps a simulator call like the terminal IPC: adds latency, serializes state access,
+    and returns `on_failure` (with last_error set) on injected failures or disconnects.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if self.latency_ms:
+                time.sleep(self.latency_ms / 1000)
+            with self._lock:
+                if needs_connection and not self._check_connection():
+                    return on_failure
+                self._last_error = (RES_S_OK, "Success")
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class MT5Simulator:
+    """
+    Deterministic stand-in for a MetaTrader5 terminal, with the same call signatures and constants.
+
+    Bars come from a recorded CSV (for the first symbol) or a seeded synthetic walk. Timeframes
+    that are multiples of `timeframe` are aggregated from it, so all timeframes agree.
+    The clock starts at `start_time`, else at the last recorded bar, else at DEFAULT_START_TIME,
+    and only moves with advance()/set_time(). Like the terminal, calls return None and set
+    last_error() on bad arguments or missing data instead of raising. The current tick is the open of the base bar
+    containing the clock, and the bar containing the clock is cut there, like a forming bar. Open positions are closed at their SL/TP when the
+    bars passed over cross them (SL first when a bar crosses both).
+    Latency, random IPC failures and disconnects are injected from a seeded generator.
+    A disconnected terminal reconnects after `reconnect_after` calls, or on initialize().
+    """
+
+    def __init__(self, data_path: Path | None = None, timeframe: int = TIMEFRAME_H1, symbols=("EURUSD",),
+                 start_time=None, seed: int = 69, latency_ms: float = 0.0, failure_rate: float = 0.0,
+                 disconnect_rate: float = 0.0, reconnect_after: int = 3, reject_rate: float = 0.0,
+                 slippage_points: int = 0, balance: float = 10_000.0, leverage: int = 100):
+        self.timeframe = timeframe
+        self.symbols = {symbol: SimpleNamespace(name=symbol, **DEFAULT_SYMBOL_SPEC) for symbol in symbols}
+        self.seed = seed
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        self.disconnect_rate = disconnect_rate
+        self.reconnect_after = reconnect_after
+        self.reject_rate = reject_rate
+        self.slippage_points = slippage_points
+        self.balance = balance
+        self.leverage = leverage
+
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.RLock()
+        self._series = {}
+        self._recorded = {}
+        if data_path:
+            self._recorded[symbols[0]] = RecordedSeries.from_csv(data_path, TIMEFRAME_MINUTES[timeframe])
+
+        if start_time is not None:
+            self.clock = _to_epoch(start_time)
+        elif data_path:
+            self.clock = int(self._recorded[symbols[0]].rates["time"][-1])
+        else:
+            self.clock = DEFAULT_START_TIME
+
+        self.positions = {}
+        self.deals = []
+        self._tickets = itertools.count(1000)
+        self._initialized = False
+        self._connected = False
+        self._calls_disconnected = 0
+        self._login = 0
+        self._server = ""
+        self._last_error = (RES_S_OK, "Success")
+
+    def __getattr__(self, name):
+        # MT5 constants are reachable on the instance too, so it can be passed as a broker object
+        if name.isupper() and name in globals():
+            return globals()[name]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    # ==========
+    # Terminal and account
+    # ==========
+
+    @_api(on_failure=False, needs_connection=False)
+    def initialize(self, path=None, login=None, password=None, server=None, timeout=None, portable=False) -> bool:
+        if self._rng.random() < self.failure_rate:
+            self._last_error = (RES_E_INTERNAL_FAIL_INIT, "IPC initialize failed")
+            return False
+        self._initialized = True
+        self._connected = True
+        if login:
+            self._login, self._server = int(login), server or ""
+        return True
+
+    @_api(on_failure=False)
+    def login(self, login, password=None, server=None, timeout=None) -> bool:
+        self._login, self._server = int(login), server or ""
+        return True
+
+    @_api(needs_connection=False)
+    def shutdown(self):
+        self._initialized = False
+        self._connected = False
+
+    def last_error(self) -> tuple:
+        return self._last_error
+
+    @_api(needs_connection=False)
+    def version(self):
+        return (500, 5572, "simulator") if self._initialized else None
+
+    @_api(needs_connection=False)
+    def terminal_info(self):
+        if not self._initialized:
+            self._last_error = (RES_E_INTERNAL_FAIL_CONNECT, "No IPC connection")
+            return None
+        self._check_connection()
+        return SimpleNamespace(connected=self._connected, trade_allowed=True,
+                               name="MetaTrader 5 Simulator", path="", community_account=False)
+
+    @_api()
+    def account_info(self):
+        floating = sum(self._profit(p, self._exit_price(p)) for p in self.positions.values())
+        return SimpleNamespace(login=self._login, server=self._server, balance=round(self.balance, 2),
+                               equity=round(self.balance + floating, 2), profit=round(floating, 2),
+                               margin_free=round(self.balance + floating, 2), leverage=self.leverage,
+                               currency="USD", trade_allowed=True, name="Simulator")
+
+    # ==========
+    # Market data
+    # ==========
+
+    @_api()
+    def symbol_info(self, symbol):
+        if symbol not in self.symbols:
+            self._last_error = (RES_E_NOT_FOUND, f"Symbol {symbol} not found")
+            return None
+        bar = self._current_bar(symbol)
+        if bar is None:
+            return None
+        return SimpleNamespace(**vars(self.symbols[symbol]), spread=int(bar["spread"]), visible=True)
+
+    @_api(on_failure=False)
+    def symbol_select(self, symbol, enable=True) -> bool:
+        return symbol in self.symbols
+
+    @_api()
+    def symbol_info_tick(self, symbol):
+        if symbol not in self.symbols:
+            self._last_error = (RES_E_NOT_FOUND, f"Symbol {symbol} not found")
+            return None
+        tick = self._tick(symbol)
+        return SimpleNamespace(**tick) if tick is not None else None
+
+    @_api()
+    def copy_rates_from_pos(self, symbol, timeframe, start_pos, count):
+        series = self._get_series(symbol, timeframe)
+        if series is None:
+            return None
+        end = series.index_at(self.clock) - start_pos + 1
+        return self._clip_forming(symbol, series, series.rows(end - count, end))
+
+    @_api()
+    def copy_rates_from(self, symbol, timeframe, date_from, count):
+        series = self._get_series(symbol, timeframe)
+        date_from = self._epoch(date_from)
+        if series is None or date_from is None:
+            return None
+        end = series.index_at(min(date_from, self.clock)) + 1
+        return self._clip_forming(symbol, series, series.rows(end - count, end))
+
+    @_api()
+    def copy_rates_range(self, symbol, timeframe, date_from, date_to):
+        series = self._get_series(symbol, timeframe)
+        date_from, date_to = self._epoch(date_from), self._epoch(date_to)
+        if series is None or date_from is None or date_to is None:
+            return None
+        start = series.index_at(date_from - 1) + 1
+        end = series.index_at(min(date_to, self.clock)) + 1
+        return self._clip_forming(symbol, series, series.rows(start, end))
+
+    @_api()
+    def copy_ticks_range(self, symbol, date_from, date_to, flags=COPY_TICKS_ALL):
+        """Four ticks per base bar: open, low/high in path order, close."""
+        series = self._get_series(symbol, self.timeframe)
+        date_from, date_to = self._epoch(date_from), self._epoch(date_to)
+        if series is None or date_from is None or date_to is None:
+            return None
+        start = series.index_at(date_from - 1) + 1
+        end = series.index_at(min(date_to, self.clock)) + 1
+        rates = series.rows(start, end)
+
+        bullish = rates["close"] >= rates["open"]
+        path = np.stack([
+            rates["open"],
+            np.where(bullish, rates["low"], rates["high"]),
+            np.where(bullish, rates["high"], rates["low"]),
+            rates["close"],
+        ], axis=1).ravel()
+        offsets = np.arange(4) * series.period * 250  # quarter bar in milliseconds
+        time_msc = (rates["time"][:, None] * 1000 + offsets).ravel()
+
+        ticks = np.zeros(len(path), dtype=TICKS_DTYPE)
+        ticks["time_msc"] = time_msc
+        ticks["time"] = time_msc // 1000
+        ticks["bid"] = path
+        ticks["ask"] = np.round(path + np.repeat(rates["spread"], 4) * self.symbols[symbol].point, self.symbols[symbol].digits)
+        ticks["flags"] = TICK_FLAG_BID | TICK_FLAG_ASK
+        return ticks[(ticks["time"] >= date_from) & (ticks["time"] <= self.clock)]
+
+    # ==========
+    # Trading
+    # ==========
+
+    @_api()
+    def positions_get(self, symbol=None, ticket=None):
+        return tuple(
+            p for p in self.positions.values()
+            if (symbol is None or p.symbol == symbol) and (ticket is None or p.ticket == ticket)
+        )
+
+    @_api()
+    def history_deals_get(self, date_from=None, date_to=None, position=None, ticket=None):
+        start = _to_epoch(date_from) if date_from is not None else None
+        end = _to_epoch(date_to) if date_to is not None else None
+        return tuple(
+            d for d in self.deals
+            if (position is None or d.position_id == position) and (ticket is None or d.ticket == ticket)
+            and (start is None or d.time >= start) and (end is None or d.time <= end)
+        )
+
+    @_api()
+    def order_send(self, request):
+        """Market deals only. A request with "position" closes that position."""
+        symbol = request.get("symbol")
+        spec = self.symbols.get(symbol)
+        if spec is None:
+            self._last_error = (RES_E_INVALID_PARAMS, f"Symbol {symbol} not found")
+            return None
+
+        if self._rng.random() < self.reject_rate:
+            return self._result(TRADE_RETCODE_REJECT, request, comment="Request rejected")
+
+        volume = request["volume"]
+        steps = round(volume / spec.volume_step, 8)
+        if not spec.volume_min <= volume <= spec.volume_max or abs(steps - round(steps)) > 1e-6:
+            return self._result(TRADE_RETCODE_INVALID_VOLUME, request, comment="Invalid volume")
+
+        tick = self._tick(symbol)
+        if tick is None:
+            return None
+        is_buy = request["type"] == ORDER_TYPE_BUY
+        slip = self.slippage_points * spec.point
+        price = round(tick["ask"] + slip if is_buy else tick["bid"] - slip, spec.digits)
+
+        if request.get("position"):
+            position = self.positions.get(request["position"])
+            if position is None:
+                return self._result(TRADE_RETCODE_REJECT, request, comment="Position not found")
+            self._close(position, price, DEAL_REASON_EXPERT)
+            return self._result(TRADE_RETCODE_DONE, request, order=position.ticket, price=price, comment="Request executed")
+
+        ticket = next(self._tickets)
+        self.positions[ticket] = SimpleNamespace(
+            ticket=ticket, symbol=symbol, magic=request.get("magic", 0), type=request["type"], volume=volume,
+            price_open=price, sl=request.get("sl", 0.0), tp=request.get("tp", 0.0), time=self.clock,
+        )
+        self._add_deal(ticket, symbol, DEAL_ENTRY_IN, price, 0.0, DEAL_REASON_EXPERT)
+        return self._result(TRADE_RETCODE_DONE, request, order=ticket, price=price, comment="Request executed")
+
+    # ==========
+    # Simulation control
+    # ==========
+
+    def advance(self, bars: int = 1):
+        """Moves the clock forward by `bars` base bars, closing positions whose SL/TP is crossed."""
+        self.set_time(self.clock + bars * TIMEFRAME_MINUTES[self.timeframe] * 60)
+
+    def set_time(self, when):
+        with self._lock:
+            new_clock = _to_epoch(when)
+            for position in list(self.positions.values()):
+                self._check_stops(position, new_clock)
+            self.clock = max(self.clock, new_clock)
+
+    def disconnect(self):
+        """Drops the connection now, as a random disconnect would."""
+        with self._lock:
+            self._connected = False
+            self._calls_disconnected = 0
+
+    # ==========
+    # Internals
+    # ==========
+
+    def _check_connection(self) -> bool:
+        if not self._initialized:
+            self._last_error = (RES_E_INTERNAL_FAIL_CONNECT, "No IPC connection")
+            return False
+        if not self._connected:
+            self._calls_disconnected += 1
+            if self._calls_disconnected <= self.reconnect_after:
+                self._last_error = (RES_E_INTERNAL_FAIL_CONNECT, "No IPC connection")
+                return False
+            self._connected = True
+
+        draw = self._rng.random()
+        if draw < self.disconnect_rate:
+            self.disconnect()
+            self._last_error = (RES_E_INTERNAL_FAIL_CONNECT, "No IPC connection")
+            return False
+        if draw < self.disconnect_rate + self.failure_rate:
+            self._last_error = (RES_E_INTERNAL_FAIL_TIMEOUT, "IPC timeout")
+            return False
+        return True
+
+    def _get_series(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        if key in self._series:
+            return self._series[key]
+
+        base_minutes = TIMEFRAME_MINUTES[self.timeframe]
+        minutes = TIMEFRAME_MINUTES.get(timeframe)
+        if symbol not in self.symbols or minutes is None:
+            self._last_error = (RES_E_INVALID_PARAMS, f"Unknown symbol or timeframe: {symbol}, {timeframe}")
+            return None
+
+        if symbol in self._recorded:
+            recorded = self._recorded[symbol]
+            if minutes == base_minutes:
+                series = recorded
+            elif minutes > base_minutes and minutes % base_minutes == 0:
+                series = recorded.resample(minutes)
+            else:
+                self._last_error = (RES_E_NOT_FOUND, f"No recorded {symbol} data for timeframe {timeframe}")
+                return None
+        elif minutes > base_minutes and minutes % base_minutes == 0:
+            series = ResampledSeries(self._get_series(symbol, self.timeframe), minutes // base_minutes)
+        else:
+            # Lower timeframes are an independent walk of their own
+            spec = self.symbols[symbol]
+            series = SyntheticSeries(symbol, minutes, self.seed, digits=spec.digits)
+
+        self._series[key] = series
+        return series
+
+    def _epoch(self, value) -> int | None:
+        """_to_epoch, or None with last_error set when `value` is not a date."""
+        try:
+            return _to_epoch(value)
+        except (TypeError, ValueError):
+            self._last_error = (RES_E_INVALID_PARAMS, f"Invalid date {value!r}")
+            return None
+
+    def _current_bar(self, symbol) -> np.void | None:
+        """The base bar containing the clock, or None with last_error set when there is none."""
+        series = self._get_series(symbol, self.timeframe)
+        rows = series.rows(series.index_at(self.clock), series.index_at(self.clock) + 1)
+        if not len(rows):
+            self._last_error = (RES_E_NOT_FOUND, f"No {symbol} data at simulator time {self.clock}")
+            return None
+        return rows[0]
+
+    def _clip_forming(self, symbol, series, rates: np.ndarray) -> np.ndarray:
+        """Cuts the bar containing the clock at the clock, like the forming bar of a live terminal."""
+        if not len(rates) or not rates["time"][-1] <= self.clock < rates["time"][-1] + series.period:
+            return rates
+        base = self._get_series(symbol, self.timeframe)
+        now = base.index_at(self.clock)
+        done = base.rows(base.index_at(int(rates["time"][-1])), now)
+        price = base.rows(now, now + 1)["open"][0]
+
+        rates = rates.copy()
+        rates["high"][-1] = max(done["high"].max(initial=price), price)
+        rates["low"][-1] = min(done["low"].min(initial=price), price)
+        rates["close"][-1] = price
+        rates["tick_volume"][-1] = done["tick_volume"].sum() + 1
+        return rates
+
+    def _tick(self, symbol) -> dict | None:
+        bar = self._current_bar(symbol)
+        if bar is None:
+            return None
+        spec = self.symbols[symbol]
+        bid = float(bar["open"])
+        return {"time": self.clock, "time_msc": self.clock * 1000, "bid": bid,
+                "ask": round(bid + int(bar["spread"]) * spec.point, spec.digits), "last": 0.0, "volume": 0}
+
+    def _check_stops(self, position, new_clock: int):
+        """Walks the base bars between the clock and new_clock and closes the position at SL/TP."""
+        series = self._get_series(position.symbol, self.timeframe)
+        spec = self.symbols[position.symbol]
+        is_buy = position.type == ORDER_TYPE_BUY
+        for bar in series.rows(series.index_at(self.clock), series.index_at(new_clock)):
+            spread = int(bar["spread"]) * spec.point
+            low, high = (bar["low"], bar["high"]) if is_buy else (bar["low"] + spread, bar["high"] + spread)
+            hit_sl = position.sl and (low <= position.sl if is_buy else high >= position.sl)
+            hit_tp = position.tp and (high >= position.tp if is_buy else low <= position.tp)
+            if hit_sl or hit_tp:
+                self._close(position, position.sl if hit_sl else position.tp,
+                            DEAL_REASON_SL if hit_sl else DEAL_REASON_TP, when=int(bar["time"]))
+                return
+
+    def _exit_price(self, position) -> float:
+        tick = self._tick(position.symbol)
+        return tick["bid"] if position.type == ORDER_TYPE_BUY else tick["ask"]
+
+    def _profit(self, position, exit_price: float) -> float:
+        spec = self.symbols[position.symbol]
+        direction = 1 if position.type == ORDER_TYPE_BUY else -1
+        ticks = (exit_price - position.price_open) * direction / spec.trade_tick_size
+        return round(ticks * spec.trade_tick_value * position.volume, 2)
+
+    def _close(self, position, price: float, reason: int, when: int | None = None):
+        profit = self._profit(position, price)
+        self.balance += profit
+        self._add_deal(position.ticket, position.symbol, DEAL_ENTRY_OUT, price, profit, reason, when)
+        del self.positions[position.ticket]
+
+    def _add_deal(self, position_id, symbol, entry, price, profit, reason, when=None):
+        self.deals.append(SimpleNamespace(
+            ticket=next(self._tickets), position_id=position_id, symbol=symbol, entry=entry, price=price,
+            profit=profit, swap=0.0, commission=0.0, reason=reason, time=self.clock if when is None else when,
+        ))
+
+    def _result(self, retcode, request, order=0, price=0.0, comment=""):
+        volume = request["volume"] if retcode == TRADE_RETCODE_DONE else 0.0
+        return SimpleNamespace(retcode=retcode, order=order, deal=order, price=price, volume=volume,
+                               comment=comment, request=request)
+
+
+# ==========
+# Module-level API, so `from . import mt5_sim as mt5` works like `import MetaTrader5 as mt5`
+# ==========
+
+API = {
+    "initialize", "login", "shutdown", "last_error", "version", "terminal_info", "account_info",
+    "symbol_info", "symbol_select", "symbol_info_tick",
+    "copy_rates_from_pos", "copy_rates_from", "copy_rates_range", "copy_ticks_range",
+    "positions_get", "history_deals_get", "order_send",
+    "advance", "set_time", "disconnect",
+}
+
+_simulator = None
+
+
+def configure(**kwargs) -> MT5Simulator:
+    """Replaces the module's simulator. Takes the MT5Simulator arguments."""
+    global _simulator
+    _simulator = MT5Simulator(**kwargs)
+    return _simulator
+
+
+def simulator() -> MT5Simulator:
+    """The simulator behind the module functions, created with defaults on first use."""
+    global _simulator
+    if _simulator is None:
+        _simulator = MT5Simulator()
+    return _simulator
+
+
+def __getattr__(name):
+    if name in API:
+        return getattr(simulator(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
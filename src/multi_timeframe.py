@@ -0,0 +1,105 @@
+import pandas as pd
+from .features import FeatureEngineering
+from .config import SELECTED_TIMEFRAME, TIMEFRAME_MINUTES_MAP
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+OHLCV_AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+class MultiTimeframeFeatures:
+    """
+    Higher-timeframe context (e.g. H4, D1) derived by resampling the base series in memory.
+
+    Each higher-timeframe bar is only visible to base bars that close at or after it closes,
+    so there is no lookahead. The last `max_bars` completed bars and their indicators are stored.
+    In live mode, align() on the short ENTRY_HISTORY_BARS window only appends bars that completed
+    since the last call, and indicators are recomputed only when a new higher-timeframe bar appears.
+    Columns are named "<TF>_<feature>", e.g. "H4_RSI".
+    """
+
+    DEFAULT_FEATURES = ["Returns", "Range", "RSI", "ATR", "ADX", "MACD_Line", "Signal_MA"]
+
+    def __init__(self, timeframes=("H4", "D1"), base_timeframe: str = SELECTED_TIMEFRAME,
+                 features: list[str] | None = None, max_bars: int = 500):
+        base_minutes = TIMEFRAME_MINUTES_MAP[base_timeframe]
+        for tf in timeframes:
+            minutes = TIMEFRAME_MINUTES_MAP[tf]
+            if minutes <= base_minutes or minutes % base_minutes:
+                raise ValueError(f"{tf} is not a higher multiple of the base timeframe {base_timeframe}.")
+
+        self.timeframes = list(timeframes)
+        self.base_period = pd.Timedelta(minutes=base_minutes)
+        self.features = features or self.DEFAULT_FEATURES
+        self.steps = FeatureEngineering.resolve_indicators(self.features)
+        self.max_bars = max_bars
+        empty_index = pd.DatetimeIndex([])
+        self._bars = {tf: pd.DataFrame(columns=list(OHLCV_AGG), index=empty_index, dtype=float) for tf in self.timeframes}
+        self._values = {tf: pd.DataFrame(columns=self._columns(tf), index=empty_index, dtype=float) for tf in self.timeframes}
+
+    def feature_columns(self) -> list[str]:
+        return [col for tf in self.timeframes for col in self._columns(tf)]
+
+    def align(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Updates the stored higher-timeframe bars from `df` (DatetimeIndex of base bar open times)
+        and returns their features aligned to every base bar.
+        """
+        self.update(df)
+
+        # A base bar can see a higher-timeframe bar once the base bar itself has closed
+        base_close = pd.DataFrame({"available": df.index + self.base_period}, index=df.index)
+        aligned = []
+        for tf in self.timeframes:
+            values = self._values[tf]
+            merged = pd.merge_asof(
+                base_close, values, left_on="available", right_index=True, direction="backward"
+            )
+            aligned.append(merged[self._columns(tf)])
+        return pd.concat(aligned, axis=1).set_index(df.index)
+
+    def update(self, df: pd.DataFrame):
+        """Appends higher-timeframe bars completed within `df` and computes features for them."""
+        last_base_close = df.index[-1] + self.base_period
+
+        for tf in self.timeframes:
+            period = pd.Timedelta(minutes=TIMEFRAME_MINUTES_MAP[tf])
+            bars = df[list(OHLCV_AGG)].resample(period, label="left", closed="left").agg(OHLCV_AGG).dropna()
+
+            # Keep completed bars only. The first one is partial when df starts mid-bar
+            bars = bars[bars.index + period <= last_base_close]
+            if len(bars) and df.index[0] > bars.index[0]:
+                bars = bars.iloc[1:]
+
+            stored = self._bars[tf]
+            if len(stored):
+                bars = bars[bars.index > stored.index[-1]]
+            if bars.empty:
+                continue
+
+            # Indicators see every stored and new bar; max_bars only bounds what is kept for the next call
+            history = (pd.concat([stored, bars]) if len(stored) else bars).astype(float)
+            self._bars[tf] = history.iloc[-self.max_bars:]
+            new_values = self._compute(tf, history, period).loc[bars.index + period]
+            values = pd.concat([self._values[tf], new_values]) if len(self._values[tf]) else new_values
+
+            # Keep max_bars values, or more while bars of df still align to older ones
+            first_needed = values.index.searchsorted(df.index[0] + self.base_period, side="right") - 1
+            self._values[tf] = values.iloc[max(0, min(first_needed, len(values) - self.max_bars)):]
+
+    def _compute(self, tf: str, bars: pd.DataFrame, period: pd.Timedelta) -> pd.DataFrame:
+        """Runs the base indicator builders on the higher-timeframe bars, indexed by bar close time."""
+        htf = bars.copy()
+        for _, _, builder in self.steps:
+            builder(htf)
+        values = htf[self.features]
+        values.columns = self._columns(tf)
+        values.index = values.index + period
+        return values
+
+    def _columns(self, tf: str) -> list[str]:
+        return [f"{tf}_{feature}" for feature in self.features]
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+from .features import FeatureEngineering
+from .feature_selection import FeatureSelector
+from .config import ENTRY_HISTORY_BARS
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+class Replay:
+    """
+    Scores historical bars with a fitted Preprocessor and model.
+
+    score_bulk() is the research path: it featurizes the whole history once, transforms every row
+    in one matrix operation and scores every row in one model call.
+    score_live_windows() is the reference live path: each bar is featurized from its own
+    `window`-bar history, as fetch_live_data + add_all_features would do in production.
+    parity() compares the two on any set of bars.
+    Features default to the saved feature manifest (FeatureSelector.active_features), like training.
+    """
+
+    def __init__(self, preprocessor, model, features: list[str] | None = None):
+        self.preprocessor = preprocessor
+        self.model = model
+        self.features = features or FeatureSelector.active_features()
+
+    def score_bulk(self, df: pd.DataFrame, min_history: int | None = ENTRY_HISTORY_BARS) -> pd.DataFrame:
+        """
+        Probability per bar for the whole history.
+        Bars with fewer than `min_history` bars up to and including them are dropped,
+        because the live path never scores them (fetch_live_data always has a full window).
+        """
+        df_features = FeatureEngineering.add_all_features(df, features=self.features)
+        X = df_features[self.features]
+        X_pca = self.preprocessor.transform(X)
+        result = pd.DataFrame({"prob": self._predict(X_pca)}, index=X_pca.index)
+
+        if min_history:
+            bars = self._bar_index(df)
+            result = result[result.index >= bars[min(min_history, len(bars)) - 1]]
+        return result
+
+    def score_live_windows(self, df: pd.DataFrame, window: int | None = ENTRY_HISTORY_BARS, at=None) -> pd.DataFrame:
+        """
+        Scores each bar in `at` (all bars by default) from the `window` bars ending at it,
+        like the live loop. window=None uses every bar up to it (an expanding window).
+        Windows whose last row does not survive featurization are skipped, as live would skip them.
+        Featurization runs per window, but all rows are scored in a single model call.
+        """
+        df = FeatureEngineering.ensure_datetime_index(df)
+        positions = range(len(df)) if at is None else df.index.get_indexer(pd.Index(at))
+
+        rows = []
+        for pos in positions:
+            start = 0 if window is None else pos - window + 1
+            if start < 0:
+                continue
+            history = df.iloc[start:pos + 1]
+            try:
+                df_features = FeatureEngineering.add_all_features(history, features=self.features)
+                X_pca = self.preprocessor.transform(df_features[self.features])
+            except ValueError:
+                continue
+            if len(X_pca) and X_pca.index[-1] == df.index[pos]:
+                rows.append(X_pca.iloc[[-1]])
+
+        if not rows:
+            return pd.DataFrame(columns=["prob"])
+        X_live = pd.concat(rows)
+        return pd.DataFrame({"prob": self._predict(X_live)}, index=X_live.index)
+
+    def parity(self, df: pd.DataFrame, window: int | None = ENTRY_HISTORY_BARS, at=None) -> pd.DataFrame:
+        """
+        Bulk vs live probabilities on the bars both paths can score, with their absolute difference.
+        Bars only one path can score are listed with NaN on the other side.
+        """
+        bulk = self.score_bulk(df, min_history=window)
+        if at is not None:
+            bulk = bulk[bulk.index.isin(pd.Index(at))]
+        live = self.score_live_windows(df, window=window, at=bulk.index if at is None else at)
+
+        report = bulk.join(live, how="outer", lsuffix="_bulk", rsuffix="_live")
+        report["abs_diff"] = (report["prob_bulk"] - report["prob_live"]).abs()
+        logging.info(f"Replay parity over {len(report)} bars: max abs diff {report['abs_diff'].max():.2e}")
+        return report
+
+    def _predict(self, X: pd.DataFrame) -> np.ndarray:
+        proba = self.model.predict_proba(X.to_numpy() if not hasattr(self.model, "get_booster") else X)
+        return proba[:, 1] if proba.ndim == 2 else proba
+
+    def _bar_index(self, df: pd.DataFrame) -> pd.Index:
+        return FeatureEngineering.ensure_datetime_index(df).index
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import mlflow
+from mlflow import MlflowClient
+from .tracking import BatchedMLflowLogger
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+def _param_key(params: dict) -> dict:
+    """Params as MLflow stores them (strings), so checkpointed, sampled and logged values compare equal."""
+    return {k: str(v) for k, v in sorted(params.items())}
+
+
+def search_fingerprint(X, y, param_grid: dict, settings: dict) -> str:
+    """Hash of the training data, the grid and the search settings a checkpoint was written for."""
+    digest = hashlib.sha256()
+    for data in (X, y):
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    # scipy distributions have no stable repr, describe them by name and arguments
+    grid = {
+        name: f"{spec.dist.name}{spec.args}{sorted(spec.kwds.items())}" if hasattr(spec, "dist") else repr(list(spec))
+        for name, spec in sorted(param_grid.items())
+    }
+    digest.update(json.dumps([grid, settings], sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:32]
+
+
+class SearchCheckpoint:
+    """
+    Local JSON record of a hyperparameter search: every completed candidate with its params,
+    fold scores and the MLflow parent run it was logged under, plus the best candidate so far.
+
+    Candidates are proposed one at a time by a SearchStrategy, so the checkpoint is checked lazily with lookup():
+    a completed candidate whose params differ from the proposal belongs to another search and is refused.
+    The file is rewritten atomically after every candidate. A checkpoint whose `fingerprint`
+    (see search_fingerprint) differs from the current search is stale and discarded.
+    """
+
+    def __init__(self, path: Path, fingerprint: str | None = None):
+        self.path = Path(path)
+        self.fingerprint = fingerprint
+        self.completed = {}
+        self.experiment_id = None
+        self.parent_run_id = None
+        self._children = {}
+        self._tracking_uri = None
+
+        if self.path.exists():
+            state = json.loads(self.path.read_text())
+            if state.get("fingerprint") != fingerprint:
+                logging.warning(f"Discarding search checkpoint {self.path}: written for other data or search settings")
+                self.discard()
+                return
+            self.completed = {int(i): record for i, record in state["completed"].items()}
+            self.experiment_id = state.get("experiment_id")
+            self.parent_run_id = state.get("parent_run_id")
+            logging.info(f"Resuming search from {self.path}: {len(self.completed)} candidates done")
+
+    def lookup(self, i: int, params: dict) -> dict | None:
+        """
+        Completed record of candidate i, or None if it still has to be trained.
+        A child run written to MLflow but not checkpointed yet (crash before the checkpoint) is adopted
+        without retraining.
+        """
+        if i in self.completed:
+            if self.completed[i]["params"] != _param_key(params):
+                raise ValueError(f"Checkpoint {self.path} was written for a different search (candidate {i}).")
+            return self.completed[i]
+
+        run = self._children.get(i)
+        if run is None or run.data.params != _param_key(params):
+            return None
+        client = MlflowClient(tracking_uri=self._tracking_uri)
+        history = {
+            key: [m.value for m in sorted(client.get_metric_history(run.info.run_id, key), key=lambda m: m.step)]
+            for key in ("fold_aucpr", "fold_seconds")
+        }
+        if not history["fold_aucpr"]:
+            return None
+        self.completed[i] = {
+            "params": _param_key(params),
+            "fold_aucpr": history["fold_aucpr"],
+            "fold_seconds": history["fold_seconds"],
+            "mean_aucpr": run.data.metrics["mean_aucpr"],
+            "parent_run_id": run.data.tags["mlflow.parentRunId"],
+        }
+        self._save()
+        logging.info(f"Adopted MLflow run XGB_CV_{i} into the search checkpoint")
+        return self.completed[i]
+
+    def record(self, i: int, params: dict, fold_scores: list[float], fold_seconds: list[float]):
+        """Stores a finished candidate and the active MLflow run it was logged under."""
+        active = mlflow.active_run()
+        if active:
+            self.experiment_id, self.parent_run_id = active.info.experiment_id, active.info.run_id
+        self.completed[i] = {
+            "params": _param_key(params),
+            "fold_aucpr": [float(s) for s in fold_scores],
+            "fold_seconds": [float(s) for s in fold_seconds],
+            # Same reduction as run_experiment, so a resumed search tells the strategy bit-identical scores
+            "mean_aucpr": float(np.mean(fold_scores)),
+            "parent_run_id": self.parent_run_id,
+        }
+        self._save()
+
+    def discard(self):
+        """Deletes the checkpoint file, e.g. once the search it records is done."""
+        self.path.unlink(missing_ok=True)
+        self.completed = {}
+
+    def best(self) -> tuple[int | None, float]:
+        """Index and mean AUPR of the best completed candidate (the first one on ties)."""
+        best_index, best_score = None, float("-inf")
+        for i in sorted(self.completed):
+            if self.completed[i]["mean_aucpr"] > best_score:
+                best_index, best_score = i, self.completed[i]["mean_aucpr"]
+        return best_index, best_score
+
+    def reconcile(self, tracker: BatchedMLflowLogger):
+        """
+        Brings the checkpoint and the MLflow child runs of its parent run back in sync after a crash.
+        Candidates checkpointed but never written to MLflow (still queued at the crash) are logged again.
+        Child runs missing from the checkpoint are kept for lookup(), which adopts them once their params are known.
+        """
+        self._tracking_uri = tracker.tracking_uri
+        children = self._child_runs(tracker.tracking_uri)
+        if children is None:
+            # Without the MLflow side, re-logging would duplicate every run already written
+            logging.warning("Could not read MLflow runs to reconcile the search. Using the checkpoint only.")
+            self._children = {}
+            return
+        self._children = children
+
+        relogged = 0
+        active = mlflow.active_run()
+        if active:
+            self.experiment_id, self.parent_run_id = active.info.experiment_id, active.info.run_id
+        for i, record in self.completed.items():
+            if i not in self._children:
+                record["parent_run_id"] = active.info.run_id if active else None
+                tracker.log_child_run(
+                    f"XGB_CV_{i}", record["params"],
+                    metrics={"mean_aucpr": record["mean_aucpr"], "cv_seconds": sum(record["fold_seconds"])},
+                    step_metrics={"fold_aucpr": record["fold_aucpr"], "fold_seconds": record["fold_seconds"]},
+                )
+                relogged += 1
+
+        if relogged:
+            self._save()
+            logging.info(f"Reconciled search with MLflow: {relogged} runs logged again")
+
+    def _child_runs(self, tracking_uri: str) -> dict | None:
+        """
+        Finished XGB_CV_<i> child runs of every parent run the checkpoint has logged under, by candidate index.
+        None if the tracking store could not be read.
+        """
+        parents = {record.get("parent_run_id") for record in self.completed.values()} | {self.parent_run_id}
+        parents.discard(None)
+        children = {}
+        if self.experiment_id is None:
+            return children
+        try:
+            client = MlflowClient(tracking_uri=tracking_uri)
+            for parent in parents:
+                page_token = None
+                while True:
+                    runs = client.search_runs(
+                        [self.experiment_id], page_token=page_token,
+                        filter_string=f"tags.mlflow.parentRunId = '{parent}' and attributes.status = 'FINISHED'",
+                    )
+                    for run in runs:
+                        name = run.info.run_name or ""
+                        if name.startswith("XGB_CV_") and name[len("XGB_CV_"):].isdigit():
+                            children[int(name[len("XGB_CV_"):])] = run
+                    page_token = runs.token
+                    if not page_token:
+                        break
+        except Exception as e:
+            logging.warning(f"Reading MLflow child runs failed: {e}")
+            return None
+        return children
+
+    def _save(self):
+        best_index, best_score = self.best()
+        state = {
+            "fingerprint": self.fingerprint,
+            "experiment_id": self.experiment_id,
+            "parent_run_id": self.parent_run_id,
+            "completed": {str(i): record for i, record in sorted(self.completed.items())},
+            "best": {"index": best_index, "mean_aucpr": best_score if best_index is not None else None},
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state, indent=2))
+        tmp.replace(self.path)
@@ -0,0 +1,173 @@
+from abc import ABC, abstractmethod
+import numpy as np
+from scipy import stats
+from sklearn.model_selection import ParameterSampler, ParameterGrid
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+class SearchStrategy(ABC):
+    """
+    Proposes hyperparameter candidates one at a time for ModelTrainer.run_experiment.
+
+    The trainer calls ask() for candidate i, evaluates it and reports the mean AUPR with tell().
+    A strategy must be deterministic for a given seed and told history: a resumed search replays the
+    checkpointed scores through tell() and expects the same candidates from ask().
+    """
+
+    n_iter: int
+
+    @abstractmethod
+    def ask(self) -> dict:
+        """Next candidate to evaluate."""
+
+    def tell(self, params: dict, score: float):
+        pass
+
+
+class RandomSearch(SearchStrategy):
+    """The ParameterSampler draws run_experiment has always used (random_state=69)."""
+
+    def __init__(self, param_grid: dict, n_iter: int = 50, random_state: int = 69):
+        self.candidates = list(ParameterSampler(param_grid, n_iter=n_iter, random_state=random_state))
+        self.n_iter = len(self.candidates)
+        self._asked = 0
+
+    def ask(self) -> dict:
+        params = self.candidates[self._asked]
+        self._asked += 1
+        return params
+
+
+class _Dimension:
+    """
+    One hyperparameter mapped to the unit interval, where TPE fits its densities.
+    Numeric lists are ordinal (option j sits at the centre of the j-th of k equal cells),
+    scipy distributions go through their cdf/ppf, other lists are categorical.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        if hasattr(spec, "rvs"):
+            self.kind = "dist"
+            self.discrete = isinstance(spec.dist, stats.rv_discrete)
+            self.min_bandwidth = 0.03
+        else:
+            self.options = list(spec)
+            numeric = all(isinstance(v, (int, float, np.number)) and not isinstance(v, bool) for v in self.options)
+            self.kind = "ordinal" if numeric else "categorical"
+            if numeric:
+                self.options = sorted(self.options)
+            self.min_bandwidth = 0.5 / len(self.options)
+
+    def to_unit(self, value) -> float:
+        if self.kind == "dist":
+            return float(self.spec.cdf(value))
+        k = len(self.options)
+        return (self.options.index(value) + 0.5) / k
+
+    def from_unit(self, u: float):
+        if self.kind == "dist":
+            value = self.spec.ppf(np.clip(u, 1e-9, 1 - 1e-9))
+            return int(value) if self.discrete else float(value)
+        return self.options[min(int(u * len(self.options)), len(self.options) - 1)]
+
+    def log_density(self, values: list, points: list, bandwidth: float) -> np.ndarray:
+        """Parzen density at `values` from kernels at `points` plus one uniform prior component."""
+        if self.kind == "categorical":
+            counts = np.array([sum(p == o for p in points) for o in self.options], dtype=float)
+            probs = (counts + 1) / (len(points) + len(self.options))
+            return np.log([probs[self.options.index(v)] for v in values])
+
+        u = np.array([self.to_unit(v) for v in values])[:, None]
+        centers = np.array([self.to_unit(p) for p in points])[None, :]
+        # Kernels are normals truncated to [0, 1]
+        mass = stats.norm.cdf((1 - centers) / bandwidth) - stats.norm.cdf(-centers / bandwidth)
+        kernels = stats.norm.pdf((u - centers) / bandwidth) / (bandwidth * mass)
+        return np.log((1.0 + kernels.sum(axis=1)) / (len(points) + 1))
+
+    def sample(self, points: list, bandwidth: float, size: int, rng: np.random.Generator) -> list:
+        """Draws from the same mixture as log_density."""
+        if self.kind == "categorical":
+            counts = np.array([sum(p == o for p in points) for o in self.options], dtype=float)
+            probs = (counts + 1) / (len(points) + len(self.options))
+            return [self.options[j] for j in rng.choice(len(self.options), size=size, p=probs)]
+
+        centers = np.array([self.to_unit(p) for p in points])
+        component = rng.integers(0, len(points) + 1, size=size)
+        u = rng.uniform(size=size)
+        from_kernel = component < len(points)
+        if from_kernel.any():
+            mu = centers[component[from_kernel]]
+            u[from_kernel] = stats.truncnorm.rvs(
+                -mu / bandwidth, (1 - mu) / bandwidth, loc=mu, scale=bandwidth, random_state=rng
+            )
+        return [self.from_unit(x) for x in u]
+
+
+class TPESearch(SearchStrategy):
+    """
+    Tree-structured Parzen Estimator, implemented locally.
+
+    The first `n_startup` candidates are the RandomSearch draws. After that the told candidates are split
+    into the best `gamma` fraction and the rest, a Parzen density is fitted to each per hyperparameter,
+    and the next candidate is the one of `n_candidates` draws from the good density with the highest
+    good/bad density ratio (the expected-improvement criterion of TPE). Already evaluated
+    combinations are never proposed twice.
+    """
+
+    def __init__(self, param_grid: dict, n_iter: int = 50, n_startup: int = 10, gamma: float = 0.25,
+                 n_candidates: int = 24, random_state: int = 69):
+        self.dimensions = {name: _Dimension(spec) for name, spec in sorted(param_grid.items())}
+        if all(dim.kind != "dist" for dim in self.dimensions.values()):
+            n_iter = min(n_iter, len(ParameterGrid(param_grid)))
+        self.n_iter = n_iter
+        self.gamma = gamma
+        self.n_candidates = n_candidates
+        self.startup = RandomSearch(param_grid, n_iter=min(n_startup, n_iter), random_state=random_state)
+        self.rng = np.random.default_rng(random_state)
+        self.history = []
+
+    def ask(self) -> dict:
+        if self.startup._asked < self.startup.n_iter:
+            return self.startup.ask()
+
+        ranked = sorted(self.history, key=lambda h: -h[1] if np.isfinite(h[1]) else np.inf)
+        n_good = max(1, int(np.ceil(self.gamma * len(ranked))))
+        good = [params for params, _ in ranked[:n_good]]
+        bad = [params for params, _ in ranked[n_good:]] or good
+
+        names = list(self.dimensions)
+        columns, score = {}, np.zeros(self.n_candidates)
+        for name, dim in self.dimensions.items():
+            good_points, bad_points = [p[name] for p in good], [p[name] for p in bad]
+            columns[name] = dim.sample(good_points, self._bandwidth(dim, len(good)), self.n_candidates, self.rng)
+            score += dim.log_density(columns[name], good_points, self._bandwidth(dim, len(good)))
+            score -= dim.log_density(columns[name], bad_points, self._bandwidth(dim, len(bad)))
+
+        seen = {self._key(params) for params, _ in self.history}
+        for j in np.argsort(-score, kind="stable"):
+            params = {name: columns[name][j] for name in names}
+            if self._key(params) not in seen:
+                return params
+        return self._unseen_random(seen) or {name: columns[name][int(np.argmax(score))] for name in names}
+
+    def tell(self, params: dict, score: float):
+        self.history.append((params, float(score)))
+
+    def _bandwidth(self, dim: _Dimension, n_points: int) -> float:
+        return max(dim.min_bandwidth, 0.25 * n_points ** (-1 / 5))
+
+    def _unseen_random(self, seen: set, tries: int = 100) -> dict | None:
+        for _ in range(tries):
+            params = {name: dim.sample([], 1.0, 1, self.rng)[0] for name, dim in self.dimensions.items()}
+            if self._key(params) not in seen:
+                return params
+        return None
+
+    def _key(self, params: dict) -> tuple:
+        return tuple(str(params[name]) for name in self.dimensions)
@@ -0,0 +1,196 @@
+import atexit
+import queue
+import socket
+import threading
+import time
+from urllib.parse import urlparse
+import mlflow
+from mlflow import MlflowClient
+from mlflow.entities import Metric, Param
+from mlflow.tracking import fluent
+from .config import LOG_DIR, MLFLOW_TRACKING_URI
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# SQLite rather than a file:// store, which MLflow 3 refuses unless MLFLOW_ALLOW_FILE_STORE is set
+FALLBACK_TRACKING_URI = f"sqlite:///{(LOG_DIR / 'mlflow.db').absolute().as_posix()}"
+
+# MLflow log_batch limits per request
+MAX_PARAMS_PER_BATCH = 100
+MAX_METRICS_PER_BATCH = 1000
+
+
+def is_server_reachable(uri: str, timeout: float = 2.0) -> bool:
+    """Cheap TCP check of an http(s) tracking server. Local URIs are always reachable."""
+    parsed = urlparse(uri)
+    if parsed.scheme not in ("http", "https"):
+        return True
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    try:
+        with socket.create_connection((parsed.hostname, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def resolve_tracking_uri(uri: str = MLFLOW_TRACKING_URI, fallback_uri: str = FALLBACK_TRACKING_URI) -> str:
+    """Returns `uri` if its server answers, otherwise the local SQLite store under LOG_DIR."""
+    if is_server_reachable(uri):
+        return uri
+    logging.warning(f"MLflow server {uri} unreachable. Falling back to local store {fallback_uri}")
+    return fallback_uri
+
+
+class BatchedMLflowLogger:
+    """
+    Buffers child runs (params + metrics) and writes them with log_batch on a background thread,
+    so the search loop never waits on the tracking server.
+    If the server fails mid-search, pending runs are written to the local fallback store instead,
+    under a mirror of their experiment and parent run.
+    Everything still queued is flushed at close() or interpreter exit.
+    """
+
+    def __init__(self, tracking_uri: str | None = None, fallback_uri: str = FALLBACK_TRACKING_URI):
+        self.tracking_uri = tracking_uri or mlflow.get_tracking_uri()
+        self.fallback_uri = fallback_uri
+        self.client = MlflowClient(tracking_uri=self.tracking_uri)
+        self.using_fallback = False
+        self._experiment_names = {}
+        self._fallback_experiments = {}
+        self._fallback_parents = {}
+        self._queue = queue.Queue()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="mlflow-batch-logger", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def log_child_run(self, run_name: str, params: dict, metrics: dict, step_metrics: dict | None = None):
+        """
+        Queues one nested run under the currently active MLflow run.
+        `step_metrics` maps a metric name to a list of values logged with step=position (e.g. per-fold scores).
+        """
+        if self._closed:
+            raise RuntimeError("BatchedMLflowLogger is closed.")
+
+        active = mlflow.active_run()
+        timestamp = int(time.time() * 1000)
+        record = {
+            "run_name": run_name,
+            # Without an active run, the experiment set by mlflow.set_experiment (or the environment)
+            "experiment_id": active.info.experiment_id if active else fluent._get_experiment_id(),
+            "parent_run_id": active.info.run_id if active else None,
+            "parent_run_name": active.info.run_name if active else None,
+            "params": [Param(k, str(v)) for k, v in params.items()],
+            "metrics": [Metric(k, float(v), timestamp, 0) for k, v in metrics.items()],
+        }
+        for key, values in (step_metrics or {}).items():
+            record["metrics"] += [Metric(key, float(v), timestamp, step) for step, v in enumerate(values)]
+        self._queue.put(record)
+
+    def flush(self):
+        """Blocks until every queued run has been written."""
+        self._queue.join()
+
+    def close(self):
+        """Flushes and stops the background thread. Safe to call more than once."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join()
+        atexit.unregister(self.close)
+        for run_id in self._fallback_parents.values():
+            try:
+                self.client.set_terminated(run_id)
+            except Exception as e:
+                logging.warning(f"Could not close mirrored parent run {run_id}: {e}")
+
+    def _run(self):
+        while True:
+            record = self._queue.get()
+            try:
+                if record is None:
+                    return
+                self._write(record)
+            except Exception as e:
+                logging.error(f"Dropped MLflow run {record['run_name']}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, record: dict):
+        if not self.using_fallback:
+            try:
+                self._remember_experiment(record["experiment_id"])
+                self._write_to(self.client, record, record["experiment_id"], record["parent_run_id"])
+                return
+            except Exception as e:
+                logging.warning(f"MLflow logging to {self.tracking_uri} failed ({e}). Switching to {self.fallback_uri}")
+                self._switch_to_fallback()
+
+        experiment_id = self._fallback_experiment(record["experiment_id"])
+        self._write_to(self.client, record, experiment_id, self._fallback_parent(record, experiment_id))
+
+    def _remember_experiment(self, experiment_id: str):
+        """Caches the experiment name while the server answers, so the fallback can mirror it after a failure."""
+        if experiment_id not in self._experiment_names:
+            self._experiment_names[experiment_id] = self.client.get_experiment(experiment_id).name
+
+    def _switch_to_fallback(self):
+        """Every later run goes to the fallback store, without retrying the failed server first."""
+        self.client = MlflowClient(tracking_uri=self.fallback_uri)
+        self.using_fallback = True
+
+    def _fallback_experiment(self, experiment_id: str) -> str:
+        """Id of the experiment with the same name in the fallback store, created if needed."""
+        if experiment_id not in self._fallback_experiments:
+            name = self._experiment_names.get(experiment_id, "Default")
+            experiment = self.client.get_experiment_by_name(name)
+            self._fallback_experiments[experiment_id] = (
+                experiment.experiment_id if experiment else self.client.create_experiment(name)
+            )
+        return self._fallback_experiments[experiment_id]
+
+    def _fallback_parent(self, record: dict, experiment_id: str) -> str | None:
+        """Mirror of the parent run in the fallback store, so child runs stay nested."""
+        parent_run_id = record["parent_run_id"]
+        if parent_run_id is None:
+            return None
+        if parent_run_id not in self._fallback_parents:
+            run = self.client.create_run(
+                experiment_id, tags={"primary_run_id": parent_run_id}, run_name=record["parent_run_name"]
+            )
+            self._fallback_parents[parent_run_id] = run.info.run_id
+        return self._fallback_parents[parent_run_id]
+
+    def _write_to(self, client: MlflowClient, record: dict, experiment_id: str, parent_run_id: str | None):
+        tags = {"mlflow.parentRunId": parent_run_id} if parent_run_id else {}
+        run = client.create_run(experiment_id, tags=tags, run_name=record["run_name"])
+        run_id = run.info.run_id
+
+        params, metrics = record["params"], record["metrics"]
+        n_batches = max(-(-len(params) // MAX_PARAMS_PER_BATCH), -(-len(metrics) // MAX_METRICS_PER_BATCH), 1)
+        try:
+            for b in range(n_batches):
+                client.log_batch(
+                    run_id,
+                    metrics=metrics[b * MAX_METRICS_PER_BATCH:(b + 1) * MAX_METRICS_PER_BATCH],
+                    params=params[b * MAX_PARAMS_PER_BATCH:(b + 1) * MAX_PARAMS_PER_BATCH],
+                )
+        except Exception:
+            # Don't leave a half-written run RUNNING next to the copy the fallback is about to write
+            try:
+                client.set_terminated(run_id, "FAILED")
+            except Exception:
+                pass
+            raise
+        client.set_terminated(run_id)
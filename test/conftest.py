@@ -24,6 +24,26 @@ def mock_data_factory():
     
     return _create_mock_data
 
+@pytest.fixture(scope="session")
+def random_walk_bars():
+    """
+    Factory fixture for seeded random-walk OHLCV bars with a Datetime column, one bar per hour.
+    The same seed is used on every call, so a given number of rows always yields the same bars.
+    """
+    def _create_bars(rows=500):
+        rng = np.random.default_rng(69)
+        close = 1.1 + np.cumsum(rng.normal(0, 0.001, rows))
+        return pd.DataFrame({
+            "Datetime": pd.date_range("2024-01-01", periods=rows, freq="h"),
+            "Open": close - rng.normal(0, 0.0003, rows),
+            "High": close + np.abs(rng.normal(0, 0.001, rows)),
+            "Low": close - np.abs(rng.normal(0, 0.001, rows)),
+            "Close": close,
+            "Volume": rng.integers(100, 1000, rows),
+        })
+    
+    return _create_bars
+
 @pytest.fixture(scope="session")
 def connection():
     """
@@ -0,0 +1,109 @@
+import itertools
+import threading
+import time
+from types import SimpleNamespace
+
+
+class FakeBroker:
+    """
+    In-memory stand-in for the MetaTrader5 trading API used by OrderExecutor.
+    Fills market orders with fixed slippage and latency, and closes positions
+    on SL/TP when set_price() moves the market through them.
+    """
+    TRADE_ACTION_DEAL = 1
+    ORDER_TYPE_BUY = 0
+    ORDER_TYPE_SELL = 1
+    ORDER_TIME_GTC = 0
+    ORDER_FILLING_IOC = 1
+    TRADE_RETCODE_DONE = 10009
+    TRADE_RETCODE_REJECT = 10006
+    DEAL_ENTRY_IN = 0
+    DEAL_ENTRY_OUT = 1
+    DEAL_REASON_CLIENT = 0
+    DEAL_REASON_EXPERT = 3
+    DEAL_REASON_SL = 4
+    DEAL_REASON_TP = 5
+    DEAL_REASON_SO = 6
+
+    def __init__(self, symbol="EURUSD", bid=1.10000, spread_points=1, point=0.00001,
+                 slippage_points=0, latency=0.0, reject=False):
+        self.symbol = symbol
+        self.point = point
+        self.slippage_points = slippage_points
+        self.latency = latency
+        self.reject = reject
+        self.positions = {}
+        self.deals = []
+        self.requests = []
+        self._tickets = itertools.count(1000)
+        self._lock = threading.Lock()
+        self.set_price(bid, spread_points)
+
+    def symbol_info(self, symbol):
+        return SimpleNamespace(name=symbol, point=self.point, digits=5)
+
+    def symbol_info_tick(self, symbol):
+        return SimpleNamespace(bid=self.bid, ask=self.ask, time=int(time.time()))
+
+    def positions_get(self, symbol=None):
+        with self._lock:
+            return tuple(p for p in self.positions.values() if symbol is None or p.symbol == symbol)
+
+    def history_deals_get(self, position=None):
+        with self._lock:
+            return tuple(d for d in self.deals if d.position_id == position)
+
+    def last_error(self):
+        return (1, "fake error")
+
+    def order_send(self, request):
+        time.sleep(self.latency)
+        self.requests.append(request)
+        if self.reject:
+            return SimpleNamespace(retcode=self.TRADE_RETCODE_REJECT, order=0, price=0.0, volume=0.0, comment="rejected")
+
+        is_buy = request["type"] == self.ORDER_TYPE_BUY
+        slip = self.slippage_points * self.point
+        price = round(request["price"] + slip if is_buy else request["price"] - slip, 5)
+        with self._lock:
+            ticket = next(self._tickets)
+            self.positions[ticket] = SimpleNamespace(
+                ticket=ticket, symbol=request["symbol"], magic=request["magic"], type=request["type"],
+                volume=request["volume"], price_open=price, sl=request["sl"], tp=request["tp"], time=int(time.time()),
+            )
+            self._add_deal(ticket, self.DEAL_ENTRY_IN, price, 0.0, self.DEAL_REASON_EXPERT)
+        return SimpleNamespace(retcode=self.TRADE_RETCODE_DONE, order=ticket, price=price,
+                               volume=request["volume"], comment="done")
+
+    def open_external_position(self, magic, type=0, volume=0.1):
+        """Simulates a position opened outside the executor (e.g. before a restart)."""
+        with self._lock:
+            ticket = next(self._tickets)
+            self.positions[ticket] = SimpleNamespace(
+                ticket=ticket, symbol=self.symbol, magic=magic, type=type, volume=volume,
+                price_open=self.ask, sl=0.0, tp=0.0, time=int(time.time()),
+            )
+        return ticket
+
+    def set_price(self, bid, spread_points=1):
+        """Moves the market and closes every position whose SL or TP was crossed."""
+        self.bid = round(bid, 5)
+        self.ask = round(bid + spread_points * self.point, 5)
+        with self._lock:
+            for ticket, p in list(self.positions.items()):
+                is_buy = p.type == self.ORDER_TYPE_BUY
+                exit_price = self.bid if is_buy else self.ask
+                hit_sl = p.sl and (exit_price <= p.sl if is_buy else exit_price >= p.sl)
+                hit_tp = p.tp and (exit_price >= p.tp if is_buy else exit_price <= p.tp)
+                if hit_sl or hit_tp:
+                    direction = 1 if is_buy else -1
+                    profit = round((exit_price - p.price_open) * direction * p.volume * 100_000, 2)
+                    self._add_deal(ticket, self.DEAL_ENTRY_OUT, exit_price, profit,
+                                   self.DEAL_REASON_SL if hit_sl else self.DEAL_REASON_TP)
+                    del self.positions[ticket]
+
+    def _add_deal(self, ticket, entry, price, profit, reason):
+        self.deals.append(SimpleNamespace(
+            position_id=ticket, entry=entry, price=price, profit=profit,
+            swap=0.0, commission=0.0, reason=reason, time=int(time.time()),
+        ))
@@ -0,0 +1,107 @@
+import pytest
+import json
+import joblib
+import mlflow
+from xgboost import XGBClassifier
+from src.config import TIMEFRAMES
+from src.data_loader import DataProcessor
+from src.mt5_sim import MT5Simulator
+from src.feature_selection import FeatureSelector
+from src.batch_training import BatchTrainer, experiment_name, job_paths, train_years
+
+PARAM_GRID = {"max_depth": [2, 3], "learning_rate": [0.1]}
+JOBS = [{"symbol": "EURUSD", "timeframe": "H1"}, {"symbol": "GBPUSD", "timeframe": "H4"}]
+
+def simulated_data(symbol, timeframe, years):
+    """Job data source backed by the MT5 simulator (module level so worker processes can load it)."""
+    sim = MT5Simulator(timeframe=TIMEFRAMES[timeframe], symbols=(symbol,), start_time="2024-06-03")
+    sim.initialize()
+    return DataProcessor.clean_data(sim.copy_rates_from_pos(symbol, TIMEFRAMES[timeframe], 1, 300))
+
+def failing_data(symbol, timeframe, years):
+    raise RuntimeError(f"no data for {symbol}")
+
+@pytest.fixture
+def make_trainer(tmp_path):
+    def _make(data_fn=simulated_data, jobs=JOBS, select_features=False):
+        return BatchTrainer(jobs, PARAM_GRID, max_workers=2, cores=2, n_iter=2, n_splits=2,
+                            output_dir=tmp_path / "batch", tracking_uri=(tmp_path / "mlruns").as_uri(),
+                            device="cpu", data_fn=data_fn, select_features=select_features)
+    return _make
+
+def test_cpu_budget_enforced():
+    with pytest.raises(ValueError, match="exceeds the 4 cores budget"):
+        BatchTrainer(JOBS, PARAM_GRID, max_workers=2, threads_per_job=3, cores=4)
+    
+    trainer = BatchTrainer(JOBS * 4, PARAM_GRID, cores=8)
+    assert trainer.max_workers * trainer.threads_per_job <= 8
+
+def test_train_years_matches_config_rule():
+    assert train_years("H1") == 5
+    assert train_years("M5") == pytest.approx(0.42)
+    assert train_years("M1") == 0.2
+
+def test_batch_trains_jobs_in_their_own_namespace(make_trainer, tmp_path):
+    state = make_trainer().run()
+    
+    for job in JOBS:
+        result = state[f"{job['symbol']}_{job['timeframe']}"]
+        paths = job_paths(job, tmp_path / "batch")
+        assert result["status"] == "done"
+        assert result["threads"] == 1
+        assert json.loads(paths["train_info"].read_text())["best_params"] == result["best_params"]
+        assert not paths["search_checkpoint"].exists()
+        
+        model = XGBClassifier()
+        model.load_model(paths["model"])
+        assert joblib.load(paths["preprocessor"]).is_fitted
+        
+        mlflow.set_tracking_uri((tmp_path / "mlruns").as_uri())
+        experiment = mlflow.get_experiment_by_name(experiment_name(job))
+        # 1 parent run + 2 candidates per job
+        assert len(mlflow.search_runs(experiment_ids=[experiment.experiment_id])) == 3
+
+def test_failed_jobs_are_checkpointed_and_retried(make_trainer):
+    state = make_trainer(data_fn=failing_data).run()
+    assert {result["status"] for result in state.values()} == {"failed"}
+    assert "no data" in state["EURUSD_H1"]["error"]
+    
+    # A new trainer reads the checkpoint: failed jobs are pending again
+    trainer = make_trainer(jobs=JOBS[:1])
+    assert trainer.pending_jobs() == JOBS[:1]
+    assert trainer.run()["EURUSD_H1"]["status"] == "done"
+
+def test_resume_skips_completed_jobs(make_trainer):
+    make_trainer(jobs=JOBS[:1]).run()
+    
+    # The completed job would fail if it ran again
+    trainer = make_trainer(data_fn=failing_data)
+    assert trainer.pending_jobs() == JOBS[1:]
+    state = trainer.run()
+    assert state["EURUSD_H1"]["status"] == "done"
+    assert state["GBPUSD_H4"]["status"] == "failed"
+
+def test_fresh_run_drops_search_checkpoints(make_trainer, tmp_path):
+    checkpoint = job_paths(JOBS[0], tmp_path / "batch")["search_checkpoint"]
+    checkpoint.parent.mkdir(parents=True)
+    checkpoint.write_text("{}")
+    
+    make_trainer(data_fn=failing_data, jobs=JOBS[:1]).run(resume=False)
+    assert not checkpoint.exists()
+
+def test_feature_manifest_is_applied(make_trainer, tmp_path):
+    paths = job_paths(JOBS[0], tmp_path / "batch")
+    paths["dir"].mkdir(parents=True)
+    paths["feature_manifest"].write_text(json.dumps({"features": ["RSI", "ATR", "MACD_Line", "Returns"]}))
+    
+    make_trainer(jobs=JOBS[:1]).run()
+    assert json.loads(paths["train_info"].read_text())["features"] == ["RSI", "ATR", "MACD_Line", "Returns"]
+    assert joblib.load(paths["preprocessor"]).feature_cols == ["RSI", "ATR", "MACD_Line", "Returns"]
+
+def test_select_features_saves_the_manifest(make_trainer, tmp_path):
+    paths = job_paths(JOBS[0], tmp_path / "batch")
+    
+    make_trainer(jobs=JOBS[:1], select_features=True).run()
+    selected = FeatureSelector.load_manifest(paths["feature_manifest"])
+    assert json.loads(paths["train_info"].read_text())["features"] == selected
+    assert joblib.load(paths["preprocessor"]).feature_cols == selected
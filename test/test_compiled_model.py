@@ -0,0 +1,96 @@
+import pytest
+import numpy as np
+import pandas as pd
+from xgboost import XGBClassifier
+from src.preprocessing import Preprocessor
+from src.compiled_model import CompiledModel
+
+@pytest.fixture(scope="module")
+def fitted_pipeline():
+    """Preprocessor + early-stopped XGBClassifier on a noisy random-walk dataset."""
+    rng = np.random.default_rng(69)
+    rows = 800
+    X = pd.DataFrame({
+        "Trend": np.cumsum(rng.normal(size=rows)),
+        "Noise": rng.normal(size=rows),
+        "Signal": rng.normal(size=rows),
+        "Other": rng.normal(size=rows),
+    }, index=pd.date_range("2024-01-01", periods=rows, freq="h"))
+    y = pd.Series((X["Signal"] + 0.3 * rng.normal(size=rows) > 0).astype(int), index=X.index)
+    
+    preprocessor = Preprocessor(n_components=3)
+    X_pca = preprocessor.fit_transform(X.iloc[:600])
+    X_valid = preprocessor.transform(X.iloc[600:])
+    model = XGBClassifier(n_estimators=300, max_depth=4, learning_rate=0.1, early_stopping_rounds=20,
+                          eval_metric="aucpr", tree_method="hist", random_state=69)
+    model.fit(X_pca, y.loc[X_pca.index], eval_set=[(X_valid, y.loc[X_valid.index])], verbose=False)
+    return X, preprocessor, model
+
+def test_parity_with_predict_proba(fitted_pipeline):
+    X, preprocessor, model = fitted_pipeline
+    X_pca = preprocessor.transform(X)
+    compiled = CompiledModel.from_booster(model)
+    
+    expected = model.predict_proba(X_pca)[:, 1]
+    np.testing.assert_allclose(compiled.predict_proba(X_pca.to_numpy()), expected, rtol=1e-5, atol=1e-6)
+
+def test_fused_preprocessor_parity(fitted_pipeline):
+    X, preprocessor, model = fitted_pipeline
+    compiled = CompiledModel.from_booster(model, preprocessor)
+    
+    pd.testing.assert_frame_equal(compiled.transform(X), preprocessor.transform(X), rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(compiled.transform(X.to_numpy()), preprocessor.transform(X).to_numpy(), rtol=1e-9, atol=1e-9)
+    expected = model.predict_proba(preprocessor.transform(X))[:, 1]
+    np.testing.assert_allclose(compiled.predict_proba_raw(X), expected, rtol=1e-5, atol=1e-6)
+
+def test_nan_rows_match_preprocessor(fitted_pipeline):
+    """Rows with NaN, in a feature or in an extra column, are dropped exactly like Preprocessor.transform."""
+    X, preprocessor, model = fitted_pipeline
+    X = X.assign(Extra=0.0)
+    X.iloc[[5, 40, 41], 0] = np.nan
+    X.iloc[[90, 300], 2] = np.nan
+    X.iloc[[500], -1] = np.nan
+    compiled = CompiledModel.from_booster(model, preprocessor)
+    
+    reference = preprocessor.transform(X)
+    pd.testing.assert_frame_equal(compiled.transform(X), reference, rtol=1e-9, atol=1e-9)
+    proba = compiled.predict_proba_raw(X)
+    assert proba.index.equals(reference.index)
+    np.testing.assert_allclose(proba, model.predict_proba(reference)[:, 1], rtol=1e-5, atol=1e-6)
+    
+    # Same rows through the NumPy walk used for live calls
+    live = np.concatenate([compiled.predict_proba(reference.iloc[i:i + 1]) for i in range(0, len(reference), 37)])
+    np.testing.assert_allclose(live, proba.iloc[::37], rtol=1e-5, atol=1e-6)
+
+def test_batches_use_the_booster(fitted_pipeline, mocker):
+    X, preprocessor, model = fitted_pipeline
+    X_pca = preprocessor.transform(X).to_numpy()
+    compiled = CompiledModel.from_booster(model)
+    walk = mocker.spy(compiled, "_walk")
+    
+    batch = compiled.predict_proba(X_pca)
+    assert walk.call_count == 0
+    single = compiled.predict_proba(X_pca[:1])
+    assert walk.call_count == 1
+    np.testing.assert_allclose(batch[:1], single, rtol=1e-5, atol=1e-6)
+
+def test_missing_values_follow_default_direction(fitted_pipeline):
+    X, preprocessor, model = fitted_pipeline
+    X_pca = preprocessor.transform(X).to_numpy()[:50]
+    X_pca[::3, 0] = np.nan
+    compiled = CompiledModel.from_booster(model)
+    compiled.MAX_WALK_ROWS = len(X_pca)
+    
+    np.testing.assert_allclose(compiled.predict_proba(X_pca), model.predict_proba(X_pca)[:, 1], rtol=1e-5, atol=1e-6)
+
+def test_save_and_load(fitted_pipeline, tmp_path):
+    X, preprocessor, model = fitted_pipeline
+    compiled = CompiledModel.from_booster(model, preprocessor)
+    
+    loaded = CompiledModel.load(compiled.save(tmp_path / "model.npz"))
+    
+    np.testing.assert_array_equal(loaded.predict_proba_raw(X), compiled.predict_proba_raw(X))
+    # Without the embedded booster, batches fall back to the NumPy walk
+    loaded = CompiledModel.load(tmp_path / "model.npz")
+    loaded.booster_raw = None
+    np.testing.assert_allclose(loaded.predict_proba_raw(X), compiled.predict_proba_raw(X), rtol=1e-5, atol=1e-6)
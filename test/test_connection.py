@@ -1,5 +1,5 @@
 import pytest
-import MetaTrader5 as mt5
+from src.config import mt5
 
 @pytest.mark.live
 def test_initialization(connection):
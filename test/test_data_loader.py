@@ -2,7 +2,7 @@ import pytest
 import numpy as np
 import pandas as pd
 from pandas.testing import assert_frame_equal
-import MetaTrader5 as mt5
+from src.config import mt5
 from src.config import TEST_DATA_DIR
 from src.data_loader import DataProcessor
 
@@ -59,3 +59,15 @@ def test_save_to_csv(mock_data_factory, loader):
     assert out_path.exists(), f"Expected file at {out_path} to exist."
     loaded_df = pd.read_csv(out_path, parse_dates=["Datetime"], index_col="Datetime")
     assert_frame_equal(df, loaded_df, check_dtype=False)
+
+def test_clean_data_keep_spread():
+    fake_rates = np.array([
+        (1770387705, 1.10, 1.12, 1.09, 1.11, 100, 7, 0),
+    ], dtype=[('time', '<i8'), ('open', '<f8'), ('high', '<f8'), 
+                ('low', '<f8'), ('close', '<f8'), ('tick_volume', '<i8'),
+                ('spread', '<i4'), ('real_volume', '<i8')])
+    
+    df = DataProcessor.clean_data(fake_rates, keep_spread=True)
+    
+    assert df.iloc[0]["Spread"] == 7
+    assert "real_volume" not in df.columns
@@ -0,0 +1,113 @@
+import pytest
+import time
+import pandas as pd
+from src.config import COLS, MAGIC_NUMBER
+from src.execution import OrderExecutor, TradeJournal
+from test.fake_broker import FakeBroker
+
+BUY = {"direction": "buy", "volume": 0.1, "sl_price": 1.09900, "tp_price": 1.10200,
+       "prob": 0.71, "risk_amount": 100.0, "balance_before": 10000.0}
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = TradeJournal(tmp_path / "trades.csv", buffer_size=5)
+    yield journal
+    journal.close()
+
+def make_executor(broker, journal, **kwargs):
+    return OrderExecutor(broker=broker, journal=journal, symbol="EURUSD", timeframe="H1",
+                         magic=MAGIC_NUMBER, monitor_interval=0.05, **kwargs)
+
+def test_journal_buffers_and_appends(tmp_path):
+    path = tmp_path / "trades.csv"
+    journal = TradeJournal(path, buffer_size=2)
+    journal.append({"ticket": 1, "symbol": "EURUSD"})
+    
+    # Only the header is on disk until the buffer fills
+    assert pd.read_csv(path).empty
+    journal.append({"ticket": 2, "symbol": "EURUSD"})
+    assert len(pd.read_csv(path)) == 2
+    journal.close()
+    
+    # Re-opening appends without a second header
+    journal = TradeJournal(path, buffer_size=10)
+    journal.append({"ticket": 3})
+    journal.close()
+    df = pd.read_csv(path)
+    assert df.columns.tolist() == COLS
+    assert df["ticket"].tolist() == [1, 2, 3]
+
+def test_submit_does_not_block_and_fills(journal):
+    broker = FakeBroker(latency=0.2, slippage_points=2)
+    with make_executor(broker, journal) as executor:
+        start = time.perf_counter()
+        future = executor.submit(BUY)
+        assert time.perf_counter() - start < 0.1, "submit() must not wait for the broker"
+        result = future.result(timeout=5)
+    
+    assert result["status"] == "filled"
+    # Buy filled 2 points above the ask
+    assert result["price"] == pytest.approx(broker.ask + 2 * broker.point)
+    assert broker.requests[0]["magic"] == MAGIC_NUMBER
+
+def test_max_open_trades_enforced(journal):
+    broker = FakeBroker()
+    with make_executor(broker, journal, max_open_trades=1) as executor:
+        first = executor.submit(BUY).result(timeout=5)
+        second = executor.submit(BUY).result(timeout=5)
+    
+    assert first["status"] == "filled"
+    assert second["status"] == "rejected"
+    assert "max open trades" in second["reason"]
+    assert len(broker.requests) == 1
+
+def test_max_spread_enforced(journal):
+    broker = FakeBroker(spread_points=5)
+    with make_executor(broker, journal, max_spread_points=3) as executor:
+        result = executor.submit(BUY).result(timeout=5)
+    
+    assert result["status"] == "rejected"
+    assert "spread" in result["reason"]
+    assert broker.requests == []
+
+def test_unknown_direction_rejected(journal):
+    broker = FakeBroker()
+    with make_executor(broker, journal) as executor:
+        results = [executor.submit({**BUY, "direction": d}).result(timeout=5) for d in ("Buy", "long", None)]
+    
+    assert [r["status"] for r in results] == ["rejected"] * 3
+    assert "unknown direction 'Buy'" in results[0]["reason"]
+    assert broker.requests == []
+
+def test_broker_rejection(journal):
+    broker = FakeBroker(reject=True)
+    with make_executor(broker, journal) as executor:
+        result = executor.submit(BUY).result(timeout=5)
+    
+    assert result["status"] == "rejected"
+    assert "order_send failed" in result["reason"]
+
+def test_closed_trade_is_journaled(journal):
+    broker = FakeBroker()
+    with make_executor(broker, journal) as executor:
+        ticket = executor.submit(BUY).result(timeout=5)["ticket"]
+        broker.set_price(1.10250)  # through the TP
+        executor.reconcile()
+    journal.flush()
+    
+    df = pd.read_csv(journal.path)
+    row = df.set_index("ticket").loc[ticket]
+    assert row["reason_close"] == "tp"
+    assert row["magic"] == MAGIC_NUMBER
+    assert row["spread_points_entry"] == 1
+    assert row["profit"] > 0
+
+def test_reconcile_adopts_only_bot_positions(journal):
+    broker = FakeBroker()
+    ours = broker.open_external_position(magic=MAGIC_NUMBER)
+    broker.open_external_position(magic=123)
+    
+    executor = make_executor(broker, journal)
+    executor.reconcile()
+    
+    assert list(executor.open_trades) == [ours]
@@ -0,0 +1,97 @@
+import pytest
+from pandas.testing import assert_frame_equal
+from src.features import FeatureEngineering
+from src import feature_cache
+from src.feature_cache import FeatureCache, feature_code_version
+
+@pytest.fixture
+def raw_bars(random_walk_bars):
+    return random_walk_bars(1500)
+
+def test_hit_returns_same_features(raw_bars, tmp_path):
+    cache = FeatureCache(tmp_path)
+    
+    first = cache.get_or_compute(raw_bars)
+    second = cache.get_or_compute(raw_bars)
+    
+    assert_frame_equal(first, FeatureEngineering.add_all_features(raw_bars))
+    assert_frame_equal(second, first)
+    assert cache.stats == {"hits": 1, "partial_hits": 0, "misses": 1}
+
+def test_cache_persists_across_instances(raw_bars, tmp_path):
+    FeatureCache(tmp_path).get_or_compute(raw_bars)
+    cache = FeatureCache(tmp_path)
+    cache.get_or_compute(raw_bars)
+    assert cache.stats["hits"] == 1
+
+def test_extended_history_computes_only_tail(raw_bars, tmp_path, mocker):
+    cache = FeatureCache(tmp_path, warmup_bars=500)
+    cache.get_or_compute(raw_bars.iloc[:1200])
+    
+    spy = mocker.spy(FeatureEngineering, "add_all_features")
+    extended = cache.get_or_compute(raw_bars)
+    
+    # Only warm-up + new bars were featurized
+    assert len(spy.call_args[0][0]) == 500 + 300
+    assert cache.stats["partial_hits"] == 1
+    assert cache.report()["entries"] == 1
+    full = FeatureEngineering.add_all_features(raw_bars)
+    assert_frame_equal(extended, full, check_exact=False, rtol=1e-9, atol=1e-9)
+
+def test_feature_subset_is_separate_entry(raw_bars, tmp_path):
+    cache = FeatureCache(tmp_path)
+    cache.get_or_compute(raw_bars)
+    subset = cache.get_or_compute(raw_bars, features=["RSI"])
+    
+    assert cache.stats["misses"] == 2
+    assert "MACD_Line" not in subset.columns
+
+def test_lru_eviction(raw_bars, tmp_path):
+    cache = FeatureCache(tmp_path)
+    cache.get_or_compute(raw_bars.iloc[:400])
+    entry_bytes = next(iter(cache.index.values()))["bytes"]
+    cache.max_bytes = int(entry_bytes * 2.5)
+    
+    cache.get_or_compute(raw_bars.iloc[100:500])
+    cache.get_or_compute(raw_bars.iloc[:400])        # refresh the first entry
+    cache.get_or_compute(raw_bars.iloc[200:600])     # evicts [100:500]
+    
+    assert len(cache.index) == 2
+    cache.get_or_compute(raw_bars.iloc[:400])
+    assert cache.stats["hits"] == 2
+    cache.get_or_compute(raw_bars.iloc[100:500])
+    assert cache.stats["misses"] == 4
+
+def test_instances_sharing_a_directory_keep_each_others_entries(raw_bars, tmp_path):
+    """Like BatchTrainer workers: caches opened at the same time must not overwrite each other's entries."""
+    first, second = FeatureCache(tmp_path), FeatureCache(tmp_path)
+    first.get_or_compute(raw_bars.iloc[:400])
+    second.get_or_compute(raw_bars.iloc[500:900])
+    first.get_or_compute(raw_bars.iloc[500:900])
+    
+    assert first.stats["hits"] == 1
+    assert len(FeatureCache(tmp_path).index) == 2
+    assert not list(tmp_path.glob("*.tmp"))
+
+def test_entry_evicted_by_another_process_is_recomputed(raw_bars, tmp_path):
+    cache = FeatureCache(tmp_path)
+    expected = cache.get_or_compute(raw_bars.iloc[:400])
+    next(tmp_path.glob("*.parquet")).unlink()
+    
+    assert_frame_equal(cache.get_or_compute(raw_bars.iloc[:400]), expected)
+    assert cache.stats["misses"] == 2
+
+def test_library_upgrade_invalidates_entries(raw_bars, tmp_path, monkeypatch):
+    FeatureCache(tmp_path).get_or_compute(raw_bars)
+    before = feature_code_version()
+    
+    # A new ta release may change indicator values, so its entries must not be served
+    monkeypatch.setattr(feature_cache, "version", lambda package: "99.0" if package == "ta" else "0")
+    feature_code_version.cache_clear()
+    try:
+        cache = FeatureCache(tmp_path)
+        cache.get_or_compute(raw_bars)
+        assert feature_code_version() != before
+        assert cache.stats["misses"] == 1
+    finally:
+        feature_code_version.cache_clear()
@@ -0,0 +1,58 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.features import FeatureEngineering
+from src.feature_selection import FeatureSelector
+
+@pytest.fixture
+def informative_data():
+    """Two informative features, one near-duplicate of the first and one noise column."""
+    rng = np.random.default_rng(69)
+    rows = 600
+    idx = pd.date_range("2024-01-01", periods=rows, freq="h")
+    signal = rng.normal(size=rows)
+    X = pd.DataFrame({
+        "RSI": signal,
+        "ATR": rng.normal(size=rows),
+        "MFI": signal + rng.normal(scale=0.01, size=rows),
+        "CCI": rng.normal(size=rows),
+    }, index=idx)
+    y = pd.Series(((X["RSI"] + 0.5 * X["ATR"]) > 0).astype(int), index=idx)
+    return X, y
+
+def test_selector_drops_correlated_twin(informative_data):
+    X, y = informative_data
+    selector = FeatureSelector(n_splits=3, importance_threshold=0.9)
+    
+    selected = selector.fit(X, y)
+    
+    assert "ATR" in selected
+    # Exactly one of the near-duplicate pair survives
+    assert ("RSI" in selected) != ("MFI" in selected)
+    assert set(selector.dropped_correlated) & {"RSI", "MFI"}
+    # Manifest keeps get_feature_columns order
+    order = FeatureEngineering.get_feature_columns()
+    assert selected == sorted(selected, key=order.index)
+
+def test_manifest_roundtrip(informative_data, tmp_path):
+    X, y = informative_data
+    selector = FeatureSelector(n_splits=3)
+    selected = selector.fit(X, y)
+    
+    path = selector.save_manifest(tmp_path / "manifest.json")
+    
+    assert FeatureSelector.load_manifest(path) == selected
+
+def test_active_features_fall_back_to_full_set(informative_data, tmp_path):
+    X, y = informative_data
+    path = tmp_path / "manifest.json"
+    assert FeatureSelector.active_features(path) == FeatureEngineering.get_feature_columns()
+    
+    selector = FeatureSelector(n_splits=3)
+    selected = selector.fit(X, y)
+    selector.save_manifest(path)
+    assert FeatureSelector.active_features(path) == selected
+
+def test_save_manifest_requires_fit(tmp_path):
+    with pytest.raises(RuntimeError, match="FeatureSelector must be fitted before saving a manifest."):
+        FeatureSelector().save_manifest(tmp_path / "manifest.json")
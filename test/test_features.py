@@ -49,12 +49,13 @@ def test_make_labels_mock(mock_data_factory):
     df_labeled = FeatureEngineering.make_label(df_features)
     
     assert "Target" in df_labeled.columns, "Expected 'Target' column not found after labeling."
-    assert set(df_labeled["Target"].unique()).issubset({0, 1}), "Target column contains values other than 0 and 1."
+    assert set(df_labeled["Target"].iloc[:-1].unique()).issubset({0, 1}), "Target column contains values other than 0 and 1."
+    assert np.isnan(df_labeled["Target"].iloc[-1]), "The last bar has no next close and must not be labeled."
     
 def test_split_labels_from_features(mock_data_factory):
     df_raw = mock_data_factory(50)
     df_features = FeatureEngineering.add_all_features(df_raw)
-    df_labeled = FeatureEngineering.make_label(df_features)
+    df_labeled = FeatureEngineering.drop_unlabeled(FeatureEngineering.make_label(df_features))
     
     X, y = FeatureEngineering.split_labels_from_features(df_labeled)
     
@@ -67,7 +68,7 @@ def test_split_labels_from_features(mock_data_factory):
 def test_make_labels_live(loader):
     df = loader.fetch_live_data(bars=50)
     df_features = FeatureEngineering.add_all_features(df)
-    df_labeled = FeatureEngineering.make_label(df_features)
+    df_labeled = FeatureEngineering.drop_unlabeled(FeatureEngineering.make_label(df_features))
     
     assert "Target" in df_labeled.columns, "Expected 'Target' column not found after labeling."
     assert set(df_labeled["Target"].unique()).issubset({0, 1}), "Target column contains values other than 0 and 1."
@@ -77,7 +78,7 @@ def test_make_labels_live(loader):
 def test_split_labels_from_features_live(loader):
     df = loader.fetch_live_data(bars=50)
     df_features = FeatureEngineering.add_all_features(df)
-    df_labeled = FeatureEngineering.make_label(df_features)
+    df_labeled = FeatureEngineering.drop_unlabeled(FeatureEngineering.make_label(df_features))
     
     X, y = FeatureEngineering.split_labels_from_features(df_labeled)
     
@@ -93,4 +94,82 @@ def test_save_to_csv_live(loader):
     df_labeled = FeatureEngineering.make_label(df_features)
     
     out_path = loader.save_to_csv(df_labeled, suffix="features_test", dir=TEST_DATA_DIR)
-    assert out_path.exists(), f"Expected file {out_path} to exist after saving."
\ No newline at end of file
+    assert out_path.exists(), f"Expected file {out_path} to exist after saving."
+
+def test_make_label_uses_horizon(mock_data_factory):
+    df = mock_data_factory(50).set_index("Datetime")
+    df["Close"] = np.r_[np.zeros(25), np.ones(25)]
+    
+    labeled = FeatureEngineering.make_label(df, horizon=3)
+    
+    # Close jumps at bar 25, so only bars 22-24 see the jump 3 bars ahead
+    assert labeled["Target"].sum() == 3
+    assert labeled["Target"].iloc[22:25].tolist() == [1, 1, 1]
+
+
+def test_multi_horizon_labels_match_single_horizon(mock_data_factory):
+    df_raw = mock_data_factory(80)
+    df_raw["Close"] = df_raw["Close"] + np.random.randn(80) * 0.01
+    df_features = FeatureEngineering.add_all_features(df_raw)
+    
+    labeled = FeatureEngineering.make_multi_horizon_labels(df_features, horizons=(1, 3, 6, 12))
+    
+    for h in (1, 3, 6, 12):
+        expected = FeatureEngineering.make_label(df_features, horizon=h)["Target"]
+        assert labeled[f"Target_h{h}"].equals(expected.rename(f"Target_h{h}")), f"Target_h{h} differs from make_label(horizon={h})"
+    assert set(labeled["Target_TB"].dropna().unique()).issubset({0, 1})
+
+
+def test_rows_without_future_are_not_labeled(mock_data_factory):
+    df_raw = mock_data_factory(80)
+    df_raw["Close"] = df_raw["Close"] + np.random.default_rng(69).normal(0, 0.01, 80)
+    df_features = FeatureEngineering.add_all_features(df_raw)
+    targets = ["Target_h1", "Target_h3", "Target_h6", "Target_h12", "Target_TB"]
+    
+    labeled = FeatureEngineering.make_multi_horizon_labels(df_features, horizons=(1, 3, 6, 12), barrier_horizon=12)
+    
+    # The last h rows of each target have no future window
+    for target, h in zip(targets, (1, 3, 6, 12, 12)):
+        assert labeled[target].iloc[-h:].isna().all()
+        assert labeled[target].iloc[:-h].notna().all()
+    
+    train = FeatureEngineering.drop_unlabeled(labeled, targets)
+    assert train.index.equals(labeled.index[:-12])
+    X, Y = FeatureEngineering.split_labels_from_features(train, target=targets)
+    assert len(X) == len(Y) == len(labeled) - 12
+    assert (Y.dtypes == int).all()
+
+
+def test_triple_barrier_label():
+    # ATR=1 -> SL distance 0.2, TP distance 0.4 with the default config
+    idx = pd.date_range("2024-01-01", periods=6, freq="h")
+    df = pd.DataFrame({
+        "Close": [1.0, 1.0, 1.0, 1.0, 1.0, 1.0],
+        "High":  [1.0, 1.5, 1.0, 1.0, 1.0, 1.0],
+        "Low":   [1.0, 1.0, 0.7, 1.0, 1.0, 1.0],
+        "ATR":   [1.0] * 6,
+    }, index=idx)
+    
+    labels = FeatureEngineering._triple_barrier_label(df, horizon=2)
+    
+    # Bar 0: TP at bar 1 before SL at bar 2 -> 1; bar 1: SL at bar 2 -> 0; bars 2-3 never touched -> 0;
+    # bars 4-5 have no full 2-bar window -> NaN
+    np.testing.assert_array_equal(labels, [1, 0, 0, 0, np.nan, np.nan])
+
+
+def test_add_all_features_subset_computes_dependencies(mock_data_factory):
+    df_raw = mock_data_factory(80)
+    
+    subset = FeatureEngineering.add_all_features(df_raw, features=["Signal_RSI", "ATR"])
+    full = FeatureEngineering.add_all_features(df_raw)
+    
+    # Only the requested columns, their dependencies and the raw OHLCV are computed
+    assert set(subset.columns) == {"Open", "High", "Low", "Close", "Volume", "RSI", "Signal_RSI", "ATR"}
+    # Same warm-up rows dropped as the full path, so training rows don't depend on the manifest
+    assert subset.index.equals(full.index)
+    assert_frame_equal(subset[["RSI", "Signal_RSI", "ATR"]], full[["RSI", "Signal_RSI", "ATR"]])
+
+
+def test_add_all_features_unknown_feature(mock_data_factory):
+    with pytest.raises(ValueError, match="Unknown feature columns"):
+        FeatureEngineering.add_all_features(mock_data_factory(50), features=["Not_A_Feature"])
@@ -96,4 +96,66 @@ def test_final_model_local_saving(mock_data_factory, tmp_path):
         mock_model_instance.save_model(str(test_model_file))
         
     mock_model_instance.save_model.assert_called_once_with(str(test_model_file))
-    assert test_model_file.parent.exists()
\ No newline at end of file
+    assert test_model_file.parent.exists()
+
+def test_cached_folds_match_xgbclassifier(mock_data_factory):
+    """Native xgb.train on cached QuantileDMatrix folds must score exactly like XGBClassifier."""
+    from xgboost import XGBClassifier
+    from sklearn.metrics import average_precision_score
+
+    df = mock_data_factory(rows=200).set_index("Datetime")
+    X = df.drop(columns=["Close"])
+    y = pd.Series(np.random.randint(0, 2, 200), index=df.index)
+
+    trainer = ModelTrainer(n_splits=3, n_iter=1)
+    params = {"max_depth": 3, "learning_rate": 0.1}
+    folds = trainer.prepare_folds(X, y)
+    cached_score = trainer.cross_validate(X, y, params, folds=folds)
+
+    expected = []
+    for fold in folds:
+        model = XGBClassifier(**trainer.base_params, **params, n_estimators=5000, early_stopping_rounds=50, scale_pos_weight=fold["spw"])
+        model.fit(fold["X_train"], fold["y_train"], eval_set=[(fold["X_test"], fold["y_test"])], verbose=False)
+        expected.append(average_precision_score(fold["y_test"], model.predict_proba(fold["X_test"])[:, 1]))
+
+    assert cached_score == pytest.approx(float(np.mean(expected)), abs=1e-12)
+
+def test_quantile_dmatrix_reused_across_candidates(mock_data_factory):
+    """Candidates sharing max_bin must reuse the same fold matrices."""
+    df = mock_data_factory(rows=120).set_index("Datetime")
+    X = df.drop(columns=["Close"])
+    y = pd.Series(np.random.randint(0, 2, 120), index=df.index)
+
+    trainer = ModelTrainer(n_splits=2, n_iter=1)
+    folds = trainer.prepare_folds(X, y)
+
+    trainer.cross_validate(X, y, {"max_depth": 3}, folds=folds)
+    first = [fold["dmatrices"][256] for fold in folds]
+    trainer.cross_validate(X, y, {"max_depth": 4}, folds=folds)
+    trainer.cross_validate(X, y, {"max_depth": 3, "max_bin": 64}, folds=folds)
+
+    for fold, matrices in zip(folds, first):
+        assert fold["dmatrices"][256] is matrices
+        assert set(fold["dmatrices"]) == {256, 64}
+
+def test_multi_horizon_shares_fold_preprocessing(mock_data_factory):
+    """All targets reuse one preprocessing pass and score like single-target CV."""
+    df = mock_data_factory(rows=150).set_index("Datetime")
+    X = df.drop(columns=["Close"])
+    Y = pd.DataFrame({
+        "Target_h1": np.random.randint(0, 2, 150),
+        "Target_h3": np.random.randint(0, 2, 150),
+    }, index=df.index)
+
+    trainer = ModelTrainer(n_splits=2, n_iter=1)
+    params = {"max_depth": 3, "learning_rate": 0.1}
+
+    with patch("src.model_trainer.Preprocessor", wraps=Preprocessor) as SpyPrep:
+        folds_by_target = trainer.prepare_multi_horizon_folds(X, Y)
+        assert SpyPrep.call_count == 2
+
+    for target, folds in folds_by_target.items():
+        shared = trainer.cross_validate(X, Y[target], params, folds=folds)
+        single = trainer.cross_validate(X, Y[target], params)
+        assert shared == pytest.approx(single, abs=1e-12)
+    assert folds_by_target["Target_h3"][0]["X_train"] is folds_by_target["Target_h1"][0]["X_train"]
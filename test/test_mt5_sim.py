@@ -0,0 +1,165 @@
+import pytest
+import numpy as np
+import pandas as pd
+from src import mt5_sim
+from src.config import TEST_DATA_DIR, MAGIC_NUMBER
+from src.data_loader import DataProcessor
+from src.execution import OrderExecutor, TradeJournal
+from src.mt5_sim import MT5Simulator
+
+START = "2024-06-03 12:00"
+
+@pytest.fixture
+def sim():
+    sim = MT5Simulator(start_time=START, seed=7)
+    sim.initialize()
+    return sim
+
+def test_synthetic_data_is_deterministic(sim):
+    other = MT5Simulator(start_time=START, seed=7)
+    other.initialize()
+    rates = sim.copy_rates_from_pos("EURUSD", mt5_sim.TIMEFRAME_H1, 0, 3000)
+    
+    np.testing.assert_array_equal(rates, other.copy_rates_from_pos("EURUSD", mt5_sim.TIMEFRAME_H1, 0, 3000))
+    assert len(rates) == 3000
+    assert (np.diff(rates["time"]) == 3600).all()
+    assert (rates["high"] >= np.maximum(rates["open"], rates["close"])).all()
+    assert (rates["low"] <= np.minimum(rates["open"], rates["close"])).all()
+    
+    # Any range is the same bars, however it is requested
+    start, end = pd.Timestamp(rates["time"][100], unit="s"), pd.Timestamp(rates["time"][199], unit="s")
+    np.testing.assert_array_equal(sim.copy_rates_range("EURUSD", mt5_sim.TIMEFRAME_H1, start, end), rates[100:200])
+    
+    other_seed = MT5Simulator(start_time=START, seed=8)
+    other_seed.initialize()
+    assert not np.array_equal(rates["close"], other_seed.copy_rates_from_pos("EURUSD", mt5_sim.TIMEFRAME_H1, 0, 3000)["close"])
+
+def test_forming_bar_has_no_lookahead(sim):
+    h1 = sim.copy_rates_from_pos("EURUSD", mt5_sim.TIMEFRAME_H1, 0, 5)
+    tick = sim.symbol_info_tick("EURUSD")
+    
+    assert h1["time"][-1] == pd.Timestamp(START, tz="UTC").timestamp()
+    assert h1["open"][-1] == h1["close"][-1] == tick.bid
+    assert h1["close"][-2] == tick.bid
+    assert tick.ask > tick.bid
+    
+    # Higher timeframes agree with the base bars and are cut at the clock too
+    h4 = sim.copy_rates_from_pos("EURUSD", mt5_sim.TIMEFRAME_H4, 0, 2)
+    sim.advance(4)
+    full = sim.copy_rates_from_pos("EURUSD", mt5_sim.TIMEFRAME_H1, 0, 9)[:-1]
+    assert h4["close"][-1] == full["open"][4]
+    assert h4["high"][-2] == full["high"][:4].max()
+
+def test_works_with_data_processor(sim):
+    df = DataProcessor.clean_data(sim.copy_rates_from_pos("EURUSD", mt5_sim.TIMEFRAME_H1, 0, 50))
+    
+    assert len(df) == 50
+    assert df["Datetime"].iloc[-1] == pd.Timestamp(START)
+
+def test_recorded_data():
+    sim = MT5Simulator(data_path=TEST_DATA_DIR / "EURUSD_16385_test.csv")
+    sim.initialize()
+    recorded = pd.read_csv(TEST_DATA_DIR / "EURUSD_16385_test.csv")
+    rates = sim.copy_rates_from_pos("EURUSD", mt5_sim.TIMEFRAME_H1, 1, len(recorded) - 1)
+    
+    np.testing.assert_allclose(rates["close"], recorded["Close"].iloc[:-1])
+    assert sim.copy_rates_from_pos("EURUSD", mt5_sim.TIMEFRAME_M15, 0, 10) is None
+    assert sim.last_error()[0] == mt5_sim.RES_E_NOT_FOUND
+
+def test_default_clock_is_fixed():
+    first, second = MT5Simulator(), MT5Simulator()
+    
+    assert first.clock == second.clock == mt5_sim.DEFAULT_START_TIME
+    for sim in (first, second):
+        sim.initialize()
+    np.testing.assert_array_equal(first.copy_rates_from_pos("EURUSD", mt5_sim.TIMEFRAME_H1, 0, 50),
+                                  second.copy_rates_from_pos("EURUSD", mt5_sim.TIMEFRAME_H1, 0, 50))
+
+def test_missing_data_returns_none_like_the_terminal():
+    # Before the synthetic history starts there is no current bar
+    sim = MT5Simulator(start_time="2010-01-01")
+    sim.initialize()
+    
+    assert sim.symbol_info_tick("EURUSD") is None
+    assert sim.last_error()[0] == mt5_sim.RES_E_NOT_FOUND
+    assert sim.symbol_info("EURUSD") is None
+    assert sim.copy_rates_range("EURUSD", mt5_sim.TIMEFRAME_H1, "not a date", START) is None
+    assert sim.last_error()[0] == mt5_sim.RES_E_INVALID_PARAMS
+    assert sim.copy_ticks_range("EURUSD", None, START) is None
+    assert sim.last_error()[0] == mt5_sim.RES_E_INVALID_PARAMS
+
+def test_calls_fail_before_initialize():
+    sim = MT5Simulator(start_time=START)
+    
+    assert sim.account_info() is None
+    assert sim.last_error()[0] == mt5_sim.RES_E_INTERNAL_FAIL_CONNECT
+    assert sim.initialize(login=123, server="Sim-Server")
+    assert sim.account_info().login == 123
+
+def test_disconnect_and_reconnect(sim):
+    sim.disconnect()
+    
+    assert not sim.terminal_info().connected
+    assert sim.copy_rates_from_pos("EURUSD", mt5_sim.TIMEFRAME_H1, 0, 10) is None
+    assert sim.last_error()[0] == mt5_sim.RES_E_INTERNAL_FAIL_CONNECT
+    for _ in range(sim.reconnect_after):
+        sim.account_info()
+    assert sim.terminal_info().connected
+
+def test_injected_failures_are_reproducible():
+    outcomes = []
+    for _ in range(2):
+        sim = MT5Simulator(start_time=START, seed=3, failure_rate=0.3, disconnect_rate=0.05)
+        while not sim.initialize():
+            pass
+        outcomes.append([sim.symbol_info_tick("EURUSD") is None for _ in range(200)])
+    
+    assert outcomes[0] == outcomes[1]
+    assert 0 < sum(outcomes[0]) < 200
+
+def test_order_closed_at_take_profit(sim):
+    tick = sim.symbol_info_tick("EURUSD")
+    result = sim.order_send({"action": mt5_sim.TRADE_ACTION_DEAL, "symbol": "EURUSD", "volume": 0.1,
+                             "type": mt5_sim.ORDER_TYPE_BUY, "price": tick.ask,
+                             "sl": round(tick.bid - 0.5, 5), "tp": round(tick.ask + 0.0005, 5)})
+    assert result.retcode == mt5_sim.TRADE_RETCODE_DONE
+    assert len(sim.positions_get(symbol="EURUSD")) == 1
+    
+    sim.advance(500)
+    deals = sim.history_deals_get(position=result.order)
+    assert sim.positions_get() == ()
+    assert deals[-1].reason == mt5_sim.DEAL_REASON_TP
+    assert deals[-1].profit == pytest.approx(5.0)  # 50 points on 0.1 lot
+    assert sim.account_info().balance == pytest.approx(10_000 + deals[-1].profit)
+
+def test_invalid_volume_rejected(sim):
+    tick = sim.symbol_info_tick("EURUSD")
+    result = sim.order_send({"symbol": "EURUSD", "volume": 0.015, "type": mt5_sim.ORDER_TYPE_BUY, "price": tick.ask})
+    
+    assert result.retcode == mt5_sim.TRADE_RETCODE_INVALID_VOLUME
+
+def test_order_executor_end_to_end(sim, tmp_path):
+    journal = TradeJournal(tmp_path / "trades.csv")
+    tick = sim.symbol_info_tick("EURUSD")
+    order = {"direction": "sell", "volume": 0.2, "sl_price": round(tick.ask + 0.0004, 5),
+             "tp_price": round(tick.bid - 0.5, 5), "prob": 0.3}
+    with OrderExecutor(broker=sim, journal=journal, symbol="EURUSD", timeframe="H1",
+                       magic=MAGIC_NUMBER, monitor_interval=0.05) as executor:
+        filled = executor.submit(order).result(timeout=5)
+        assert filled["status"] == "filled"
+        sim.advance(500)
+        executor.reconcile()
+    
+    row = pd.read_csv(journal.path).set_index("ticket").loc[filled["ticket"]]
+    assert row["reason_close"] == "sl"
+    assert row["profit"] < 0
+
+def test_module_api_delegates_to_configured_simulator(monkeypatch):
+    monkeypatch.setattr(mt5_sim, "_simulator", None)  # restored after the test
+    sim = mt5_sim.configure(start_time=START, seed=11)
+    
+    assert mt5_sim.initialize()
+    assert mt5_sim.simulator() is sim
+    assert mt5_sim.symbol_info_tick("EURUSD").time == sim.clock
+    with pytest.raises(AttributeError):
+        mt5_sim.not_an_mt5_function
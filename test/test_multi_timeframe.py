@@ -0,0 +1,76 @@
+import pytest
+from pandas.testing import assert_frame_equal
+from src.features import FeatureEngineering
+from src.multi_timeframe import MultiTimeframeFeatures
+
+@pytest.fixture
+def hourly_bars(random_walk_bars):
+    """Two months of random-walk H1 bars, indexed by bar open time."""
+    return random_walk_bars(24 * 60).set_index("Datetime")
+
+def test_no_lookahead(hourly_bars):
+    """Changing bars after a cutoff must not change higher-timeframe values before it."""
+    cutoff = 900
+    shocked = hourly_bars.copy()
+    shocked.iloc[cutoff:, :4] *= 1.05
+    
+    original = MultiTimeframeFeatures(base_timeframe="H1").align(hourly_bars)
+    changed = MultiTimeframeFeatures(base_timeframe="H1").align(shocked)
+    
+    assert_frame_equal(original.iloc[:cutoff], changed.iloc[:cutoff])
+    assert not original.iloc[cutoff:].equals(changed.iloc[cutoff:])
+
+def test_h4_bar_visible_only_after_close(hourly_bars):
+    mtf = MultiTimeframeFeatures(timeframes=("H4",), base_timeframe="H1", features=["Returns"])
+    aligned = mtf.align(hourly_bars)
+    
+    # The 08:00-12:00 H4 bar closes with the 11:00 H1 bar
+    h4_close = hourly_bars["Close"].resample("4h").last()
+    expected = h4_close.pct_change().loc["2024-01-05 08:00"]
+    assert aligned.loc["2024-01-05 11:00", "H4_Returns"] == pytest.approx(expected)
+    assert aligned.loc["2024-01-05 10:00", "H4_Returns"] != pytest.approx(expected)
+
+def test_live_windows_match_batch(hourly_bars):
+    """Sliding 50-bar live windows reproduce the values of the full-history pass."""
+    batch = MultiTimeframeFeatures(base_timeframe="H1").align(hourly_bars)
+    
+    live = MultiTimeframeFeatures(base_timeframe="H1")
+    live.align(hourly_bars.iloc[:1000])
+    for end in range(1001, len(hourly_bars) + 1):
+        last = live.align(hourly_bars.iloc[end - 50:end]).iloc[[-1]]
+        assert_frame_equal(last, batch.iloc[[end - 1]])
+
+def test_history_longer_than_max_bars(random_walk_bars):
+    """Five months of H1 is 900 H4 bars, more than max_bars=500: every bar still gets its values."""
+    long_bars = random_walk_bars(24 * 150).set_index("Datetime")
+    aligned = MultiTimeframeFeatures(base_timeframe="H1").align(long_bars)
+    unbounded = MultiTimeframeFeatures(base_timeframe="H1", max_bars=10_000).align(long_bars)
+    
+    assert_frame_equal(aligned, unbounded)
+    assert aligned.iloc[-1].notna().all()
+
+def test_live_after_truncation_matches_batch(random_walk_bars):
+    """A live instance seeded from long history keeps only max_bars bars and still reproduces the batch pass."""
+    long_bars = random_walk_bars(24 * 150).set_index("Datetime")
+    batch = MultiTimeframeFeatures(base_timeframe="H1").align(long_bars)
+    
+    live = MultiTimeframeFeatures(base_timeframe="H1")
+    live.align(long_bars.iloc[:3400])
+    assert len(live._bars["H4"]) == live.max_bars
+    for end in range(3401, len(long_bars) + 1):
+        last = live.align(long_bars.iloc[end - 50:end]).iloc[[-1]]
+        assert_frame_equal(last, batch.iloc[[end - 1]])
+    assert len(live._bars["H4"]) == live.max_bars
+    assert len(live._values["H4"]) == live.max_bars
+
+def test_add_all_features_with_mtf(hourly_bars):
+    mtf = MultiTimeframeFeatures(base_timeframe="H1")
+    df = FeatureEngineering.add_all_features(hourly_bars, mtf=mtf)
+    
+    for col in mtf.feature_columns():
+        assert col in df.columns
+    assert not df.isnull().values.any()
+
+def test_rejects_lower_timeframe():
+    with pytest.raises(ValueError, match="not a higher multiple"):
+        MultiTimeframeFeatures(timeframes=("M30",), base_timeframe="H1")
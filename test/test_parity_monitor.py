@@ -0,0 +1,77 @@
+import pytest
+import numpy as np
+import pandas as pd
+from src.features import FeatureEngineering
+from src.parity_monitor import FeatureParityMonitor
+
+@pytest.fixture(scope="module")
+def bars(random_walk_bars):
+    return random_walk_bars(800)
+
+@pytest.fixture
+def monitor(bars):
+    features = FeatureEngineering.get_feature_columns()
+    train = FeatureEngineering.add_all_features(bars.iloc[:600])[features]
+    monitor = FeatureParityMonitor(train, non_stat_cols=["OBV"], reference_bars=300)
+    monitor.seed(bars.iloc[300:600])
+    return monitor
+
+def test_full_window_has_no_gap(bars, monitor):
+    # A live window as long as the reference buffer sees exactly the same bars
+    monitor.window = 300
+    gap = monitor.update(bars.iloc[301:601])
+    
+    assert gap.max() < 1e-9
+    assert monitor.n_updates == 1
+
+def test_short_window_gap_and_drift_stats(bars, monitor):
+    for i in range(600, 620):
+        gap = monitor.update(bars.iloc[i - 49:i + 1])
+    report = monitor.report()
+    
+    # EMA/Wilder indicators haven't converged on 50 bars, OBV differences always have
+    assert gap.max() > 0
+    assert report.loc["OBV", "gap_max"] < 1e-9
+    assert (report["gap_max"] >= report["gap_mean"]).all()
+    assert (report["psi"] >= 0).all()
+    assert sum(monitor.live_counts[0]) == 20
+
+def test_reference_buffer_is_bounded(bars, monitor):
+    for i in range(600, 610):
+        monitor.update(bars.iloc[i - 49:i + 1])
+    
+    assert len(monitor._bars) == 300
+    assert monitor._bars.index[-1] == pd.Timestamp(bars["Datetime"].iloc[609])
+
+def test_check_every_samples_bars(bars, monitor):
+    monitor.check_every = 5
+    gaps = [monitor.update(bars.iloc[i - 49:i + 1]) for i in range(600, 610)]
+    
+    assert [g is not None for g in gaps] == [True, False, False, False, False] * 2
+    assert monitor.n_updates == 2
+    assert monitor._bars.index[-1] == pd.Timestamp(bars["Datetime"].iloc[609])
+
+def test_psi_flags_shifted_distribution(bars, monitor):
+    # Live counts matching training proportions, except the first feature stuck in its top bin
+    monitor.live_counts = [expected * 1000 for expected in monitor.expected]
+    monitor.live_counts[0] = np.zeros_like(monitor.expected[0])
+    monitor.live_counts[0][-1] = 100
+    psi = monitor.psi()
+    
+    assert psi.iloc[0] > 1
+    assert psi.iloc[1:].max() == pytest.approx(0, abs=1e-9)
+
+def test_recommend_history_bars(bars):
+    window, table = FeatureParityMonitor.recommend_history_bars(
+        bars, tolerance=0.05, non_stat_cols=["OBV"], candidates=(50, 100, 200, 300), n_samples=5
+    )
+    worst = table.max(axis=1)
+    
+    # Longer windows converge, and the recommendation is the first one within tolerance
+    assert worst.is_monotonic_decreasing
+    assert worst[window] <= 0.05
+    assert all(worst[w] > 0.05 for w in table.index if w < window)
+
+def test_recommend_history_bars_needs_enough_bars(bars):
+    with pytest.raises(ValueError, match="needs more than 300 bars, got 300"):
+        FeatureParityMonitor.recommend_history_bars(bars.iloc[:300], candidates=(50, 300))
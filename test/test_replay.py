@@ -0,0 +1,77 @@
+import pytest
+import numpy as np
+import pandas as pd
+from xgboost import XGBClassifier
+from src.features import FeatureEngineering
+from src.preprocessing import Preprocessor
+from src.compiled_model import CompiledModel
+from src.replay import Replay
+
+@pytest.fixture(scope="module")
+def fitted_replay(random_walk_bars):
+    """Random-walk bars with a Preprocessor and XGBClassifier fitted on the first 400."""
+    df = random_walk_bars(500)
+    df_train = FeatureEngineering.drop_unlabeled(FeatureEngineering.make_label(FeatureEngineering.add_all_features(df.iloc[:400])))
+    X, y = FeatureEngineering.split_labels_from_features(df_train)
+    preprocessor = Preprocessor()
+    X_pca = preprocessor.fit_transform(X)
+    model = XGBClassifier(n_estimators=50, max_depth=3, tree_method="hist", random_state=69)
+    model.fit(X_pca, y.loc[X_pca.index])
+    return df, Replay(preprocessor, model)
+
+def test_bulk_scores_every_live_bar(fitted_replay):
+    df, replay = fitted_replay
+    bulk = replay.score_bulk(df)
+    
+    # Every bar with a full 50-bar history is scored, nothing earlier
+    assert bulk.index[0] == df["Datetime"].iloc[49]
+    assert bulk.index[-1] == df["Datetime"].iloc[-1]
+    assert bulk["prob"].between(0, 1).all()
+
+def test_bulk_matches_expanding_live_path(fitted_replay):
+    """With the full history available live, both paths agree exactly on every sampled bar."""
+    df, replay = fitted_replay
+    at = df["Datetime"].iloc[[60, 150, 299, 499]]
+    
+    report = replay.parity(df, window=None, at=at)
+    
+    assert report.index.tolist() == at.tolist()
+    np.testing.assert_allclose(report["prob_bulk"], report["prob_live"], rtol=0, atol=1e-12)
+
+def test_fixed_window_parity_reports_warmup_gap(fitted_replay):
+    """50-bar windows score exactly the bars bulk keeps for them, with a real warm-up gap that the expanding window closes."""
+    df, replay = fitted_replay
+    at = df["Datetime"].iloc[40:161]
+    
+    report = replay.parity(df, window=50, at=at)
+    
+    # Bars 40-48 have no full 50-bar history on either side, every later bar is scored by both
+    assert report.index.tolist() == df["Datetime"].iloc[49:161].tolist()
+    assert not report[["prob_bulk", "prob_live"]].isnull().values.any()
+    # Indicators warmed up on 50 bars only (and cumulative ones like OBV) move the probabilities
+    assert report["abs_diff"].max() > 0.01
+    assert (report["abs_diff"] > 1e-9).mean() > 0.5
+    
+    expanding = replay.parity(df, window=None, at=report.index)
+    assert expanding.index.equals(report.index)
+    assert expanding["abs_diff"].max() < 1e-12
+
+def test_short_window_cannot_score(fitted_replay):
+    """The first bar surviving dropna sets the shortest window live can score with."""
+    df, replay = fitted_replay
+    warmup = df["Datetime"].tolist().index(replay.score_bulk(df, min_history=None).index[0])
+    at = df["Datetime"].iloc[[100, 200]]
+    
+    assert len(replay.score_live_windows(df, window=warmup + 1, at=at)) == 2
+    assert replay.score_live_windows(df, window=warmup, at=at).empty
+    
+    # 30 bars is below the warm-up, so no bar can be scored live
+    report = replay.parity(df, window=30, at=df["Datetime"].iloc[[100, 300, 499]])
+    assert report["prob_bulk"].notnull().all()
+    assert report["prob_live"].isnull().all()
+
+def test_bulk_with_compiled_model(fitted_replay):
+    df, replay = fitted_replay
+    compiled = Replay(replay.preprocessor, CompiledModel.from_booster(replay.model))
+    
+    np.testing.assert_allclose(compiled.score_bulk(df)["prob"], replay.score_bulk(df)["prob"], atol=1e-6)
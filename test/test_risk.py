@@ -0,0 +1,96 @@
+import pytest
+import numpy as np
+import pandas as pd
+from types import SimpleNamespace
+from src import risk
+from src.mt5_sim import MT5Simulator, DEFAULT_SYMBOL_SPEC
+from src.risk import PositionSizer, symbol_spec
+
+EURUSD = SimpleNamespace(**DEFAULT_SYMBOL_SPEC)
+# Yen quoted pair with a USD account: 3 digits and a tick value below 1
+USDJPY = SimpleNamespace(point=0.001, digits=3, trade_tick_size=0.001, trade_tick_value=0.6667,
+                         volume_min=0.1, volume_max=50.0, volume_step=0.1)
+
+@pytest.fixture
+def sizer():
+    return PositionSizer(EURUSD, risk_per_trade=0.01, atr_multiplier=0.2, risk_reward_ratio=2.0)
+
+def test_single_order(sizer):
+    # SL distance 0.0015 * 0.2 = 30 points, TP 60 points, 100 USD risk at 10 USD per point and lot
+    buy = sizer.order("buy", 1.10012, 0.0015, 10_000.0, prob=0.7)
+    assert buy == {"direction": "buy", "volume": 3.33, "sl_price": 1.09982, "tp_price": 1.10072,
+                   "risk_amount": 99.9, "balance_before": 10_000.0, "prob": 0.7}
+
+    sell = sizer.order("sell", 1.10012, 0.0015, 10_000.0)
+    assert (sell["sl_price"], sell["tp_price"], sell["volume"]) == (1.10042, 1.09952, 3.33)
+
+def test_unknown_direction_is_refused(sizer):
+    for direction in ("Buy", "long", "sel"):
+        with pytest.raises(ValueError, match="Unknown order direction"):
+            sizer.order(direction, 1.10012, 0.0015, 10_000.0)
+
+def test_volume_limits(sizer):
+    # Below volume_min the trade is skipped rather than oversized
+    assert sizer.order("buy", 1.1, 0.0015, 10.0) is None
+    assert sizer.order("buy", 1.1, 0.0015, 1e9)["volume"] == EURUSD.volume_max
+    assert sizer.order("buy", 1.1, np.nan, 10_000.0) is None
+    assert sizer.order("buy", 1.1, 0.0, 10_000.0) is None
+
+    jpy = PositionSizer(USDJPY, risk_per_trade=0.01, atr_multiplier=0.2, risk_reward_ratio=2.0)
+    order = jpy.order("sell", 151.234, 0.35, 5_000.0)
+    # 70 points of 0.6667 USD per lot: 50 USD risk gives 1.07 lots, floored to the 0.1 step
+    assert (order["sl_price"], order["tp_price"], order["volume"]) == (151.304, 151.094, 1.0)
+
+def test_bulk_matches_live_rounding(sizer):
+    rng = np.random.default_rng(69)
+    n = 20_000
+    entry = 1.1 + np.cumsum(rng.normal(0, 1e-4, n))
+    atr = rng.uniform(1e-4, 3e-3, n)
+    atr[::97] = np.nan
+    direction = rng.choice([-1, 1], n)
+    balance = rng.uniform(100, 50_000, n)
+
+    bulk = sizer.size(entry, atr, direction, balance)
+    # Within the budget, up to the cent rounding of risk_amount
+    assert (bulk["risk_amount"] <= balance * 0.01 + 0.005).all()
+    assert (bulk["volume"][::97] == 0).all()
+    # Volumes are exact multiples of the step, without float noise
+    traded = bulk["volume"][bulk["volume"] > 0]
+    assert (traded >= EURUSD.volume_min).all()
+    np.testing.assert_array_equal(traded, np.round(traded, 2))
+
+    for i in rng.integers(0, n, 500):
+        order = sizer.order("buy" if direction[i] > 0 else "sell", entry[i], atr[i], balance[i])
+        if order is None:
+            assert bulk["volume"][i] == 0
+        else:
+            assert (order["sl_price"], order["tp_price"], order["volume"], order["risk_amount"]) == (
+                bulk["sl_price"][i], bulk["tp_price"][i], bulk["volume"][i], bulk["risk_amount"][i])
+
+def test_size_frame(sizer):
+    df = pd.DataFrame({"Close": [1.1, 1.2], "ATR": [0.001, 0.002]},
+                      index=pd.date_range("2024-01-01", periods=2, freq="h"))
+    sized = sizer.size_frame(df, direction=np.array([1, -1]), balance=10_000.0)
+
+    assert list(sized.columns) == ["sl_price", "tp_price", "volume", "risk_amount"]
+    assert sized.index.equals(df.index)
+    assert sized["sl_price"].tolist() == [1.0998, 1.2004]
+    assert sized["volume"].tolist() == [5.0, 2.5]
+
+def test_symbol_spec_is_cached(monkeypatch):
+    monkeypatch.setattr(risk, "_SPEC_CACHE", {})
+    sim = MT5Simulator(start_time="2024-06-03 12:00")
+    sim.initialize()
+    calls = []
+    original = sim.symbol_info
+    monkeypatch.setattr(sim, "symbol_info", lambda symbol: calls.append(symbol) or original(symbol))
+
+    sizer = PositionSizer.from_broker("EURUSD", broker=sim)
+    assert symbol_spec("EURUSD", broker=sim) is sizer.spec
+    assert calls == ["EURUSD"]
+    assert sizer.spec.volume_step == DEFAULT_SYMBOL_SPEC["volume_step"]
+
+    symbol_spec("EURUSD", broker=sim, refresh=True)
+    assert len(calls) == 2
+    with pytest.raises(RuntimeError, match="GBPJPY"):
+        symbol_spec("GBPJPY", broker=sim)
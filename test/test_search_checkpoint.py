@@ -0,0 +1,155 @@
+import pytest
+import json
+import numpy as np
+import pandas as pd
+import mlflow
+from mlflow import MlflowClient
+from src.model_trainer import ModelTrainer
+from src.search_checkpoint import SearchCheckpoint
+
+PARAM_GRID = {"max_depth": [2, 3, 4, 5], "learning_rate": [0.1, 0.2]}
+
+@pytest.fixture
+def search_data(mock_data_factory, tmp_path):
+    """Small dataset and a local MLflow store."""
+    while mlflow.active_run():
+        mlflow.end_run()
+    mlflow.set_tracking_uri((tmp_path / "mlruns").absolute().as_uri())
+    mlflow.set_experiment("Test_Resumable_Search")
+    
+    df = mock_data_factory(rows=80).set_index("Datetime")
+    X = df.drop(columns=["Close"])
+    y = pd.Series(np.random.default_rng(69).integers(0, 2, 80), index=df.index)
+    return X, y
+
+def crash_after(trainer, n_calls):
+    """Makes score_folds raise once it has been called n_calls times, like a preemption."""
+    original = trainer.score_folds
+    calls = []
+    def score_folds(params, folds):
+        if len(calls) == n_calls:
+            raise KeyboardInterrupt("preempted")
+        calls.append(params)
+        return original(params, folds)
+    trainer.score_folds = score_folds
+    return calls
+
+def child_runs():
+    """Candidate runs nested under a parent (runs of a search without an active run have none)."""
+    experiment = mlflow.get_experiment_by_name("Test_Resumable_Search")
+    runs = mlflow.search_runs(experiment_ids=[experiment.experiment_id])
+    return runs[runs["tags.mlflow.runName"].str.startswith("XGB_CV_") & runs["tags.mlflow.parentRunId"].notna()]
+
+def test_resume_skips_completed_candidates(search_data, tmp_path):
+    X, y = search_data
+    checkpoint = tmp_path / "search.json"
+    expected = ModelTrainer(n_splits=2, n_iter=4).run_experiment(X, y, PARAM_GRID)
+    
+    trainer = ModelTrainer(n_splits=2, n_iter=4)
+    crash_after(trainer, 2)
+    with pytest.raises(KeyboardInterrupt), mlflow.start_run(run_name="Parent"):
+        trainer.run_experiment(X, y, PARAM_GRID, checkpoint_path=checkpoint)
+    state = json.loads(checkpoint.read_text())
+    assert sorted(state["completed"]) == ["0", "1"]
+    assert len(state["completed"]["0"]["fold_aucpr"]) == 2
+    
+    trainer = ModelTrainer(n_splits=2, n_iter=4)
+    calls = crash_after(trainer, 99)
+    with mlflow.start_run(run_name="Parent_resumed"):
+        best = trainer.run_experiment(X, y, PARAM_GRID, checkpoint_path=checkpoint)
+    
+    # Only the two missing draws were trained, and the result is the uninterrupted one
+    assert len(calls) == 2
+    assert best == expected
+    assert json.loads(checkpoint.read_text())["best"]["index"] is not None
+    assert sorted(child_runs()["tags.mlflow.runName"]) == [f"XGB_CV_{i}" for i in range(4)]
+
+def test_reconcile_relogs_and_adopts(search_data, tmp_path):
+    X, y = search_data
+    checkpoint = tmp_path / "search.json"
+    with mlflow.start_run(run_name="Parent"):
+        ModelTrainer(n_splits=2, n_iter=3).run_experiment(X, y, PARAM_GRID, checkpoint_path=checkpoint)
+    
+    # Candidate 0 never reached MLflow, candidate 2 reached MLflow but not the checkpoint
+    runs = child_runs().set_index("tags.mlflow.runName")
+    MlflowClient().delete_run(runs.loc["XGB_CV_0", "run_id"])
+    state = json.loads(checkpoint.read_text())
+    lost = state["completed"].pop("2")
+    checkpoint.write_text(json.dumps(state))
+    
+    trainer = ModelTrainer(n_splits=2, n_iter=3)
+    calls = crash_after(trainer, 99)
+    with mlflow.start_run(run_name="Parent_resumed"):
+        trainer.run_experiment(X, y, PARAM_GRID, checkpoint_path=checkpoint)
+    
+    assert calls == []
+    state = json.loads(checkpoint.read_text())
+    assert state["completed"]["2"]["fold_aucpr"] == pytest.approx(lost["fold_aucpr"])
+    assert sorted(child_runs()["tags.mlflow.runName"]) == ["XGB_CV_0", "XGB_CV_1", "XGB_CV_2"]
+
+def test_stale_checkpoint_is_discarded(search_data, tmp_path):
+    """A checkpoint of another grid or other data is dropped and the search starts over."""
+    X, y = search_data
+    checkpoint = tmp_path / "search.json"
+    ModelTrainer(n_splits=2, n_iter=2).run_experiment(X, y, PARAM_GRID, checkpoint_path=checkpoint)
+    
+    trainer = ModelTrainer(n_splits=2, n_iter=2)
+    calls = crash_after(trainer, 99)
+    trainer.run_experiment(X, y, {"max_depth": [7, 8]}, checkpoint_path=checkpoint)
+    assert len(calls) == 2
+    
+    trainer = ModelTrainer(n_splits=2, n_iter=2)
+    calls = crash_after(trainer, 99)
+    trainer.run_experiment(X, y.iloc[::-1].set_axis(y.index), {"max_depth": [7, 8]}, checkpoint_path=checkpoint)
+    assert len(calls) == 2
+    
+    # Same data and settings: nothing is retrained
+    trainer = ModelTrainer(n_splits=2, n_iter=2)
+    calls = crash_after(trainer, 99)
+    trainer.run_experiment(X, y.iloc[::-1].set_axis(y.index), {"max_depth": [7, 8]}, checkpoint_path=checkpoint)
+    assert calls == []
+
+def test_checkpoint_of_another_search_is_refused(tmp_path):
+    checkpoint = SearchCheckpoint(tmp_path / "search.json")
+    checkpoint.record(0, {"max_depth": 3}, [0.5], [1.0])
+    
+    with pytest.raises(ValueError, match="different search"):
+        SearchCheckpoint(tmp_path / "search.json").lookup(0, {"max_depth": 7})
+
+def test_unreadable_store_does_not_relog(tmp_path, mocker):
+    """If the child runs can't be read, nothing is logged again (it would duplicate every run)."""
+    mocker.patch("src.search_checkpoint.MlflowClient").return_value.search_runs.side_effect = ConnectionError("down")
+    checkpoint = SearchCheckpoint(tmp_path / "search.json")
+    checkpoint.experiment_id, checkpoint.parent_run_id = "1", "parent"
+    checkpoint.record(0, {"max_depth": 3}, [0.5], [1.0])
+    
+    tracker = mocker.Mock(tracking_uri="http://unreachable")
+    checkpoint.reconcile(tracker)
+    tracker.log_child_run.assert_not_called()
+
+def test_child_runs_are_paged(tmp_path, mocker):
+    client = mocker.patch("src.search_checkpoint.MlflowClient").return_value
+    def page(i, token):
+        runs = mocker.MagicMock()
+        runs.__iter__.return_value = [mocker.Mock(info=mocker.Mock(run_name=f"XGB_CV_{i}"))]
+        runs.token = token
+        return runs
+    client.search_runs.side_effect = [page(0, "next"), page(1, None)]
+    
+    checkpoint = SearchCheckpoint(tmp_path / "search.json")
+    checkpoint.experiment_id, checkpoint.parent_run_id = "1", "parent"
+    assert sorted(checkpoint._child_runs("uri")) == [0, 1]
+    assert client.search_runs.call_args.kwargs["page_token"] == "next"
+    
+    checkpoint.experiment_id = None
+    assert checkpoint._child_runs("uri") == {}
+
+def test_checkpoint_mean_matches_live_search(tmp_path):
+    """Resumed candidates must replay the exact score the live path computed (np.mean, not sum/len)."""
+    checkpoint = SearchCheckpoint(tmp_path / "search.json")
+    fold_scores = [0.1, 0.2, 0.3]
+    
+    checkpoint.record(0, {"max_depth": 3}, fold_scores, [1.0, 1.0, 1.0])
+    
+    reloaded = SearchCheckpoint(tmp_path / "search.json").lookup(0, {"max_depth": 3})
+    assert reloaded["mean_aucpr"] == float(np.mean(fold_scores))
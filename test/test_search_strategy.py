@@ -0,0 +1,94 @@
+import pytest
+import json
+import numpy as np
+import pandas as pd
+import mlflow
+from scipy import stats
+from sklearn.model_selection import ParameterSampler
+from src.model_trainer import ModelTrainer
+from src.search_strategy import SearchStrategy, RandomSearch, TPESearch
+
+GRID = {"x": list(range(20)), "y": list(range(20)), "kind": ["a", "b", "c"]}
+
+def toy_score(params):
+    return -(params["x"] - 13) ** 2 - (params.get("y", 5) - 5) ** 2 - (0 if params["kind"] == "b" else 10)
+
+def drive(strategy, score_fn):
+    proposals = []
+    for _ in range(strategy.n_iter):
+        params = strategy.ask()
+        strategy.tell(params, score_fn(params))
+        proposals.append(params)
+    return proposals
+
+def test_random_search_matches_parameter_sampler():
+    expected = list(ParameterSampler(GRID, n_iter=15, random_state=69))
+    assert drive(RandomSearch(GRID, n_iter=15), toy_score) == expected
+
+def test_strategy_must_implement_ask():
+    class NoAsk(SearchStrategy):
+        n_iter = 1
+    
+    with pytest.raises(TypeError, match="ask"):
+        NoAsk()
+
+def test_tpe_is_deterministic_and_never_repeats():
+    first = drive(TPESearch(GRID, n_iter=60), toy_score)
+    assert first == drive(TPESearch(GRID, n_iter=60), toy_score)
+    assert len({tuple(sorted(p.items())) for p in first}) == 60
+    # The startup candidates are the random search draws
+    assert first[:10] == list(ParameterSampler(GRID, n_iter=10, random_state=69))
+
+    small_grid = {"x": [1, 2, 3], "kind": ["a", "b"]}
+    assert TPESearch(small_grid, n_iter=50).n_iter == 6
+    assert len({tuple(sorted(p.items())) for p in drive(TPESearch(small_grid, n_iter=50), toy_score)}) == 6
+
+def test_tpe_reaches_the_optimum_in_fewer_evaluations():
+    def evaluations_to_optimum(strategy):
+        for i, params in enumerate(drive(strategy, toy_score)):
+            if toy_score(params) == 0:
+                return i + 1
+        return strategy.n_iter + 1
+
+    tpe = [evaluations_to_optimum(TPESearch(GRID, n_iter=150, random_state=seed)) for seed in range(10)]
+    random = [evaluations_to_optimum(RandomSearch(GRID, n_iter=150, random_state=seed)) for seed in range(10)]
+    assert np.median(tpe) < np.median(random) / 2
+
+def test_tpe_with_distributions():
+    grid = {"rate": stats.loguniform(1e-3, 1), "depth": stats.randint(2, 9), "booster": ["gbtree", "dart"]}
+    proposals = drive(TPESearch(grid, n_iter=30), lambda p: -abs(np.log10(p["rate"]) + 1) - abs(p["depth"] - 4))
+
+    assert all(1e-3 <= p["rate"] <= 1 and 2 <= p["depth"] <= 8 for p in proposals)
+    assert all(isinstance(p["depth"], int) and p["booster"] in ("gbtree", "dart") for p in proposals)
+    # Later proposals concentrate around the optimum
+    assert np.median([abs(p["depth"] - 4) for p in proposals[20:]]) <= 1
+
+def test_run_experiment_resumes_tpe_search(mock_data_factory, tmp_path):
+    while mlflow.active_run():
+        mlflow.end_run()
+    mlflow.set_tracking_uri((tmp_path / "mlruns").absolute().as_uri())
+    df = mock_data_factory(rows=80).set_index("Datetime")
+    X = df.drop(columns=["Close"])
+    y = pd.Series(np.random.default_rng(69).integers(0, 2, 80), index=df.index)
+    grid = {"max_depth": [2, 3, 4, 5], "learning_rate": [0.05, 0.1, 0.2], "min_child_weight": [1, 5]}
+
+    expected = ModelTrainer(n_splits=2).run_experiment(X, y, grid, strategy=TPESearch(grid, n_iter=8, n_startup=3))
+
+    checkpoint = tmp_path / "search.json"
+    trainer = ModelTrainer(n_splits=2)
+    original, calls = trainer.score_folds, []
+    def preempted(params, folds):
+        if len(calls) == 5:
+            raise KeyboardInterrupt("preempted")
+        calls.append(params)
+        return original(params, folds)
+    trainer.score_folds = preempted
+    with pytest.raises(KeyboardInterrupt):
+        trainer.run_experiment(X, y, grid, checkpoint_path=checkpoint, strategy=TPESearch(grid, n_iter=8, n_startup=3))
+
+    trainer = ModelTrainer(n_splits=2)
+    best = trainer.run_experiment(X, y, grid, checkpoint_path=checkpoint, strategy=TPESearch(grid, n_iter=8, n_startup=3))
+
+    # The replayed scores lead the resumed search to the same proposals as the uninterrupted one
+    assert best == expected
+    assert sorted(json.loads(checkpoint.read_text())["completed"], key=int) == [str(i) for i in range(8)]
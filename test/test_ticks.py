@@ -0,0 +1,84 @@
+import pytest
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from src.ticks import (
+    TICK_DTYPE, BAR_COLUMNS, TickRingBuffer, BarAggregator, TickStream,
+    save_tick_file, replay_tick_file
+)
+
+def make_ticks(n=20_000, seed=69):
+    """Random-walk ticks a few seconds apart, starting on a day boundary."""
+    rng = np.random.default_rng(seed)
+    ticks = np.empty(n, dtype=TICK_DTYPE)
+    ticks["time_msc"] = 1_704_067_200_000 + np.cumsum(rng.integers(100, 5_000, n))
+    ticks["bid"] = np.round(1.1 + np.cumsum(rng.normal(0, 1e-5, n)), 5)
+    ticks["ask"] = np.round(ticks["bid"] + rng.integers(0, 4, n) * 1e-5, 5)
+    ticks["volume"] = 1
+    return ticks
+
+def reference_bars(ticks, freq):
+    """Same bars built with pandas resample."""
+    df = pd.DataFrame({
+        "bid": ticks["bid"],
+        "spread": (ticks["ask"] - ticks["bid"]) / 1e-5,
+    }, index=pd.to_datetime(ticks["time_msc"], unit="ms"))
+    r = df.resample(freq)
+    bars = pd.DataFrame({
+        "Open": r["bid"].first(), "High": r["bid"].max(), "Low": r["bid"].min(), "Close": r["bid"].last(),
+        "Volume": r["bid"].count(),
+        "Spread_Min": r["spread"].min(), "Spread_Mean": r["spread"].mean(), "Spread_Max": r["spread"].max(),
+    })
+    bars = bars[bars["Volume"] > 0].rename_axis("Datetime").reset_index()
+    return bars[BAR_COLUMNS]
+
+@pytest.mark.parametrize("timeframe,freq", [("M5", "5min"), ("H1", "1h"), ("H4", "4h")])
+def test_aggregator_matches_resample_across_chunks(timeframe, freq):
+    ticks = make_ticks()
+    stream = TickStream(timeframe)
+    
+    # Uneven chunks so bars straddle chunk boundaries
+    chunks = np.array_split(ticks, [7, 3_001, 3_002, 12_345])
+    bars = stream.run(chunks, include_open_bar=True)
+    
+    assert_frame_equal(bars, reference_bars(ticks, freq), check_dtype=False)
+
+def test_aggregator_keeps_last_bar_open():
+    ticks = make_ticks(2_000)
+    aggregator = BarAggregator("M5")
+    
+    closed = aggregator.update(ticks)
+    last = aggregator.flush()
+    
+    assert len(last) == 1
+    assert last["Datetime"].iloc[0] > closed["Datetime"].iloc[-1]
+
+def test_aggregator_rejects_unordered_ticks():
+    ticks = make_ticks(100)[::-1]
+    with pytest.raises(ValueError, match="Ticks must be in chronological order."):
+        BarAggregator("M1").update(ticks)
+
+def test_aggregator_unknown_timeframe():
+    with pytest.raises(ValueError, match="Unknown timeframe"):
+        BarAggregator("W1")
+
+def test_ring_buffer_wraps():
+    ticks = make_ticks(25)
+    buffer = TickRingBuffer(capacity=10)
+    
+    buffer.push(ticks[:7])
+    buffer.push(ticks[7:16])
+    assert len(buffer) == 10
+    np.testing.assert_array_equal(buffer.latest(), ticks[6:16])
+    
+    buffer.push(ticks[16:])
+    np.testing.assert_array_equal(buffer.latest(3), ticks[22:25])
+
+def test_replay_from_file(tmp_path):
+    ticks = make_ticks(5_000)
+    path = save_tick_file(ticks, tmp_path / "EURUSD_ticks")
+    
+    from_file = TickStream("M15").run(replay_tick_file(path, chunk_size=777))
+    in_memory = TickStream("M15").run([ticks])
+    
+    assert_frame_equal(from_file, in_memory)
@@ -0,0 +1,109 @@
+import pytest
+import mlflow
+from mlflow import MlflowClient
+from src.tracking import BatchedMLflowLogger, resolve_tracking_uri
+
+@pytest.fixture
+def local_tracking(tmp_path):
+    """Points MLflow at a temporary local file store."""
+    while mlflow.active_run():
+        mlflow.end_run()
+    uri = (tmp_path / "mlruns").absolute().as_uri()
+    mlflow.set_tracking_uri(uri)
+    mlflow.set_experiment("Test_Batched_Logging")
+    return uri
+
+def test_child_runs_logged_in_batches(local_tracking):
+    """Queued runs are nested under the active run with per-fold metric history."""
+    with mlflow.start_run(run_name="Parent") as parent:
+        with BatchedMLflowLogger() as tracker:
+            tracker.log_child_run("XGB_CV_0", {"max_depth": 3}, {"mean_aucpr": 0.6},
+                                  step_metrics={"fold_aucpr": [0.5, 0.7]})
+            tracker.log_child_run("XGB_CV_1", {"max_depth": 4}, {"mean_aucpr": 0.7})
+    
+    experiment = mlflow.get_experiment_by_name("Test_Batched_Logging")
+    runs = mlflow.search_runs(experiment_ids=[experiment.experiment_id])
+    children = runs[runs["tags.mlflow.parentRunId"] == parent.info.run_id]
+    
+    assert len(children) == 2
+    assert set(children["params.max_depth"]) == {"3", "4"}
+    child_id = children.loc[children["tags.mlflow.runName"] == "XGB_CV_0", "run_id"].iloc[0]
+    history = MlflowClient().get_metric_history(child_id, "fold_aucpr")
+    assert [(m.step, m.value) for m in sorted(history, key=lambda m: m.step)] == [(0, 0.5), (1, 0.7)]
+
+def test_fallback_store_when_server_fails(local_tracking, tmp_path, mocker):
+    """A failing tracking server diverts pending runs to the local fallback store."""
+    fallback_uri = (tmp_path / "fallback").absolute().as_uri()
+    
+    with mlflow.start_run(run_name="Parent"):
+        tracker = BatchedMLflowLogger(fallback_uri=fallback_uri)
+        mocker.patch.object(tracker.client, "create_run", side_effect=ConnectionError("server down"))
+        tracker.log_child_run("XGB_CV_0", {"max_depth": 3}, {"mean_aucpr": 0.6})
+        tracker.close()
+    
+    assert tracker.using_fallback is True
+    client = MlflowClient(tracking_uri=fallback_uri)
+    experiment = client.get_experiment_by_name("Test_Batched_Logging")
+    runs = {r.info.run_name: r for r in client.search_runs([experiment.experiment_id])}
+    assert sorted(runs) == ["Parent", "XGB_CV_0"]
+    assert runs["XGB_CV_0"].data.metrics["mean_aucpr"] == 0.6
+
+@pytest.fixture
+def sqlite_tracking(tmp_path, monkeypatch):
+    """Primary and fallback SQLite stores, with MLflow's file store disabled as it is by default."""
+    monkeypatch.delenv("MLFLOW_ALLOW_FILE_STORE", raising=False)
+    while mlflow.active_run():
+        mlflow.end_run()
+    uri = f"sqlite:///{(tmp_path / 'primary.db').as_posix()}"
+    mlflow.set_tracking_uri(uri)
+    mlflow.set_experiment("Test_Sqlite_Fallback")
+    return uri, f"sqlite:///{(tmp_path / 'fallback.db').as_posix()}"
+
+def test_fallback_keeps_experiment_and_nesting(sqlite_tracking, mocker):
+    """A write failing after create_run is closed as FAILED, and the fallback mirrors experiment and parent."""
+    uri, fallback_uri = sqlite_tracking
+    with mlflow.start_run(run_name="Parent") as parent:
+        tracker = BatchedMLflowLogger(fallback_uri=fallback_uri)
+        tracker.log_child_run("XGB_CV_0", {"max_depth": 3}, {"mean_aucpr": 0.6})
+        tracker.flush()
+        log_batch = mocker.patch.object(tracker.client, "log_batch", side_effect=ConnectionError("server down"))
+        create_run = mocker.spy(tracker.client, "create_run")
+        tracker.log_child_run("XGB_CV_1", {"max_depth": 4}, {"mean_aucpr": 0.7})
+        tracker.log_child_run("XGB_CV_2", {"max_depth": 5}, {"mean_aucpr": 0.8})
+        tracker.close()
+    
+    # The server is tried once, then every later run goes straight to the fallback
+    assert tracker.using_fallback is True
+    assert (create_run.call_count, log_batch.call_count) == (1, 1)
+    primary = {r.info.run_name: r.info.status for r in MlflowClient(uri).search_runs([parent.info.experiment_id])}
+    assert primary == {"Parent": "FINISHED", "XGB_CV_0": "FINISHED", "XGB_CV_1": "FAILED"}
+    
+    client = MlflowClient(tracking_uri=fallback_uri)
+    experiment = client.get_experiment_by_name("Test_Sqlite_Fallback")
+    runs = {r.info.run_name: r for r in client.search_runs([experiment.experiment_id])}
+    assert sorted(runs) == ["Parent", "XGB_CV_1", "XGB_CV_2"]
+    assert runs["Parent"].data.tags["primary_run_id"] == parent.info.run_id
+    assert runs["Parent"].info.status == "FINISHED"
+    for name in ("XGB_CV_1", "XGB_CV_2"):
+        assert runs[name].data.tags["mlflow.parentRunId"] == runs["Parent"].info.run_id
+    assert runs["XGB_CV_2"].data.metrics["mean_aucpr"] == 0.8
+
+def test_run_without_parent_uses_current_experiment(sqlite_tracking):
+    with BatchedMLflowLogger() as tracker:
+        tracker.log_child_run("XGB_CV_0", {"max_depth": 3}, {"mean_aucpr": 0.6})
+    
+    experiment = mlflow.get_experiment_by_name("Test_Sqlite_Fallback")
+    runs = mlflow.search_runs(experiment_ids=[experiment.experiment_id])
+    assert runs["tags.mlflow.runName"].tolist() == ["XGB_CV_0"]
+
+def test_resolve_tracking_uri_unreachable(tmp_path):
+    fallback_uri = (tmp_path / "mlruns").absolute().as_uri()
+    assert resolve_tracking_uri("http://127.0.0.1:1", fallback_uri) == fallback_uri
+    assert resolve_tracking_uri(fallback_uri, "unused") == fallback_uri
+
+def test_log_after_close_raises(local_tracking):
+    tracker = BatchedMLflowLogger()
+    tracker.close()
+    tracker.close()
+    with pytest.raises(RuntimeError, match="BatchedMLflowLogger is closed."):
+        tracker.log_child_run("XGB_CV_0", {}, {"mean_aucpr": 0.5})